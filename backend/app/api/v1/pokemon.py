@@ -1,57 +1,301 @@
 
+import json
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
 import httpx
+from app.core.config import settings
+from app.schemas.pokemon import PokemonBatchRequest, PokemonDetail
+from app.services.cache import CacheEntry, derived_etag
+from app.services.codec import dumps_json
+from app.services.cursor import InvalidCursor, decode_cursor
+from app.services.fetcher import UpstreamUnavailable
+from app.services.metrics import serialization_seconds
 from app.services.pokeapi import PokeAPIService
-from fastapi import APIRouter, Depends, HTTPException, Query
+from app.services.pokedex_index import SORT_FIELDS, STAT_NAMES, TYPE_MATCH_MODES
+from app.services.projection import select_fields
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 
 router = APIRouter()
 
-POKEAPI_BASE_URL = "https://pokeapi.co/api/v2"
+# Dependency to get an instance of our service, sharing the app-lifetime HTTP client
+def get_pokeapi_service(request: Request):
+    return PokeAPIService(client=getattr(request.app.state, "http_client", None))
+
+def _unavailable(e: UpstreamUnavailable) -> HTTPException:
+    """A 503 for a request that needed PokeAPI while its circuit breaker was open, with when to retry."""
+    return HTTPException(
+        status_code=503, detail="PokeAPI is unavailable; try again shortly", headers={"Retry-After": str(e.retry_after)}
+    )
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Evaluates an If-None-Match header against our ETag (weak comparison, as RFC 9110 requires)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    etag = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def _revalidation_policy() -> str:
+    return f"public, max-age={settings.http_max_age}, stale-while-revalidate={settings.http_stale_while_revalidate}"
+
+
+def _sparse_etag(etag: str, fields: list[str] | None) -> str:
+    # A sparse response is a different representation, so it needs its own validator
+    return derived_etag(etag, ",".join(fields)) if fields else etag
+
+
+async def _cached_json_response(
+    request: Request,
+    load: Callable[[], Awaitable[CacheEntry]],
+    peek_etag: Callable[[], Awaitable[str | None]],
+    fields: list[str] | None = None,
+    cache_control: str | None = None,
+) -> Response:
+    """
+    Serves the entry from `load()` with an ETag and `cache_control` (by default the
+    list/detail revalidation policy).
+
+    A conditional request is first checked against `peek_etag()`, which reads cache
+    metadata only, so a matching client gets its 304 without the body being loaded.
+    Full responses reuse the entry's pre-encoded JSON instead of serializing it again.
+
+    A `partial` result is sent without a validator and marked no-store, since a retry may
+    complete it. A stale or uncached copy, which the cache is about to replace, gets a weak
+    ETag and must be revalidated before reuse.
+    """
+    cache_control = cache_control or _revalidation_policy()
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        etag = await peek_etag()
+        if etag is not None and _etag_matches(if_none_match, _sparse_etag(etag, fields)):
+            headers = {"ETag": _sparse_etag(etag, fields), "Cache-Control": cache_control}
+            return Response(status_code=304, headers=headers)
+
+    entry = await load()
+    if isinstance(entry.value, dict) and entry.value.get("partial"):
+        return _json_body(entry, fields, {"Cache-Control": "no-store"})
+
+    # Normally the entry or a cache lookup has it; only content without a fresh cached copy is hashed here
+    etag = entry.etag or await peek_etag()
+    weak = entry.stale or etag is None
+    if etag is None:
+        entry = CacheEntry.uncached(entry.value)
+        etag = entry.etag
+    etag = _sparse_etag(etag, fields)
+    if weak:
+        etag, cache_control = f"W/{etag}", "no-cache"
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return _json_body(entry, fields, headers)
+
+
+def _json_body(entry: CacheEntry, fields: list[str] | None, headers: dict[str, str]) -> Response:
+    if fields or entry.body is None:
+        content = select_fields(entry.value, fields) if fields else entry.value
+        with serialization_seconds.time("response"):
+            return JSONResponse(content=content, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
 
-# Dependency to get an instance of our service
-def get_pokeapi_service():
-    return PokeAPIService()
 
 @router.get("/types")
-async def get_pokemon_types():
+async def get_pokemon_types(request: Request, service: PokeAPIService = Depends(get_pokeapi_service)):
     """Get all Pokemon types"""
-    # This endpoint is simple and can remain here for now.
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{POKEAPI_BASE_URL}/type")
-        if response.status_code != 200:
-            raise HTTPException(
-                status_code=response.status_code, detail="Failed to fetch types"
-            )
-        data = response.json()
-        return [{"name": t["name"]} for t in data["results"]]
+    try:
+        return await _cached_json_response(
+            request,
+            service.get_pokemon_types_entry,
+            service.get_pokemon_types_etag,
+            cache_control=f"public, max-age={settings.types_max_age}",
+        )
+    except UpstreamUnavailable as e:
+        raise _unavailable(e)
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=e.response.status_code, detail="Failed to fetch types")
+    except httpx.RequestError:
+        raise HTTPException(status_code=502, detail="Failed to fetch types")
+
+@router.get("/autocomplete")
+async def autocomplete_pokemon(
+    q: str = Query(..., min_length=1, max_length=50, description="Partly typed Pokémon name"),
+    limit: int = Query(10, ge=1, le=50),
+    service: PokeAPIService = Depends(get_pokeapi_service),
+):
+    """Suggest Pokémon names for a search box, tolerating typos"""
+    try:
+        return await service.autocomplete(q, limit)
+    except UpstreamUnavailable as e:
+        raise _unavailable(e)
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=e.response.status_code, detail="Failed to fetch suggestions")
+    except httpx.RequestError:
+        raise HTTPException(status_code=502, detail="Failed to fetch suggestions")
+
+def _parse_list_filters(
+    types: str | None, stats: str | None, match: str, sort: str | None
+) -> tuple[list[str] | None, dict[str, dict[str, int]] | None]:
+    """Parses and validates the filter parameters shared by the list, stream and facets endpoints."""
+    parsed_types = [t.strip().lower() for t in types.split(",")] if types else None
+    parsed_stats = None
+    if stats:
+        try:
+            parsed_stats = json.loads(stats)
+        except json.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="Invalid stats filter format")
+        if not _valid_stat_ranges(parsed_stats):
+            raise HTTPException(status_code=400, detail="Invalid stats filter format")
+    if match not in TYPE_MATCH_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid match; expected one of {', '.join(TYPE_MATCH_MODES)}")
+    if sort is not None and sort not in SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Invalid sort field; expected one of {', '.join(SORT_FIELDS)}")
+    return parsed_types, parsed_stats
+
+
+def _valid_stat_ranges(stats: Any) -> bool:
+    """Whether a parsed stats filter is `{stat: {"min": int, "max": int}}` over known stats; bounds are optional."""
+    if not isinstance(stats, dict):
+        return False
+    for stat_name, bounds in stats.items():
+        if stat_name not in STAT_NAMES or not isinstance(bounds, dict) or not bounds.keys() <= {"min", "max"}:
+            return False
+        if any(not isinstance(bound, int) or isinstance(bound, bool) for bound in bounds.values()):
+            return False
+    return True
+
+
+async def _check_types(service: PokeAPIService, types: list[str] | None) -> None:
+    """Rejects unknown types with a 400 before the query runs, whether it would use the index or PokeAPI."""
+    unknown = await service.unknown_types(types)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown Pokémon types: {', '.join(unknown)}")
+
+
+async def _ndjson_lines(first: list[dict[str, Any]], rest: AsyncIterator[list[dict[str, Any]]]) -> AsyncIterator[bytes]:
+    # One chunk per batch: each line is a compact JSON object
+    with serialization_seconds.time("ndjson"):
+        chunk = b"".join(dumps_json(item) + b"\n" for item in first)
+    yield chunk
+    async for batch in rest:
+        with serialization_seconds.time("ndjson"):
+            chunk = b"".join(dumps_json(item) + b"\n" for item in batch)
+        yield chunk
+
+
+@router.get("/facets")
+async def get_pokemon_facets(
+    request: Request,
+    search: str | None = Query(None),
+    types: str | None = Query(None),
+    match: str = Query("all", description=f"How several types combine: {' or '.join(TYPE_MATCH_MODES)}"),
+    stats: str | None = Query(None),
+    service: PokeAPIService = Depends(get_pokeapi_service),
+):
+    """
+    Count the Pokémon matching the filters, per type, and histogram each base stat, for filter UIs.
+    """
+    parsed_types, parsed_stats = _parse_list_filters(types, stats, match, None)
+    params = dict(search=search, types=parsed_types, stats=parsed_stats, match=match)
+    try:
+        await _check_types(service, parsed_types)
+
+        async def load() -> CacheEntry:
+            return CacheEntry(await service.get_pokemon_facets(**params), None)
+
+        return await _cached_json_response(request, load, lambda: service.get_pokemon_facets_etag(**params))
+    except UpstreamUnavailable as e:
+        raise _unavailable(e)
+    except httpx.HTTPError:
+        raise HTTPException(status_code=502, detail="Upstream PokeAPI error")
+
+@router.get("/stream")
+async def stream_pokemon(
+    search: str | None = Query(None),
+    types: str | None = Query(None),
+    match: str = Query("all", description=f"How several types combine: {' or '.join(TYPE_MATCH_MODES)}"),
+    stats: str | None = Query(None),
+    sort: str | None = Query(None, description="Field to sort by: id or a base stat name"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    service: PokeAPIService = Depends(get_pokeapi_service),
+):
+    """
+    Stream every Pokémon matching the filters as newline-delimited JSON, without pagination.
+    """
+    parsed_types, parsed_stats = _parse_list_filters(types, stats, match, sort)
+    batches = service.stream_pokemon_list(
+        search=search, types=parsed_types, stats=parsed_stats, sort=sort, order=order, match=match
+    )
+    try:
+        await _check_types(service, parsed_types)
+        # Resolve the first batch before committing to a 200, so bad filters still get an error status
+        first = await anext(batches, [])
+    except UpstreamUnavailable as e:
+        raise _unavailable(e)
+    except httpx.HTTPError:
+        raise HTTPException(status_code=502, detail="Upstream PokeAPI error")
+    return StreamingResponse(_ndjson_lines(first, batches), media_type="application/x-ndjson")
+
+@router.post("/batch")
+async def get_pokemon_batch(body: PokemonBatchRequest, service: PokeAPIService = Depends(get_pokeapi_service)):
+    """
+    Get many Pokémon by name or ID in one request, in request order, with an error per unresolvable item.
+    """
+    try:
+        return {"results": await service.get_pokemon_batch([str(identifier) for identifier in body.ids])}
+    except UpstreamUnavailable as e:
+        raise _unavailable(e)
+    except httpx.HTTPError:
+        # Per-item upstream failures are reported in the results; this is only a failure shared by all of them
+        raise HTTPException(status_code=502, detail="Upstream PokeAPI error")
 
 @router.get("")
 async def get_pokemon(
+    request: Request,
     search: str | None = Query(None),
     types: str | None = Query(None),
+    match: str = Query("all", description=f"How several types combine: {' or '.join(TYPE_MATCH_MODES)}"),
     stats: str | None = Query(None),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    sort: str | None = Query(None, description="Field to sort by: id or a base stat name"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: str | None = Query(None, description="A next/previous cursor from an earlier page; overrides the rest"),
     service: PokeAPIService = Depends(get_pokeapi_service),
 ):
     """
     Get Pokemon with server-side filtering, now powered by a caching service.
     """
     try:
-        parsed_types = [t.strip().lower() for t in types.split(",")] if types else None
-        parsed_stats = None
-        if stats:
+        if cursor is not None:
             try:
-                import json
-                parsed_stats = json.loads(stats)
-            except json.JSONDecodeError:
-                raise HTTPException(status_code=400, detail="Invalid stats filter format")
+                params = decode_cursor(cursor)
+            except InvalidCursor as e:
+                raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+        else:
+            parsed_types, parsed_stats = _parse_list_filters(types, stats, match, sort)
+            params = dict(
+                search=search,
+                types=parsed_types,
+                stats=parsed_stats,
+                limit=limit,
+                offset=offset,
+                sort=sort,
+                order=order,
+                match=match,
+            )
+        await _check_types(service, params["types"])
 
-        pokemon_data = await service.get_pokemon_list(
-            search=search, types=parsed_types, stats=parsed_stats, limit=limit, offset=offset
-        )
-        return pokemon_data
-    except httpx.RequestError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        async def load() -> CacheEntry:
+            return CacheEntry(await service.get_pokemon_list(**params), None)
+
+        return await _cached_json_response(request, load, lambda: service.get_pokemon_list_etag(**params))
+    except UpstreamUnavailable as e:
+        raise _unavailable(e)
+    except httpx.HTTPError:
+        raise HTTPException(status_code=502, detail="Upstream PokeAPI error")
     except HTTPException:
         raise  # Re-raise HTTPExceptions (e.g., 400 for invalid stats)
     except Exception:
@@ -60,12 +304,28 @@ async def get_pokemon(
 
 @router.get("/{name_or_id}")
 async def get_pokemon_detail(
+    request: Request,
     name_or_id: str,
+    fields: str | None = Query(None, description="Comma-separated top-level fields to return, e.g. id,name,sprites"),
     service: PokeAPIService = Depends(get_pokeapi_service),
 ):
     """Get detailed info for a specific Pokémon by name or ID."""
+    selected = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    unknown = [f for f in selected or [] if f not in PokemonDetail.model_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid fields {', '.join(unknown)}; expected any of {', '.join(PokemonDetail.model_fields)}",
+        )
     try:
-        return await service.get_pokemon_detail(name_or_id)
+        return await _cached_json_response(
+            request,
+            lambda: service.get_pokemon_detail_entry(name_or_id),
+            lambda: service.get_pokemon_detail_etag(name_or_id),
+            fields=selected,
+        )
+    except UpstreamUnavailable as e:
+        raise _unavailable(e)
     except httpx.HTTPStatusError as e:
         if e.response is not None and e.response.status_code == 404:
             raise HTTPException(status_code=404, detail="Pokemon not found")
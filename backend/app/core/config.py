@@ -16,16 +16,63 @@ class Settings(BaseSettings):
 
     # Redis Configuration
     redis_url: str = "redis://localhost:6379"
+    redis_timeout: float = 0.5  # Seconds to connect or wait for a reply before treating Redis as failed
 
     # AI Service Configuration (I might change this later to not be gemini but I think we'll see)
     gemini_api_key: str = ""
 
     # Cache Configuration
-    cache_ttl: int = 3600  # 1 hour in seconds
-    max_cache_size: int = 1000  # Maximum number of cached items
+    cache_ttl: int = 3600  # 1 hour in seconds; after this entries are stale and refreshed in the background
+    cache_stale_ttl: int = 86400  # How long past cache_ttl a stale entry may still be served, in seconds
+    max_cache_size: int = 1000  # Maximum number of items in each worker's in-process cache
+    local_cache_ttl: int = 300  # Longest an item lives in the in-process cache, in seconds
+    cache_lock_enabled: bool = False  # Use a Redis lock so only one worker refreshes a missed key
+    cache_lock_ttl: float = 10.0  # Seconds before an abandoned refresh lock expires
+    cache_lock_wait: float = 5.0  # Seconds other workers wait for the lock holder before fetching
+    cache_refresh_enabled: bool = False  # Periodically re-warm the most requested keys before they go stale
+    cache_refresh_interval: int = 300  # Seconds between re-warm passes
+    cache_refresh_top_n: int = 50  # Number of most requested keys re-warmed per pass
+    cache_serializer: str = "orjson"  # Value encoding in Redis: orjson, json or msgpack (needs the msgpack package)
+    cache_compression: str = "zlib"  # none, zlib, zstd (needs zstandard) or lz4 (needs lz4)
+    cache_compress_min_bytes: int = 1024  # Values smaller than this are stored uncompressed
+    prefetch_enabled: bool = False  # Warm the next list page and the current page's details after serving a page
+    prefetch_concurrency: int = 4  # Upstream requests prefetching may have in flight at once, per worker
+    prefetch_max_load: float = 0.5  # Stop prefetching while user requests hold this share of upstream_max_in_flight
+    batch_max_items: int = 100  # Most Pokémon one batch request may ask for
+    batch_max_concurrency: int = 10  # Upstream fetches one batch request may have in flight at once
+
+    # Pagination
+    result_set_ttl: int = 300  # Seconds a query's filtered, sorted id list is kept for paging through it
+
+    # HTTP response caching (browsers, CDNs)
+    types_max_age: int = 86400  # Cache-Control max-age for the type list, which is effectively static
+    http_max_age: int = 60  # Cache-Control max-age for list and detail responses
+    http_stale_while_revalidate: int = 3600  # How long clients may keep using a response while revalidating it
 
     # HTTP Client Configuration
-    http_timeout: int = 30
+    http_timeout: int = 5  # Seconds per PokeAPI attempt; short, so a hung upstream trips the circuit breaker
+    http_max_connections: int = 100  # Upper bound on pooled connections to PokeAPI
+    http_max_keepalive_connections: int = 20  # Idle connections kept open for reuse
+    http_keepalive_expiry: float = 30.0  # Seconds an idle connection stays in the pool
+    http2_enabled: bool = False  # Requires the optional 'h2' package (httpx[http2])
+
+    # Upstream fetch scheduling
+    upstream_max_in_flight: int = 20  # Maximum simultaneous requests to PokeAPI per worker
+    upstream_rate_limit: float = 50.0  # Requests per second per upstream host; 0 disables
+    upstream_rate_burst: int = 50  # Token-bucket burst size
+    upstream_max_retries: int = 3  # Retries for timeouts, resets, 429 and 5xx gateway errors
+    upstream_backoff_base: float = 0.25  # Seconds; doubled on each retry, with full jitter
+    upstream_backoff_max: float = 10.0  # Longest backoff, and longest Retry-After we will wait
+
+    # Circuit breakers (Redis and PokeAPI)
+    breaker_failure_threshold: int = 5  # Consecutive failures that open a dependency's circuit
+    breaker_reset_timeout: float = 10.0  # Seconds an open circuit fails fast before letting a probe through
+
+    # In-memory Pokédex index Configuration
+    index_enabled: bool = True  # Build the index at startup and serve list queries from it
+    index_refresh_interval: int = 86400  # Rebuild the index once a day, in seconds
+    index_build_concurrency: int = 20  # Maximum concurrent detail requests while building
+    snapshot_path: str = ""  # Snapshot written by `python -m app.ingest`; loaded at startup if it exists
 
     class Config:
         env_file = ".env"
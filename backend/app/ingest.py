@@ -0,0 +1,112 @@
+"""
+Offline bulk ingestion: snapshots PokeAPI into a local data file.
+
+    python -m app.ingest --output data/pokedex.json.gz
+    python -m app.ingest --output data/pokedex.bin  # memory-mappable binary layout
+
+Crawls /type, /pokemon and every Pokémon detail through PokeAPIService (so the
+shared fetcher's concurrency and rate limits apply) and writes a versioned
+snapshot the backend can boot from with SNAPSHOT_PATH; an output ending in `.bin`
+gets the fixed-layout binary format instead of gzip JSON. Progress is checkpointed
+to `<output>.partial`, so an interrupted run resumes where it stopped.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Any
+
+from app.core.config import settings
+from app.services.http_client import create_http_client
+from app.services.pokeapi import PokeAPIService
+from app.services.snapshot import write_binary_snapshot, write_snapshot
+
+logger = logging.getLogger("app.ingest")
+
+
+def _read_checkpoint(path: Path) -> dict[str, dict[str, Any]]:
+    """Loads summaries saved by a previous, interrupted run, keyed by name."""
+    done: dict[str, dict[str, Any]] = {}
+    if not path.exists():
+        return done
+    good_bytes = 0
+    with path.open("rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # A torn final line from an interrupted write
+            try:
+                summary = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            done[summary["name"]] = summary
+            good_bytes += len(line)
+    # Drop any torn tail so new lines are appended after the last complete one
+    with path.open("r+b") as f:
+        f.truncate(good_bytes)
+    return done
+
+
+async def ingest(output: Path, batch_size: int, allow_partial: bool = False) -> bool:
+    """Crawls PokeAPI into a snapshot at `output`. Returns False if Pokémon were left unfetched."""
+    checkpoint = output.with_name(output.name + ".partial")
+    done = _read_checkpoint(checkpoint)
+    if done:
+        logger.info(f"Resuming from {checkpoint} with {len(done)} Pokémon already fetched")
+
+    async with create_http_client() as client:
+        service = PokeAPIService(client=client)
+        types = [t["name"] for t in await service.get_pokemon_types()]
+        references = await service.list_pokemon_references()
+        pending = [p["url"] for p in references if p["name"] not in done]
+        logger.info(f"{len(references)} Pokémon listed, {len(pending)} left to fetch")
+
+        failed = 0
+        with checkpoint.open("a", encoding="utf-8") as f:
+            for start in range(0, len(pending), batch_size):
+                summaries = await service.fetch_summaries(pending[start : start + batch_size])
+                for summary in summaries:
+                    if summary is None:
+                        failed += 1
+                        continue
+                    done[summary["name"]] = summary
+                    f.write(json.dumps(summary, separators=(",", ":")) + "\n")
+                f.flush()
+                logger.info(f"Fetched {len(done)}/{len(references)} Pokémon")
+
+    if failed and not allow_partial:
+        logger.error(f"{failed} Pokémon could not be fetched; re-run to resume, or pass --allow-partial")
+        return False
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    writer = write_binary_snapshot if output.suffix == ".bin" else write_snapshot
+    writer(output, list(done.values()), types)
+    checkpoint.unlink(missing_ok=True)
+    return True
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.ingest", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", type=Path, default=Path(settings.snapshot_path or "data/pokedex.json.gz"))
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=settings.index_build_concurrency,
+        help="Pokémon fetched per batch (and per checkpoint write)",
+    )
+    parser.add_argument("--base-url", help="PokeAPI base URL, e.g. a local stand-in server")
+    parser.add_argument("--allow-partial", action="store_true", help="Write the snapshot even if some fetches failed")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if args.base_url:
+        settings.pokeapi_base_url = args.base_url.rstrip("/")
+
+    ok = asyncio.run(ingest(args.output, args.batch_size, allow_partial=args.allow_partial))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,73 @@
+import asyncio
 import logging
+from contextlib import asynccontextmanager
+from pathlib import Path
 
 from app.api.v1.pokemon import router as pokemon_router
-from fastapi import FastAPI
+from app.core.config import settings
+from app.services.background import background
+from app.services.http_client import create_http_client
+from app.services.metrics import registry
+from app.services.pokeapi import PokeAPIService
+from app.services.pokedex_index import pokedex_index
+from app.services.refresher import hot_keys, refresh_hot_keys_forever
+from app.services.snapshot import SnapshotError, is_binary_snapshot, load_snapshot, open_binary_snapshot
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Pokedex")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info("Application created: Pokedex")
+    # One pooled, keep-alive HTTP client shared by every request for the app's lifetime
+    app.state.http_client = create_http_client()
+
+    index_refresh_delay = 0
+    if settings.snapshot_path and Path(settings.snapshot_path).exists():
+        # Boot from the offline snapshot so the index is ready without any PokeAPI calls
+        try:
+            if is_binary_snapshot(settings.snapshot_path):
+                # Memory-mapped, so every worker shares one copy of the roster through the page cache
+                roster = open_binary_snapshot(settings.snapshot_path)
+                pokedex_index.load_packed(roster, type_names=roster.type_list)
+            else:
+                snapshot = load_snapshot(settings.snapshot_path)
+                pokedex_index.load(snapshot["pokemon"], type_names=snapshot["types"])
+            index_refresh_delay = settings.index_refresh_interval
+        except SnapshotError as e:
+            logger.error(f"Ignoring snapshot: {e}")
+
+    tasks = []
+    if settings.index_enabled:
+        # Warm the Pokédex index in the background so startup isn't blocked on PokeAPI
+        service = PokeAPIService(client=app.state.http_client)
+        tasks.append(
+            asyncio.create_task(
+                pokedex_index.refresh_forever(
+                    service.fetch_roster, settings.index_refresh_interval, initial_delay=index_refresh_delay
+                )
+            )
+        )
+    if settings.cache_refresh_enabled:
+        # Re-warm the most requested keys before they go stale
+        tasks.append(
+            asyncio.create_task(
+                refresh_hot_keys_forever(hot_keys, settings.cache_refresh_interval, settings.cache_refresh_top_n)
+            )
+        )
+
+    yield
+
+    for task in tasks:
+        task.cancel()
+    background.cancel_all()
+    await app.state.http_client.aclose()
+
+app = FastAPI(title="Pokedex", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -26,6 +85,7 @@ app.include_router(pokemon_router, prefix="/pokemon", tags=["pokemon"])
 async def health_check():
     return {"status": "healthy"}
 
-@app.on_event("startup")
-async def startup_event():
-    logger.info("Application created: Pokedex")
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """This worker's metrics in the Prometheus text format."""
+    return Response(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,6 +1,7 @@
 from typing import Optional
 
-from pydantic import BaseModel
+from app.core.config import settings
+from pydantic import BaseModel, Field
 
 
 class PokemonBasic(BaseModel):
@@ -61,3 +62,6 @@ class PokemonDetail(BaseModel):
 class PokemonSearchResponse(BaseModel):
     results: list[PokemonBasic]
     total_found: int
+
+class PokemonBatchRequest(BaseModel):
+    ids: list[str | int] = Field(..., min_length=1, max_length=settings.batch_max_items)
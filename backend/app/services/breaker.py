@@ -0,0 +1,80 @@
+import logging
+import math
+import time
+
+from app.services.metrics import circuit_open, circuit_rejections
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Fails calls to a dependency fast while it is down, instead of letting each one wait for its own timeout.
+
+    After `failure_threshold` consecutive failures the circuit opens and allow() refuses
+    every call, which costs a clock read. Once `reset_timeout` seconds have passed it is
+    half-open: a single probe call is let through, and its outcome closes the circuit
+    again or reopens it for another `reset_timeout`.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 10.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout  # Seconds the circuit stays open before probing
+        self.failures = 0  # Consecutive failures since the last success
+        self._opened_at: float | None = None  # Monotonic time the circuit (re)opened; None while closed
+        self._probe_started: float | None = None
+        circuit_open.set(0, name)
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return CLOSED
+        return HALF_OPEN if time.monotonic() - self._opened_at >= self.reset_timeout else OPEN
+
+    @property
+    def retry_after(self) -> int:
+        """Whole seconds until the circuit next lets a probe through; 0 unless it is open."""
+        if self._opened_at is None:
+            return 0
+        return max(0, math.ceil(self._opened_at + self.reset_timeout - time.monotonic()))
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead; callers report its outcome with record_success() or record_failure()."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        now = time.monotonic()
+        # One probe at a time; a probe that never reported back frees the slot after reset_timeout
+        if state == HALF_OPEN and (self._probe_started is None or now - self._probe_started >= self.reset_timeout):
+            self._probe_started = now
+            return True
+        circuit_rejections.inc(self.name)
+        return False
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            logger.warning(f"Circuit {self.name} closed; the dependency is reachable again")
+            circuit_open.set(0, self.name)
+        self.failures = 0
+        self._opened_at = None
+        self._probe_started = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._opened_at is None and self.failures < self.failure_threshold:
+            return
+        if self._opened_at is None:
+            logger.error(f"Circuit {self.name} opened after {self.failures} consecutive failures")
+            circuit_open.set(1, self.name)
+        # A failed probe (or a straggler failing while open) restarts the wait before the next probe
+        self._opened_at = time.monotonic()
+        self._probe_started = None
+
+    def reset(self) -> None:
+        """Closes the circuit and forgets past failures."""
+        self.record_success()
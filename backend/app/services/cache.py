@@ -0,0 +1,310 @@
+import hashlib
+import logging
+import secrets
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any, NamedTuple, TypeVar
+
+import redis.asyncio as redis
+from app.core.config import settings
+from app.services.breaker import CLOSED, CircuitBreaker
+from app.services.codec import HEAD_BYTES, CacheCodec, CodecError, dumps_json, read_head
+from app.services.metrics import (
+    local_cache_entries,
+    local_cache_evictions,
+    local_cache_lookups,
+    redis_errors,
+    redis_seconds,
+    registry,
+    serialization_seconds,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Deletes a lock only if it still holds our token, so we never release another worker's lock
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Create a Redis connection pool; values are binary frames (see codec.py), so responses stay bytes.
+# Short timeouts so an unreachable Redis fails (and trips the circuit breaker) instead of stalling requests
+redis_pool = redis.from_url(
+    settings.redis_url, socket_timeout=settings.redis_timeout, socket_connect_timeout=settings.redis_timeout
+)
+
+
+class CacheEntry(NamedTuple):
+    """A cached value with its soft expiry; past it the value is stale but still servable."""
+
+    value: Any
+    fresh_until: float | None  # Unix timestamp; None for entries written without one
+    etag: str | None = None  # Strong validator of the value, computed once when it is written
+    body: bytes | None = None  # The value already encoded as JSON, so responses needn't re-serialize it
+
+    @classmethod
+    def uncached(cls, value: Any) -> "CacheEntry":
+        """Wraps a value that was never cached, encoding it (and hashing its ETag) once."""
+        with serialization_seconds.time("json"):
+            body = dumps_json(value)
+        return cls(value, None, content_etag(body), body)
+
+    @property
+    def stale(self) -> bool:
+        return self.fresh_until is not None and self.fresh_until <= time.time()
+
+
+class LocalCache:
+    """
+    In-process LRU cache with per-entry TTL, bounded to `max_size` entries.
+
+    Values are stored already decoded and handed out by reference, so callers must
+    treat them as read-only.
+    """
+
+    def __init__(self, max_size: int, ttl: int):
+        self.max_size = max_size
+        self.ttl = ttl  # Upper bound on how long an entry lives locally, in seconds
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()  # key -> (expires_at, value)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any | None:
+        """Returns the live value for `key`, or None on a miss."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: Any, ttl: int | None = None) -> None:
+        """Stores `value`, evicting the least recently used entries beyond `max_size`."""
+        if self.max_size <= 0:
+            return
+        ttl = min(ttl, self.ttl) if ttl is not None else self.ttl
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+class TieredCache:
+    """
+    Two-tier cache: a process-local LocalCache (L1) in front of Redis (L2).
+
+    Entries have a soft TTL, after which they are reported stale but still served,
+    and a hard TTL (soft + stale_ttl) after which Redis drops them. Values are
+    stored in Redis by `codec` and kept decoded in L1. Redis failures, and values
+    this worker can't decode, are logged and treated as misses so callers can
+    always fall through to PokeAPI. Once `breaker` opens on repeated Redis failures,
+    Redis is skipped entirely (reads miss, writes only reach L1) until a probe succeeds.
+    """
+
+    def __init__(
+        self,
+        local: LocalCache,
+        stale_ttl: int = 0,
+        codec: CacheCodec | None = None,
+        breaker: CircuitBreaker | None = None,
+    ):
+        self.local = local
+        self.stale_ttl = stale_ttl  # Seconds an entry may be served stale after its soft TTL
+        self.codec = codec or CacheCodec()
+        self.breaker = breaker if breaker is not None else CircuitBreaker("redis")
+
+    async def _redis(self, op: str, command: Callable[[], Awaitable[T]], failed: T) -> T:
+        """
+        Runs a Redis `command`, returning `failed` instead when it raises or the circuit is open.
+
+        Failures are logged and counted; an open circuit skips the round trip (and the log line).
+        """
+        if not self.breaker.allow():
+            return failed
+        try:
+            with redis_seconds.time(op):
+                result = await command()
+        except Exception as e:
+            logger.error(f"Redis {op.upper()} failed: {e}")
+            redis_errors.inc(op)
+            self.breaker.record_failure()
+            return failed
+        self.breaker.record_success()
+        return result
+
+    async def get(self, key: str) -> Any | None:
+        """Returns the cached value, fresh or stale, or None on a miss."""
+        entry = await self.get_entry(key)
+        return entry.value if entry is not None else None
+
+    async def get_entry(self, key: str) -> CacheEntry | None:
+        entry = self.local.get(key)
+        if entry is not None:
+            return entry
+        cached = await self._redis("get", lambda: redis_pool.get(key), None)
+        if not cached:
+            return None
+        entry = self._decode(key, cached)
+        if entry is not None:
+            self.local.set(key, entry)
+        return entry
+
+    async def get_etag(self, key: str) -> str | None:
+        """
+        Returns the ETag of a fresh entry without decoding its value, or None.
+
+        An L1 hit costs a dict lookup; otherwise only the head of the Redis frame is
+        read (GETRANGE). Stale and undecodable entries report None so callers take the
+        full path, which also schedules their refresh.
+        """
+        entry = self.local.get(key)
+        if entry is not None:
+            return entry.etag if not entry.stale else None
+        head = await self._redis("getrange", lambda: redis_pool.getrange(key, 0, HEAD_BYTES - 1), None)
+        if not head:
+            return None
+        try:
+            _, _, fresh_until, etag, _ = read_head(head)
+        except CodecError:
+            return None
+        if fresh_until is not None and fresh_until <= time.time():
+            return None
+        return etag
+
+    async def mget(self, keys: list[str]) -> list[Any | None]:
+        """Reads many values, fresh or stale; L1 misses are fetched from Redis in a single MGET."""
+        return [entry.value if entry is not None else None for entry in await self.mget_entries(keys)]
+
+    async def mget_entries(self, keys: list[str]) -> list[CacheEntry | None]:
+        entries = [self.local.get(key) for key in keys]
+        missing = [i for i, entry in enumerate(entries) if entry is None]
+        if not missing:
+            return entries
+        cached = await self._redis("mget", lambda: redis_pool.mget([keys[i] for i in missing]), None)
+        if cached is None:
+            return entries
+        for i, raw in zip(missing, cached):
+            if raw:
+                entries[i] = self._decode(keys[i], raw)
+                if entries[i] is not None:
+                    self.local.set(keys[i], entries[i])
+        return entries
+
+    async def set(self, key: str, value: Any, ttl: int, stale_ttl: int | None = None) -> None:
+        """
+        Stores `value` as fresh for `ttl` seconds, then servable-but-stale for stale_ttl more
+        (the cache-wide stale_ttl unless one is given for this entry).
+        """
+        stale_ttl = stale_ttl if stale_ttl is not None else self.stale_ttl
+        entry = self._entry(value, time.time() + ttl)
+        self.local.set(key, entry, ttl + stale_ttl)
+        if self.breaker.state != CLOSED:
+            return  # Don't encode a frame that won't be sent; L1 has the entry
+        raw = self._encode(entry)
+        await self._redis("set", lambda: redis_pool.setex(key, ttl + stale_ttl, raw), None)
+
+    async def set_many(self, items: dict[str, Any], ttl: int) -> None:
+        """Writes many keys, sending them to Redis in one pipeline."""
+        if not items:
+            return
+        fresh_until = time.time() + ttl
+        entries = {key: self._entry(value, fresh_until) for key, value in items.items()}
+        for key, entry in entries.items():
+            self.local.set(key, entry, ttl + self.stale_ttl)
+        if self.breaker.state != CLOSED:
+            return
+        frames = {key: self._encode(entry) for key, entry in entries.items()}
+
+        async def write() -> None:
+            pipe = redis_pool.pipeline(transaction=False)
+            for key, raw in frames.items():
+                pipe.setex(key, ttl + self.stale_ttl, raw)
+            await pipe.execute()
+
+        await self._redis("set_many", write, None)
+
+    def _entry(self, value: Any, fresh_until: float) -> CacheEntry:
+        # The JSON is encoded once here and reused for the ETag, the Redis payload and every response
+        with serialization_seconds.time("json"):
+            body = self.codec.dumps_json(value)
+        return CacheEntry(value, fresh_until, content_etag(body), body)
+
+    def _encode(self, entry: CacheEntry) -> bytes:
+        with serialization_seconds.time("encode"):
+            return self.codec.encode(entry.value, entry.fresh_until, entry.etag, entry.body)
+
+    def _decode(self, key: str, raw: bytes) -> CacheEntry | None:
+        try:
+            with serialization_seconds.time("decode"):
+                return CacheEntry(*self.codec.decode(raw))
+        except CodecError as e:
+            # e.g. written by a newer version during a rollout; refetching overwrites it in a format we know
+            logger.warning(f"Ignoring undecodable cache entry {key}: {e}")
+            return None
+
+    async def acquire_lock(self, key: str, ttl: float) -> str | None:
+        """
+        Tries to take a short-lived cross-worker lock on `key`.
+
+        Returns a token to pass to release_lock() when acquired, or None if another
+        worker holds it. If Redis is unavailable the lock is treated as acquired so
+        callers never block on an outage.
+        """
+        token = secrets.token_hex(8)
+        acquired = await self._redis(
+            "lock", lambda: redis_pool.set(f"lock:{key}", token, nx=True, px=int(ttl * 1000)), True
+        )
+        return token if acquired else None
+
+    async def release_lock(self, key: str, token: str) -> None:
+        await self._redis("unlock", lambda: redis_pool.eval(_RELEASE_LOCK_SCRIPT, 1, f"lock:{key}", token), None)
+
+
+def content_etag(body: bytes) -> str:
+    """A strong ETag for a JSON body: a quoted hash of its exact bytes."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def derived_etag(etag: str, *parts: str) -> str:
+    """A strong ETag for a variant (e.g. a field subset) of the representation tagged `etag`."""
+    return content_etag(":".join((etag, *parts)).encode("utf-8"))
+
+
+# Shared, process-wide cache instance
+cache = TieredCache(
+    LocalCache(settings.max_cache_size, settings.local_cache_ttl),
+    settings.cache_stale_ttl,
+    CacheCodec(settings.cache_serializer, settings.cache_compression, settings.cache_compress_min_bytes),
+    CircuitBreaker("redis", settings.breaker_failure_threshold, settings.breaker_reset_timeout),
+)
+
+
+def _collect_local_stats() -> None:
+    # The shared L1's own counters, copied into the registry whenever /metrics is scraped
+    stats = cache.local.stats()
+    local_cache_entries.set(stats["size"])
+    local_cache_lookups.set(stats["hits"], "hit")
+    local_cache_lookups.set(stats["misses"], "miss")
+    local_cache_evictions.set(stats["evictions"])
+
+
+registry.on_render(_collect_local_stats)
@@ -0,0 +1,201 @@
+import importlib
+import importlib.util
+import json
+import logging
+import math
+import struct
+import zlib
+from typing import Any, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+# First byte of every framed value: never valid UTF-8 and never the start of JSON, so anything else in a cache
+# key (e.g. plain JSON) is recognized as not a frame and read as a miss
+CODEC_MAGIC = 0xFF
+CODEC_VERSION = 1  # Bump on any incompatible change; readers treat versions they don't know as misses
+
+SERIALIZERS = ("orjson", "json", "msgpack")
+COMPRESSIONS = ("none", "zlib", "zstd", "lz4")
+
+# Wire ids; orjson and json share one since both write plain JSON
+_FORMAT_IDS = {"json": 0, "orjson": 0, "msgpack": 1}
+_COMPRESSION_IDS = {name: i for i, name in enumerate(COMPRESSIONS)}
+
+# magic, version, payload format, compression, fresh_until (NaN for none), etag length; then the etag and payload
+_HEADER = struct.Struct("<BBBBdB")
+HEAD_BYTES = _HEADER.size + 64  # The header plus the longest etag we write, for reads of metadata only
+
+# Codecs that need an optional package, and the module that provides each
+_OPTIONAL_MODULES = {"orjson": "orjson", "msgpack": "msgpack", "zstd": "zstandard", "lz4": "lz4.frame"}
+
+
+class CodecError(ValueError):
+    """A framed value that can't be decoded here: corrupt, from a newer version or needing a missing package."""
+
+
+class FrameHead(NamedTuple):
+    format: int
+    compression: int
+    fresh_until: float | None
+    etag: str | None
+    payload_offset: int
+
+
+def _package(name: str) -> str:
+    return _OPTIONAL_MODULES[name].partition(".")[0]
+
+
+def available(name: str) -> bool:
+    """Whether a serializer or compression from SERIALIZERS/COMPRESSIONS can be used here."""
+    return name not in _OPTIONAL_MODULES or importlib.util.find_spec(_package(name)) is not None
+
+
+def _import(name: str):
+    return importlib.import_module(_OPTIONAL_MODULES[name])
+
+
+_orjson = _import("orjson") if available("orjson") else None
+
+
+def dumps_json(value: Any) -> bytes:
+    """Encodes a value as JSON with orjson when it is installed, else the standard library."""
+    if _orjson is not None:
+        return _orjson.dumps(value, option=_orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value).encode("utf-8")
+
+
+class CacheCodec:
+    """
+    Serializes cache entries for Redis as a small binary frame: a version header with the
+    entry's metadata, then the value, compressed when it is larger than `compress_min_bytes`.
+
+    JSON payloads are the same bytes later sent as the HTTP body, so a reader only has to
+    decompress to get the pre-encoded body. msgpack payloads tend to be smaller but have to
+    be re-encoded as JSON for responses. Serializers and compressors
+    whose package isn't installed fall back to orjson/json and no compression.
+    """
+
+    def __init__(
+        self,
+        serializer: str = "orjson",
+        compression: str = "none",
+        compress_min_bytes: int = 1024,
+        compress_level: int | None = None,
+    ):
+        if serializer not in SERIALIZERS:
+            raise ValueError(f"Unknown cache serializer {serializer!r}; expected one of {', '.join(SERIALIZERS)}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown cache compression {compression!r}; expected one of {', '.join(COMPRESSIONS)}")
+        for name, fallback in ((serializer, "json"), (compression, "none")):
+            if not available(name):
+                logger.warning(
+                    f"Cache codec '{name}' requested but the '{_package(name)}' package is not installed; "
+                    f"falling back to '{fallback}'"
+                )
+        self.serializer = serializer if available(serializer) else "json"
+        self.compression = compression if available(compression) else "none"
+        self.compress_min_bytes = compress_min_bytes
+        self.compress_level = compress_level
+        self._orjson = _orjson if self.serializer != "json" else None
+        self._msgpack = _import("msgpack") if self.serializer == "msgpack" else None
+        self._compressor = self._make_compressor()
+        self._decompressors: dict[int, Any] = {}
+
+    def dumps_json(self, value: Any) -> bytes:
+        """The value's JSON, as served in HTTP responses and hashed for its ETag."""
+        return dumps_json(value) if self._orjson is not None else json.dumps(value).encode("utf-8")
+
+    def encode(self, value: Any, fresh_until: float | None, etag: str | None, body: bytes | None = None) -> bytes:
+        """Frames a value; `body` is its JSON if already encoded, reused as the payload when possible."""
+        if self._msgpack is not None:
+            payload = self._msgpack.packb(value, use_bin_type=True)
+        else:
+            payload = body if body is not None else self.dumps_json(value)
+        compression = "none"
+        if self._compressor is not None and len(payload) >= self.compress_min_bytes:
+            compressed = self._compressor(payload)
+            if len(compressed) < len(payload):
+                payload, compression = compressed, self.compression
+        etag_bytes = etag.encode("ascii") if etag is not None else b""
+        header = _HEADER.pack(
+            CODEC_MAGIC,
+            CODEC_VERSION,
+            _FORMAT_IDS[self.serializer],
+            _COMPRESSION_IDS[compression],
+            fresh_until if fresh_until is not None else math.nan,
+            len(etag_bytes),
+        )
+        return header + etag_bytes + payload
+
+    def decode(self, raw: bytes) -> tuple[Any, float | None, str | None, bytes | None]:
+        """
+        Returns (value, fresh_until, etag, JSON body or None) from a framed value.
+
+        Any failure to read it, including corrupt compressed data (zlib.error and the zstd/lz4
+        errors aren't ValueErrors), is raised as CodecError.
+        """
+        head = read_head(raw)
+        payload = raw[head.payload_offset :]
+        try:
+            if head.compression:
+                payload = self._decompressor(head.compression)(payload)
+            if head.format == _FORMAT_IDS["msgpack"]:
+                msgpack = self._msgpack or _import_or_fail("msgpack")
+                return msgpack.unpackb(payload, raw=False, strict_map_key=False), head.fresh_until, head.etag, None
+            loads = self._orjson.loads if self._orjson is not None else json.loads
+            return loads(payload), head.fresh_until, head.etag, payload
+        except CodecError:
+            raise
+        except Exception as e:
+            raise CodecError(f"Corrupt {COMPRESSIONS[head.compression]} cache payload: {e!r}") from e
+
+    def _make_compressor(self):
+        if self.compression == "zlib":
+            level = self.compress_level if self.compress_level is not None else 1
+            return lambda data: zlib.compress(data, level)
+        if self.compression == "zstd":
+            compressor = _import("zstd").ZstdCompressor(level=self.compress_level or 3)
+            return compressor.compress
+        if self.compression == "lz4":
+            lz4 = _import("lz4")
+            return lambda data: lz4.compress(data, compression_level=self.compress_level or 0)
+        return None
+
+    def _decompressor(self, compression_id: int):
+        decompress = self._decompressors.get(compression_id)
+        if decompress is None:
+            name = COMPRESSIONS[compression_id]
+            if name == "zlib":
+                decompress = zlib.decompress
+            elif name == "zstd":
+                decompress = _import_or_fail("zstd").ZstdDecompressor().decompress
+            else:
+                decompress = _import_or_fail("lz4").decompress
+            self._decompressors[compression_id] = decompress
+        return decompress
+
+
+def is_framed(raw: bytes) -> bool:
+    return raw[:1] == bytes((CODEC_MAGIC,))
+
+
+def read_head(raw: bytes) -> FrameHead:
+    """Parses a frame's header and etag, which is all that get_etag() needs; `raw` may be just its first bytes."""
+    if len(raw) < _HEADER.size or not is_framed(raw):
+        raise CodecError("Not a framed cache value")
+    _, version, format_id, compression_id, fresh_until, etag_length = _HEADER.unpack_from(raw)
+    if version != CODEC_VERSION:
+        raise CodecError(f"Unsupported cache codec version {version}")
+    if format_id not in _FORMAT_IDS.values() or compression_id >= len(COMPRESSIONS):
+        raise CodecError(f"Unknown cache payload format {format_id} or compression {compression_id}")
+    end = _HEADER.size + etag_length
+    if len(raw) < end:
+        raise CodecError("Truncated cache value header")
+    etag = raw[_HEADER.size : end].decode("ascii") if etag_length else None
+    return FrameHead(format_id, compression_id, None if math.isnan(fresh_until) else fresh_until, etag, end)
+
+
+def _import_or_fail(name: str):
+    if not available(name):
+        raise CodecError(f"Cache value needs the '{_package(name)}' package, which is not installed")
+    return _import(name)
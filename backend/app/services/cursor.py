@@ -0,0 +1,67 @@
+import base64
+import binascii
+import json
+from typing import Any
+
+from app.services.pokedex_index import SORT_FIELDS, TYPE_MATCH_MODES
+
+CURSOR_VERSION = 1
+MAX_PAGE_SIZE = 100  # Matches the limit bound of GET /pokemon
+
+# Every list query parameter a cursor carries, with its default
+LIST_PARAMS: dict[str, Any] = {
+    "search": None,
+    "types": None,
+    "stats": None,
+    "limit": 20,
+    "offset": 0,
+    "sort": None,
+    "order": "desc",
+    "match": "all",
+}
+
+
+class InvalidCursor(ValueError):
+    """A cursor that wasn't issued by us, was truncated, or is from an incompatible version."""
+
+
+def encode_cursor(params: dict[str, Any]) -> str:
+    """
+    An opaque token for the list query `params`, positioned at its offset.
+
+    The token carries the query itself, so it stays valid after the cached result set it
+    pages through expires: the set is then recomputed. Defaults are left out to keep it short.
+    """
+    compact = {name: value for name, value in params.items() if LIST_PARAMS.get(name) != value}
+    payload = json.dumps({"v": CURSOR_VERSION, **compact}, separators=(",", ":"), sort_keys=True)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(token: str) -> dict[str, Any]:
+    """Returns the list query parameters a cursor stands for, validated as the list endpoint would."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor("Malformed cursor")
+    if not isinstance(payload, dict) or payload.pop("v", None) != CURSOR_VERSION:
+        raise InvalidCursor("Unsupported cursor version")
+    if not payload.keys() <= LIST_PARAMS.keys():
+        raise InvalidCursor("Unknown cursor fields")
+    params = {**LIST_PARAMS, **payload}
+
+    valid = (
+        isinstance(params["limit"], int)
+        and 1 <= params["limit"] <= MAX_PAGE_SIZE
+        and isinstance(params["offset"], int)
+        and params["offset"] >= 0
+        and params["order"] in ("asc", "desc")
+        and params["match"] in TYPE_MATCH_MODES
+        and (params["sort"] is None or params["sort"] in SORT_FIELDS)
+        and (params["search"] is None or isinstance(params["search"], str))
+        and (params["types"] is None or isinstance(params["types"], list))
+        and all(isinstance(t, str) for t in params["types"] or [])
+        and (params["stats"] is None or isinstance(params["stats"], dict))
+    )
+    if not valid:
+        raise InvalidCursor("Invalid cursor parameters")
+    return params
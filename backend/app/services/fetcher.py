@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import random
+import time
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import httpx
+from app.core.config import settings
+from app.services.breaker import CircuitBreaker
+from app.services.metrics import upstream_errors, upstream_in_flight, upstream_seconds
+
+logger = logging.getLogger(__name__)
+
+# Upstream statuses worth retrying; anything else is returned to the caller as-is
+RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+# Upstream statuses that count as failures towards opening the circuit breaker; 4xx (including 429)
+# means upstream is up and answering
+FAILURE_STATUSES = range(500, 600)
+# Set inside prefetch jobs, so every upstream request they make (however deeply nested) counts as speculative
+speculative: ContextVar[bool] = ContextVar("speculative", default=False)
+
+
+class UpstreamUnavailable(httpx.TransportError):
+    """Raised instead of calling PokeAPI while its circuit breaker is open."""
+
+    def __init__(self, message: str, retry_after: int = 0):
+        super().__init__(message)
+        self.retry_after = retry_after  # Seconds until the breaker lets a probe through
+
+
+class TokenBucket:
+    """Token-bucket rate limiter: `rate` tokens per second, bursting up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Waits until a token is available and takes it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class UpstreamFetcher:
+    """
+    Schedules GET requests to upstream hosts with bounded concurrency, per-host
+    token-bucket rate limiting and jittered exponential retry honouring Retry-After.
+
+    Every attempt reports to a circuit breaker: transport errors (including timeouts)
+    and 5xx responses count as failures, and while the circuit is open requests raise
+    UpstreamUnavailable at once rather than waiting out timeouts and backoff.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 20,
+        rate_limit: float = 50.0,
+        rate_burst: int = 50,
+        max_retries: int = 3,
+        backoff_base: float = 0.25,
+        backoff_max: float = 10.0,
+        breaker: CircuitBreaker | None = None,
+    ):
+        self.max_in_flight = max_in_flight
+        self.rate_limit = rate_limit  # Requests per second per host; <= 0 disables limiting
+        self.rate_burst = rate_burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker if breaker is not None else CircuitBreaker("pokeapi")
+        self.in_flight = 0
+        self.speculative_in_flight = 0  # Of in_flight, requests made from prefetch jobs
+        # asyncio primitives are bound to the loop they are first used on, so they are
+        # created lazily per running loop
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._buckets: dict[str, TokenBucket] = {}
+
+    @classmethod
+    def from_settings(cls) -> "UpstreamFetcher":
+        return cls(
+            max_in_flight=settings.upstream_max_in_flight,
+            rate_limit=settings.upstream_rate_limit,
+            rate_burst=settings.upstream_rate_burst,
+            max_retries=settings.upstream_max_retries,
+            backoff_base=settings.upstream_backoff_base,
+            backoff_max=settings.upstream_backoff_max,
+            breaker=CircuitBreaker("pokeapi", settings.breaker_failure_threshold, settings.breaker_reset_timeout),
+        )
+
+    def _bind_loop(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._semaphore is None:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._buckets = {}
+        return self._semaphore
+
+    def _bucket_for(self, url: str) -> TokenBucket | None:
+        if self.rate_limit <= 0:
+            return None
+        host = urlsplit(url).netloc
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rate_limit, self.rate_burst)
+        return self._buckets[host]
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given (zero-based) retry attempt."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    async def get(self, client: httpx.AsyncClient, url: str) -> httpx.Response:
+        """
+        GETs `url`, retrying transport errors and retryable statuses.
+
+        The final response is returned without raising for status, so callers keep
+        their own `raise_for_status()` handling. Transport errors are re-raised once
+        retries are exhausted, and UpstreamUnavailable is raised (also between retries)
+        while the circuit breaker is open.
+        """
+        semaphore = self._bind_loop()
+        bucket = self._bucket_for(url)
+        counted = speculative.get()
+
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise UpstreamUnavailable(f"PokeAPI circuit is open; not requesting {url}", self.breaker.retry_after)
+            if bucket is not None:
+                await bucket.acquire()
+            try:
+                async with semaphore:
+                    self.in_flight += 1
+                    self.speculative_in_flight += counted
+                    upstream_in_flight.inc()
+                    try:
+                        with upstream_seconds.time():
+                            response = await client.get(url)
+                    finally:
+                        self.in_flight -= 1
+                        self.speculative_in_flight -= counted
+                        upstream_in_flight.dec()
+            except httpx.TransportError as e:
+                upstream_errors.inc("transport")
+                self.breaker.record_failure()
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"Upstream {type(e).__name__} for {url}; retrying in {delay:.2f}s")
+            else:
+                if not response.is_success:
+                    upstream_errors.inc(str(response.status_code))
+                if response.status_code in FAILURE_STATUSES:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                if response.status_code not in RETRYABLE_STATUSES or attempt >= self.max_retries:
+                    return response
+                retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is not None and retry_after > self.backoff_max:
+                    logger.warning(f"Upstream asked to retry {url} after {retry_after:.0f}s; giving up")
+                    return response
+                delay = retry_after if retry_after is not None else self._backoff(attempt)
+                logger.warning(f"Upstream {response.status_code} for {url}; retrying in {delay:.2f}s")
+
+            attempt += 1
+            await asyncio.sleep(delay)
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    """Parses a Retry-After header given either as seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# Shared, process-wide fetcher so concurrency and rate limits apply across requests
+upstream_fetcher = UpstreamFetcher.from_settings()
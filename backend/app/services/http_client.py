@@ -0,0 +1,23 @@
+import importlib.util
+import logging
+
+import httpx
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Creates the application-lifetime HTTP client used for all PokeAPI traffic."""
+    http2 = settings.http2_enabled
+    if http2 and importlib.util.find_spec("h2") is None:
+        # HTTP/2 support is an optional extra: pip install "httpx[http2]"
+        logger.warning("HTTP/2 requested but the 'h2' package is not installed; falling back to HTTP/1.1")
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry,
+    )
+    return httpx.AsyncClient(timeout=settings.http_timeout, limits=limits, http2=http2)
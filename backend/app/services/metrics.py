@@ -0,0 +1,217 @@
+import bisect
+import time
+from collections.abc import Callable
+
+# Upper bounds, in seconds, of the latency histogram buckets: sub-millisecond L1/filter work up to slow upstream calls
+LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+
+    def _label_text(self, values: tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labels, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *self.samples()]
+
+
+class Counter(_Metric):
+    """A monotonically increasing count, per combination of label values."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def set(self, value: float, *label_values: str) -> None:
+        """Overwrites the value, for counts kept elsewhere and copied in when metrics are rendered."""
+        self._values[label_values] = value
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def samples(self) -> list[str]:
+        return [f"{self.name}{self._label_text(values)} {_number(v)}" for values, v in sorted(self._values.items())]
+
+
+class Gauge(Counter):
+    """A value that goes up and down, such as requests in flight."""
+
+    kind = "gauge"
+
+    def dec(self, *label_values: str, amount: float = 1.0) -> None:
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram(_Metric):
+    """
+    Latency observations in cumulative buckets, per combination of label values.
+
+    An observation is one bisect and two additions, cheap enough to time every Redis
+    call and every (de)serialization in production.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = buckets
+        # label values -> (per-bucket counts with a final +Inf bucket, [sum, count])
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = ([0] * (len(self.buckets) + 1), [0.0, 0])
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+        series[1][1] += 1
+
+    def time(self, *label_values: str) -> "_Timer":
+        """A context manager observing how long its block takes."""
+        return _Timer(self, label_values)
+
+    def count(self, *label_values: str) -> int:
+        series = self._series.get(label_values)
+        return int(series[1][1]) if series is not None else 0
+
+    def samples(self) -> list[str]:
+        lines = []
+        for values, (counts, (total, count)) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{self._label_text(values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_text(values)} {_number(total)}")
+            lines.append(f"{self.name}_count{self._label_text(values)} {int(count)}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "label_values", "started")
+
+    def __init__(self, histogram: Histogram, label_values: tuple[str, ...]):
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def __enter__(self) -> None:
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self.histogram.observe(time.perf_counter() - self.started, *self.label_values)
+
+
+class MetricsRegistry:
+    """
+    The process's metrics, rendered in the Prometheus text exposition format.
+
+    Values are per worker process; Prometheus sums them across workers (scrape each
+    one, or aggregate by instance).
+    """
+
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Callable[[], None]] = []
+
+    def counter(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Histogram:
+        return self._register(Histogram(name, help, labels))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def on_render(self, collect: Callable[[], None]) -> None:
+        """Runs `collect` before every render, to copy in values that are tracked elsewhere (e.g. cache sizes)."""
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        for collect in self._collectors:
+            collect()
+        return "\n".join(line for metric in self._metrics for line in metric.render()) + "\n"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def cache_namespace(key: str) -> str:
+    """The namespace label of a cache key: `pokemon_list:...` is "list", `pokemon_types` is "types"."""
+    return key.partition(":")[0].removeprefix("pokemon_")
+
+
+# Shared, process-wide registry and the metrics every stage records into
+registry = MetricsRegistry()
+
+redis_seconds = registry.histogram("pokedex_redis_seconds", "Redis command latency", ("op",))
+redis_errors = registry.counter("pokedex_redis_errors_total", "Failed Redis commands, served as misses", ("op",))
+upstream_seconds = registry.histogram("pokedex_upstream_seconds", "PokeAPI request latency, per attempt")
+upstream_in_flight = registry.gauge("pokedex_upstream_in_flight", "PokeAPI requests currently in flight")
+upstream_errors = registry.counter(
+    "pokedex_upstream_errors_total", "Failed PokeAPI attempts, by HTTP status or 'transport'", ("status",)
+)
+filter_seconds = registry.histogram("pokedex_filter_seconds", "Time to resolve a list query's result set", ("path",))
+serialization_seconds = registry.histogram(
+    "pokedex_serialization_seconds", "Time to encode or decode values: JSON, and the cache codec's frames", ("op",)
+)
+cache_lookups = registry.counter(
+    "pokedex_cache_lookups_total", "Cache lookups by namespace and result (hit, stale or miss)", ("namespace", "result")
+)
+circuit_open = registry.gauge(
+    "pokedex_circuit_open", "1 while a dependency's circuit breaker is open (or half-open), else 0", ("dependency",)
+)
+circuit_rejections = registry.counter(
+    "pokedex_circuit_rejections_total", "Calls failed fast because a dependency's circuit was open", ("dependency",)
+)
+local_cache_entries = registry.gauge("pokedex_local_cache_entries", "Entries in this worker's in-process (L1) cache")
+local_cache_lookups = registry.counter(
+    "pokedex_local_cache_lookups_total", "In-process (L1) cache lookups by result (hit or miss)", ("result",)
+)
+local_cache_evictions = registry.counter(
+    "pokedex_local_cache_evictions_total", "In-process (L1) cache entries evicted to stay within MAX_CACHE_SIZE"
+)
@@ -0,0 +1,169 @@
+import heapq
+from collections import Counter, defaultdict
+from collections.abc import Sequence
+from typing import NamedTuple
+
+import numpy as np
+
+FUZZY_MIN_LENGTH = 3  # Shorter queries only get exact, prefix and substring matches
+FUZZY_CANDIDATES = 20  # Names sharing the most trigrams with the query that get an edit-distance check
+
+# Match kinds, best first
+MATCH_KINDS = ("exact", "prefix", "substring", "fuzzy")
+
+_NO_ROWS = np.empty(0, dtype=np.int32)
+
+
+class Suggestion(NamedTuple):
+    row: int
+    match: str  # One of MATCH_KINDS
+    distance: int  # Edit distance for fuzzy matches, 0 otherwise
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _padded_trigrams(text: str) -> set[str]:
+    # Leading padding gives the start of a name extra weight, so typos later in it still share grams
+    return _trigrams(f"  {text} ")
+
+
+def _max_typos(query: str) -> int:
+    """Edit distance tolerated for a query: one typo for short queries, two for longer ones."""
+    return 1 if len(query) <= 5 else 2
+
+
+def edit_distance(a: str, b: str, max_distance: int, prefix: bool = False) -> int:
+    """
+    Optimal string alignment distance between `a` and `b` (adjacent swaps count as one edit).
+
+    With `prefix`, returns the distance from `a` to the closest prefix of `b` instead, so a
+    partly typed name still matches. Only a band of width `max_distance` around the diagonal
+    is computed; any distance above `max_distance` is reported as `max_distance + 1`.
+    """
+    too_far = max_distance + 1
+    if prefix:
+        b = b[: len(a) + max_distance]
+    elif abs(len(a) - len(b)) > max_distance:
+        return too_far
+
+    before: list[int] = []
+    previous = [j if j <= max_distance else too_far for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        char = a[i - 1]
+        current = [too_far] * (len(b) + 1)
+        if i <= max_distance:
+            current[0] = i
+        row_min = current[0]
+        for j in range(max(1, i - max_distance), min(len(b), i + max_distance) + 1):
+            best = previous[j - 1] + (char != b[j - 1])
+            if previous[j] + 1 < best:
+                best = previous[j] + 1
+            if current[j - 1] + 1 < best:
+                best = current[j - 1] + 1
+            if before and j > 1 and char == b[j - 2] and a[i - 2] == b[j - 1] and before[j - 2] + 1 < best:
+                best = before[j - 2] + 1
+            current[j] = best
+            if best < row_min:
+                row_min = best
+        if row_min > max_distance:
+            return too_far
+        before, previous = previous, current
+
+    distance = min(previous[max(0, len(a) - max_distance) :]) if prefix else previous[-1]
+    return min(distance, too_far)
+
+
+class NameIndex:
+    """
+    Trigram inverted index over Pokémon names, for substring, prefix and typo-tolerant lookups.
+
+    Postings are sorted arrays of row numbers, so a substring query is an intersection of
+    a few short arrays followed by a check of the surviving candidates.
+    """
+
+    def __init__(self, names: Sequence[str]):
+        self._names = [name.lower() for name in names]
+        postings: dict[str, list[int]] = defaultdict(list)
+        for row, name in enumerate(self._names):
+            for gram in _padded_trigrams(name):
+                postings[gram].append(row)
+        self._postings = {gram: np.array(rows, dtype=np.int32) for gram, rows in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def substring(self, query: str) -> np.ndarray:
+        """Returns the rows whose name contains `query`, in row order."""
+        query = query.lower()
+        grams = _trigrams(query)
+        if not grams:
+            # One or two characters: too short for trigrams, and a scan of ~1k names is cheap
+            return np.array([row for row, name in enumerate(self._names) if query in name], dtype=np.intp)
+
+        postings = sorted((self._postings.get(gram, _NO_ROWS) for gram in grams), key=len)
+        rows = postings[0]
+        for other in postings[1:]:
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return np.array([row for row in rows.tolist() if query in self._names[row]], dtype=np.intp)
+
+    def suggest(self, query: str, limit: int = 10) -> list[Suggestion]:
+        """
+        Ranks names against `query`: exact, then prefix, then substring (earlier is better),
+        then fuzzy matches by edit distance. Ties go to the shorter name, then alphabetically.
+        """
+        query = query.strip().lower()
+        if not query or limit <= 0:
+            return []
+
+        ranked: dict[int, tuple[int, int, int, str]] = {}  # row -> sort key
+        if len(query) < 3:
+            # Too short to say much as a substring; suggest names starting with it, via the padded grams
+            rows = self._postings.get(f"  {query}"[-3:], _NO_ROWS).tolist()
+            rows = [row for row in rows if self._names[row].startswith(query)]
+        else:
+            rows = self.substring(query).tolist()
+        for row in rows:
+            name = self._names[row]
+            position = name.find(query)
+            kind = 0 if name == query else 1 if position == 0 else 2
+            ranked[row] = (kind, position, len(name), name)
+
+        if len(ranked) < limit and len(query) >= FUZZY_MIN_LENGTH:
+            max_distance = _max_typos(query)
+            grams = _padded_trigrams(query)
+            shared = Counter()
+            for gram in grams:
+                shared.update(self._postings.get(gram, _NO_ROWS).tolist())
+            # Each edit breaks at most three trigrams, so names sharing fewer can't be close enough
+            min_shared = max(1, len(grams) - 3 * max_distance - 1)
+            candidates = (row for row, count in shared.items() if count >= min_shared and row not in ranked)
+            for row in heapq.nlargest(FUZZY_CANDIDATES, candidates, key=lambda row: shared[row]):
+                name = self._names[row]
+                distance = edit_distance(query, name, max_distance, prefix=True)
+                if distance <= max_distance:
+                    ranked[row] = (3, distance, len(name), name)
+
+        best = heapq.nsmallest(limit, ranked.items(), key=lambda item: item[1])
+        return [Suggestion(row, MATCH_KINDS[key[0]], key[1] if key[0] == 3 else 0) for row, key in best]
+
+
+class NameIndexMemo:
+    """Holds the NameIndex built from one version of a name listing, identified by that listing's ETag."""
+
+    def __init__(self):
+        self._etag: str | None = None
+        self._index: NameIndex | None = None
+
+    def get(self, etag: str | None, names: Sequence[str]) -> NameIndex:
+        """The index for `names`, rebuilt only when `etag` changes; listings without an ETag are never kept."""
+        if etag is None:
+            return NameIndex(names)
+        if self._index is None or etag != self._etag:
+            self._index, self._etag = NameIndex(names), etag
+        return self._index
+
+
+# Autocomplete's fallback index over the cached reference listing, used until the Pokédex index is warm
+fallback_names = NameIndexMemo()
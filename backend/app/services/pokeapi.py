@@ -1,83 +1,502 @@
 import asyncio
 import json
 import logging
-from typing import Any
+import re
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any, TypeVar
 
 import httpx
-import redis.asyncio as redis
 from app.core.config import settings
+from app.schemas.pokemon import PokemonDetail
+from app.services.background import background
+from app.services.breaker import CLOSED
+from app.services.cache import CacheEntry, TieredCache
+from app.services.cache import cache as default_cache
+from app.services.cursor import encode_cursor
+from app.services.fetcher import UpstreamFetcher, UpstreamUnavailable, upstream_fetcher
+from app.services.metrics import cache_lookups, cache_namespace, filter_seconds
+from app.services.name_index import fallback_names
+from app.services.pokedex_index import PokedexIndex, pokedex_index
+from app.services.prefetcher import Prefetcher, prefetcher
+from app.services.projection import project
+from app.services.query import canonical_filters
+from app.services.refresher import HotKeyTracker, hot_keys
+from app.services.singleflight import SingleFlight, flights
 
 logger = logging.getLogger(__name__)
 
-# Create a Redis connection pool
-redis_pool = redis.from_url(settings.redis_url, encoding="utf-8", decode_responses=True)
+_POKEMON_URL_ID = re.compile(r"/pokemon/(\d+)/?$")
+_POKEMON_NAME = re.compile(r"^[a-z0-9][a-z0-9-]*$")  # A normalized name or id, safe to put into a URL
+
+_REFERENCES_KEY = "pokemon_references"
+_TYPES_KEY = "pokemon_types"
+
+STREAM_BATCH_SIZE = 50  # Pokémon resolved per batch when streaming without the index
+
+_LOCK_POLL_INTERVAL = 0.05  # Seconds between cache checks while another worker holds a refresh lock
+
+T = TypeVar("T")
 
 
 class PokeAPIService:
-    """Service for interacting with the PokeAPI, with Redis caching."""
+    """Service for interacting with the PokeAPI, with two-tier (in-process + Redis) caching."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        index: PokedexIndex | None = None,
+        client: httpx.AsyncClient | None = None,
+        fetcher: UpstreamFetcher | None = None,
+        cache: TieredCache | None = None,
+        flight_group: SingleFlight | None = None,
+        tracker: HotKeyTracker | None = None,
+        page_prefetcher: Prefetcher | None = None,
+    ):
         self.base_url = settings.pokeapi_base_url # Base URL for PokeAPI
         self.timeout = settings.http_timeout # Timeout for HTTP requests
         self.cache_ttl = settings.cache_ttl  # Use TTL from settings
+        self.index = index if index is not None else pokedex_index  # In-memory roster, once warm
+        self.client = client  # Shared, pooled client owned by the app lifespan (if any)
+        self.fetcher = fetcher if fetcher is not None else upstream_fetcher  # Bounded, retrying GETs
+        self.cache = cache if cache is not None else default_cache  # Local LRU in front of Redis
+        self.flights = flight_group if flight_group is not None else flights  # Coalesces concurrent misses
+        self.hot_keys = tracker if tracker is not None else hot_keys  # Most requested keys, for re-warming
+        self.prefetcher = page_prefetcher if page_prefetcher is not None else prefetcher  # Speculative warm-ups
+
+    @asynccontextmanager
+    async def _client(self) -> AsyncIterator[httpx.AsyncClient]:
+        """Yields the shared HTTP client, or a short-lived one when none was injected."""
+        if self.client is not None:
+            yield self.client
+        else:
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                yield client
 
     async def _get_pokemon_for_type(
         self, client: httpx.AsyncClient, type_name: str
     ) -> list[dict[str, str]]:
         """Fetches a list of pokemon references for a given type from the PokeAPI."""
-        response = await client.get(f"{self.base_url}/type/{type_name}")
+        response = await self.fetcher.get(client, f"{self.base_url}/type/{type_name}")
         response.raise_for_status()
         return [p["pokemon"] for p in response.json()["pokemon"]]
 
+    async def _load_type_members(self, type_name: str) -> list[dict[str, str]]:
+        async with self._client() as client:
+            members = await self._get_pokemon_for_type(client, type_name)
+        await self.cache.set(_type_key(type_name), members, self.cache_ttl)
+        return members
+
+    async def get_type_members(self, type_name: str) -> list[dict[str, str]]:
+        """The name/url reference of every Pokémon with a type, cached so each type is fetched once."""
+        key = _type_key(type_name)
+        return await self._serve_cached(
+            key,
+            lambda: self.cache.get_entry(key),
+            lambda: self._load_type_members(type_name),
+        )
+
+    async def _serve_cached(
+        self,
+        key: str,
+        read_entry: Callable[[], Awaitable[CacheEntry | None]],
+        loader: Callable[[], Awaitable[T]],
+    ) -> T:
+        """
+        Serves `key` from the cache, or loads it once on a miss.
+
+        Stale entries (past their soft TTL) are returned immediately while a background
+        task reloads them, so user-facing latency doesn't include PokeAPI.
+        """
+        return (await self._serve_cached_entry(key, read_entry, loader)).value
+
+    async def _serve_cached_entry(
+        self,
+        key: str,
+        read_entry: Callable[[], Awaitable[CacheEntry | None]],
+        loader: Callable[[], Awaitable[T]],
+    ) -> CacheEntry:
+        """Like _serve_cached(), but returns the cache entry, so callers also get its ETag."""
+
+        async def read_fresh() -> T | None:
+            entry = await read_entry()
+            return entry.value if entry is not None and not entry.stale else None
+
+        # Re-warming goes through _load_once too, so it joins a user-triggered load rather than duplicating it
+        self.hot_keys.record(key, read_entry, lambda: self._load_once(key, loader, read_fresh))
+
+        entry = await read_entry()
+        if entry is not None:
+            logger.info(f"Cache {'stale hit' if entry.stale else 'hit'} for key: {key}")
+            cache_lookups.inc(cache_namespace(key), "stale" if entry.stale else "hit")
+            if entry.stale:
+                background.spawn(self._load_once(key, loader, read_fresh), name=f"refresh:{key}")
+            return entry
+
+        logger.info(f"Cache miss for key: {key}")
+        cache_lookups.inc(cache_namespace(key), "miss")
+        value = await self._load_once(key, loader, read_fresh)
+        # The loader normally cached the value, and with it its ETag, in L1
+        entry = await read_entry()
+        if entry is None or entry.value is not value:
+            entry = CacheEntry.uncached(value)
+        return entry
+
+    async def _load_once(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[T]],
+        recheck: Callable[[], Awaitable[T | None]],
+    ) -> T:
+        """
+        Runs `loader` for a cache miss at most once per worker for concurrent callers of `key`.
+
+        With cache_lock_enabled, a short-lived Redis lock also makes other workers wait for
+        the holder to fill the cache (polling `recheck`) instead of refetching themselves.
+        """
+        return await self.flights.do(key, lambda: self._load_with_lock(key, loader, recheck))
+
+    async def _load_with_lock(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[T]],
+        recheck: Callable[[], Awaitable[T | None]],
+    ) -> T:
+        if not settings.cache_lock_enabled:
+            return await loader()
+
+        token = await self.cache.acquire_lock(key, settings.cache_lock_ttl)
+        if token is not None:
+            try:
+                return await loader()
+            finally:
+                await self.cache.release_lock(key, token)
+
+        # Another worker is refreshing this key; wait for it to land in the cache
+        deadline = asyncio.get_running_loop().time() + settings.cache_lock_wait
+        while asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(_LOCK_POLL_INTERVAL)
+            cached = await recheck()
+            if cached is not None:
+                logger.info(f"Filled by another worker: {key}")
+                return cached
+        logger.warning(f"Timed out waiting for another worker to fill {key}; fetching it here")
+        return await loader()
+
+    async def _get_cached_entities(self, ids: list[int]) -> list[dict[str, Any] | None]:
+        """Reads many Pokémon entities from the cache, with at most one Redis MGET round trip."""
+        if not ids:
+            return []
+        return await self.cache.mget([_entity_key(pokemon_id) for pokemon_id in ids])
+
+    async def _cache_entities(self, entities: list[dict[str, Any]]) -> None:
+        """Writes Pokémon entities and their name aliases to the cache in one pipeline."""
+        if not entities:
+            return
+        items: dict[str, Any] = {}
+        for entity in entities:
+            items[_entity_key(entity["id"])] = entity
+            items[_alias_key(entity["name"])] = entity["id"]
+        await self.cache.set_many(items, self.cache_ttl)
+        logger.info(f"Cached {len(entities)} Pokémon entities")
+
+    async def _fetch_pokemon_entities(
+        self, client: httpx.AsyncClient, urls: list[str]
+    ) -> list[dict[str, Any] | None]:
+        """
+        Resolves Pokémon entities (projected to PokemonDetail) for the given detail URLs, in order.
+
+        Cached entities are read with one MGET; only the misses go upstream, and
+        they are written back in one pipeline. Entries that can't be fetched are None.
+        """
+        ids = [_id_from_url(url) for url in urls]
+        known = [(i, pokemon_id) for i, pokemon_id in enumerate(ids) if pokemon_id is not None]
+        entities: list[dict[str, Any] | None] = [None] * len(urls)
+        for (i, _), entity in zip(known, await self._get_cached_entities([pid for _, pid in known])):
+            entities[i] = entity
+
+        misses = [i for i, entity in enumerate(entities) if entity is None]
+
+        async def fetch(url: str) -> dict[str, Any] | None:
+            try:
+                response = await self.fetcher.get(client, url)
+                response.raise_for_status()
+                return project(response.json(), PokemonDetail)
+            except httpx.HTTPError as e:
+                logger.warning(f"Failed to fetch Pokémon details from {url}: {e!r}")
+                return None
+
+        # Concurrent pages needing the same Pokémon share one upstream request
+        fetched = await asyncio.gather(
+            *(self.flights.do(f"upstream:{urls[i]}", lambda url=urls[i]: fetch(url)) for i in misses)
+        )
+        for i, entity in zip(misses, fetched):
+            entities[i] = entity
+        await self._cache_entities([entity for entity in fetched if entity is not None])
+
+        return entities
+
+    async def _fetch_many_details(
+        self, client: httpx.AsyncClient, urls: list[str]
+    ) -> list[dict[str, Any] | None]:
+        """Fetches and shapes details for many Pokémon, in order; None where one can't be fetched."""
+        entities = await self._fetch_pokemon_entities(client, urls)
+        return [_shape_summary(entity) if entity is not None else None for entity in entities]
+
     async def _fetch_pokemon_details(
         self, client: httpx.AsyncClient, url: str
     ) -> dict[str, Any] | None:
-        """Fetches and shapes full details for a single Pokémon from API."""
-        try:
-            response = await client.get(url)
+        """Fetches and shapes full details for a single Pokémon; None if it can't be fetched."""
+        return (await self._fetch_many_details(client, [url]))[0]
+
+    async def list_pokemon_references(self) -> list[dict[str, str]]:
+        """Fetches the name/url reference for every Pokémon."""
+        async with self._client() as client:
+            response = await self.fetcher.get(client, f"{self.base_url}/pokemon?limit=2000")
             response.raise_for_status()
-            details = response.json()
-
-            # Extract stats for filtering
-            stats = {}
-            for stat in details["stats"]:
-                stat_name = stat["stat"]["name"]
-                stats[stat_name] = stat["base_stat"]
-
-            return {
-                "id": details["id"],
-                "name": details["name"],
-                "types": [t["type"]["name"] for t in details["types"]],
-                "sprites": {"front_default": details["sprites"]["front_default"]},
-                "stats": stats,
-            }
-        except httpx.HTTPStatusError:
+            return response.json()["results"]
+
+    async def _load_pokemon_references(self) -> list[dict[str, str]]:
+        references = await self.list_pokemon_references()
+        await self.cache.set(_REFERENCES_KEY, references, self.cache_ttl)
+        return references
+
+    async def get_pokemon_references(self) -> list[dict[str, str]]:
+        """The name/url reference for every Pokémon, cached so searches don't re-download the full listing."""
+        return await self._serve_cached(
+            _REFERENCES_KEY,
+            lambda: self.cache.get_entry(_REFERENCES_KEY),
+            self._load_pokemon_references,
+        )
+
+    async def fetch_summaries(self, urls: list[str]) -> list[dict[str, Any] | None]:
+        """Fetches shaped summaries for the given detail URLs, in order; None where one can't be fetched."""
+        async with self._client() as client:
+            return await self._fetch_many_details(client, urls)
+
+    async def fetch_roster(self) -> list[dict[str, Any]]:
+        """Fetches shaped summaries for every Pokémon, used to build the in-memory index."""
+        batch_size = settings.index_build_concurrency
+        urls = [p["url"] for p in await self.list_pokemon_references()]
+
+        details: list[dict[str, Any] | None] = []
+        for start in range(0, len(urls), batch_size):
+            details.extend(await self.fetch_summaries(urls[start : start + batch_size]))
+
+        roster = [p for p in details if p is not None]
+        if len(roster) < len(urls) and self.fetcher.breaker.state != CLOSED:
+            # PokeAPI went down mid-build; keep serving the previous index (or snapshot) over a partial one
+            raise UpstreamUnavailable(f"PokeAPI became unavailable after {len(roster)}/{len(urls)} Pokémon")
+        logger.info(f"Fetched roster of {len(roster)}/{len(urls)} Pokémon")
+        return roster
+
+    async def _load_pokemon_types(self) -> list[dict[str, str]]:
+        if self.index.type_names:
+            # Loaded from a snapshot: every type is already known locally
+            types = [{"name": name} for name in self.index.type_names]
+        else:
+            async with self._client() as client:
+                response = await self.fetcher.get(client, f"{self.base_url}/type")
+                response.raise_for_status()
+                data = response.json()
+            types = [{"name": t["name"]} for t in data["results"]]
+
+        await self.cache.set(_TYPES_KEY, types, self.cache_ttl)
+        return types
+
+    async def get_pokemon_types_entry(self) -> CacheEntry:
+        """The names of all Pokémon types, as a cache entry carrying their ETag."""
+        return await self._serve_cached_entry(
+            _TYPES_KEY,
+            lambda: self.cache.get_entry(_TYPES_KEY),
+            self._load_pokemon_types,
+        )
+
+    async def get_pokemon_types_etag(self) -> str | None:
+        """The ETag get_pokemon_types_entry() would return with, or None when the type list isn't freshly cached."""
+        return await self.cache.get_etag(_TYPES_KEY)
+
+    async def get_pokemon_types(self) -> list[dict[str, str]]:
+        """Fetch the names of all Pokémon types (cached; from the index when it was loaded from a snapshot)."""
+        return (await self.get_pokemon_types_entry()).value
+
+    async def unknown_types(self, types: list[str] | None) -> list[str]:
+        """
+        The requested types that aren't Pokémon types, checked against the type list so that
+        the answer doesn't depend on whether the index is warm.
+        """
+        if not types:
+            return []
+        known = {t["name"] for t in await self.get_pokemon_types()}
+        return [t for t in types if t.strip() and t.strip().lower() not in known]
+
+    async def _resolve_id(self, name_or_id: str) -> int | None:
+        """Maps a name or id to the canonical Pokémon id, via the index or the alias cache."""
+        if name_or_id.isdigit():
+            return int(name_or_id)
+        summary = self.index.get(name_or_id) if self.index.ready else None
+        if summary is not None:
+            return summary["id"]
+        alias = await self.cache.get(_alias_key(name_or_id))
+        return int(alias) if alias is not None else None
+
+    async def _get_cached_detail(self, name_or_id: str) -> CacheEntry | None:
+        pokemon_id = await self._resolve_id(name_or_id)
+        if pokemon_id is None:
             return None
+        return (await self.cache.mget_entries([_entity_key(pokemon_id)]))[0]
 
-    async def get_pokemon_detail(self, name_or_id: str) -> dict[str, Any]:
-        """Fetch a single Pokémon detail (cached)."""
-        cache_key = f"pokemon_detail:{name_or_id}"
-        try:
-            cached = await redis_pool.get(cache_key)
-            if cached:
-                logger.info(f"Detail cache hit: {cache_key}")
-                return json.loads(cached)
-        except Exception as e:
-            logger.error(f"Redis GET failed: {e}")
-
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(f"{self.base_url}/pokemon/{name_or_id}")
+    async def _load_pokemon_detail(self, name_or_id: str) -> dict[str, Any]:
+        async with self._client() as client:
+            response = await self.fetcher.get(client, f"{self.base_url}/pokemon/{name_or_id}")
             response.raise_for_status()
-            data = response.json()
-
-        try:
-            await redis_pool.setex(cache_key, self.cache_ttl, json.dumps(data))
-            logger.info(f"Detail cached: {cache_key}")
-        except Exception as e:
-            logger.error(f"Redis SETEX failed: {e}")
+            # Only what PokemonDetail describes is kept; moves, game indices etc. are dropped before caching
+            data = project(response.json(), PokemonDetail)
 
+        await self._cache_entities([data])
         return data
 
+    async def get_pokemon_detail_entry(self, name_or_id: str) -> CacheEntry:
+        """A single Pokémon detail as a cache entry, carrying its ETag and pre-encoded JSON body."""
+        name_or_id = name_or_id.lower()
+        return await self._serve_cached_entry(
+            f"pokemon_detail:{name_or_id}",
+            lambda: self._get_cached_detail(name_or_id),
+            lambda: self._load_pokemon_detail(name_or_id),
+        )
+
+    async def get_pokemon_detail(self, name_or_id: str) -> dict[str, Any]:
+        """Fetch a single Pokémon detail (cached per canonical id, shared with list pages)."""
+        return (await self.get_pokemon_detail_entry(name_or_id)).value
+
+    async def get_pokemon_detail_etag(self, name_or_id: str) -> str | None:
+        """The ETag of a freshly cached detail, read from cache metadata alone; None if not cached."""
+        pokemon_id = await self._resolve_id(name_or_id.lower())
+        return await self.cache.get_etag(_entity_key(pokemon_id)) if pokemon_id is not None else None
+
+    async def get_pokemon_batch(self, identifiers: list[str]) -> list[dict[str, Any]]:
+        """
+        Resolves many Pokémon by name or id at once, returning one result per identifier in request order.
+
+        Names are mapped to ids through the index or one MGET of the alias cache, cached
+        entities are read with one more MGET, and only the misses go upstream, at most
+        batch_max_concurrency at a time, and are written back in one pipeline. Each result
+        is `{"query", "status": 200, "data"}` or `{"query", "status", "error"}`, so one bad
+        identifier doesn't fail the rest. Repeated identifiers are resolved once; blank or
+        malformed ones get a 400 without reaching PokeAPI.
+        """
+        normalized = list(dict.fromkeys(identifier.strip().lower() for identifier in identifiers))
+        errors: dict[str, tuple[int, str]] = {
+            query: (400, "Invalid Pokémon name or id") for query in normalized if not _valid_identifier(query)
+        }
+        queries = [query for query in normalized if query not in errors]
+        ids = await self._resolve_ids(queries)
+        resolved = {query: pokemon_id for query, pokemon_id in zip(queries, ids) if pokemon_id is not None}
+        entries = await self.cache.mget_entries([_entity_key(pokemon_id) for pokemon_id in resolved.values()])
+
+        found: dict[str, dict[str, Any]] = {}
+        for (query, pokemon_id), entry in zip(resolved.items(), entries):
+            if entry is None:
+                continue
+            found[query] = entry.value
+            if entry.stale:
+                self._refresh_entity(pokemon_id)
+
+        misses = [query for query in queries if query not in found]
+        if misses:
+            logger.info(f"Batch cache miss for {len(misses)} of {len(queries)} Pokémon")
+            semaphore = asyncio.Semaphore(settings.batch_max_concurrency)
+
+            async with self._client() as client:
+
+                async def fetch(query: str) -> dict[str, Any] | None:
+                    url = f"{self.base_url}/pokemon/{resolved.get(query, query)}"
+                    try:
+                        async with semaphore:
+                            # Keyed apart from the entity fetches' "upstream:" flights, which return projected dicts
+                            response = await self.flights.do(
+                                f"upstream-response:{url}", lambda: self.fetcher.get(client, url)
+                            )
+                        response.raise_for_status()
+                        entity = project(response.json(), PokemonDetail)
+                        if "id" not in entity:
+                            # Not a Pokémon payload (e.g. a listing), so it can't be cached or returned
+                            logger.warning(f"PokeAPI answered {url} without a Pokémon for a batch")
+                            errors[query] = (502, "Upstream PokeAPI error")
+                            return None
+                        return entity
+                    except UpstreamUnavailable:
+                        errors[query] = (503, "PokeAPI is unavailable")
+                    except httpx.HTTPStatusError as e:
+                        status = e.response.status_code if e.response is not None else 502
+                        errors[query] = (404, "Pokemon not found") if status == 404 else (502, "Upstream PokeAPI error")
+                    except httpx.HTTPError as e:
+                        logger.warning(f"Failed to fetch Pokémon {query} for a batch: {e!r}")
+                        errors[query] = (502, "Upstream PokeAPI error")
+                    return None
+
+                fetched = await asyncio.gather(*(fetch(query) for query in misses))
+            found.update({query: entity for query, entity in zip(misses, fetched) if entity is not None})
+            await self._cache_entities([entity for entity in fetched if entity is not None])
+
+        results = []
+        for identifier in identifiers:
+            query = identifier.strip().lower()
+            if query in found:
+                results.append({"query": identifier, "status": 200, "data": found[query]})
+            else:
+                status, error = errors.get(query, (502, "Upstream PokeAPI error"))
+                results.append({"query": identifier, "status": status, "error": error})
+        return results
+
+    def _refresh_entity(self, pokemon_id: int) -> None:
+        """Reloads a stale entity in the background, as _serve_cached_entry() does for a single detail."""
+        key = f"pokemon_detail:{pokemon_id}"
+
+        async def read_fresh() -> dict[str, Any] | None:
+            entry = (await self.cache.mget_entries([_entity_key(pokemon_id)]))[0]
+            return entry.value if entry is not None and not entry.stale else None
+
+        background.spawn(
+            self._load_once(key, lambda: self._load_pokemon_detail(str(pokemon_id)), read_fresh),
+            name=f"refresh:{key}",
+        )
+
+    async def _resolve_ids(self, names_or_ids: list[str]) -> list[int | None]:
+        """Like _resolve_id() for many names or ids, reading the alias cache with one MGET."""
+        ids: list[int | None] = []
+        for name_or_id in names_or_ids:
+            if name_or_id.isdigit():
+                ids.append(int(name_or_id))
+            else:
+                summary = self.index.get(name_or_id) if self.index.ready else None
+                ids.append(summary["id"] if summary is not None else None)
+        unknown = [i for i, pokemon_id in enumerate(ids) if pokemon_id is None]
+        if unknown:
+            aliases = await self.cache.mget([_alias_key(names_or_ids[i]) for i in unknown])
+            for i, alias in zip(unknown, aliases):
+                ids[i] = int(alias) if alias is not None else None
+        return ids
+
+    async def autocomplete(self, query: str, limit: int = 10) -> list[dict[str, Any]]:
+        """
+        Ranked name suggestions (exact, prefix, substring, then typo-tolerant) for a partly typed query.
+
+        Served from the Pokédex index once warm; until then from a name index built over the
+        cached reference listing, and rebuilt only when that listing changes.
+        """
+        if self.index.ready:
+            return self.index.autocomplete(query, limit)
+
+        entry = await self._serve_cached_entry(
+            _REFERENCES_KEY, lambda: self.cache.get_entry(_REFERENCES_KEY), self._load_pokemon_references
+        )
+        references = entry.value
+        names = fallback_names.get(entry.etag, [p["name"] for p in references])
+        return [
+            {"id": _id_from_url(references[s.row]["url"]), "name": references[s.row]["name"], "match": s.match}
+            for s in names.suggest(query, limit)
+        ]
+
     async def get_pokemon_list(
         self,
         search: str | None = None,
@@ -85,108 +504,517 @@ class PokeAPIService:
         stats: dict[str, dict[str, int]] | None = None,
         limit: int = 20,
         offset: int = 0,
+        sort: str | None = None,
+        order: str = "desc",
+        match: str = "all",
     ) -> dict[str, Any]:
         """
         Gets a list of Pokémon, using Redis for caching and optimized filtering.
+
+        Several `types` combine with AND when `match` is "all" and with OR when it is "any".
+        Once the in-memory Pokédex index is warm, queries are answered from it directly
+        without touching Redis or PokeAPI. With prefetch_enabled, the page's details and
+        the next page are then warmed in the background.
+
+        `next` and `previous` are cursors (see app.services.cursor) for the neighbouring pages,
+        or None at either end. Filters are normalized first (see canonical_filters), so
+        equivalent queries share one cache entry and result set.
         """
-        # Create a unique cache key based on all query parameters
-        stats_key = json.dumps(stats) if stats else ""
-        types_key = ','.join(types or [])
-        cache_key = (
-            f"pokemon_list:search={search or ''}:types={types_key}:"
-            f"stats={stats_key}:limit={limit}:offset={offset}"
+        search, types, stats, sort, order, match = canonical_filters(search, types, stats, sort, order, match)
+        cache_key = _list_cache_key(search, types, stats, limit, offset, sort, order, match)
+        if self.index.ready:
+            with filter_seconds.time("index"):
+                page = self.index.query(
+                    search=search,
+                    types=types,
+                    stats=stats,
+                    limit=limit,
+                    offset=offset,
+                    sort=sort,
+                    order=order,
+                    match=match,
+                )
+        else:
+            # Check the cache first (in-process, then Redis); misses and stale hits reload from PokeAPI
+            page = await self._serve_cached(
+                cache_key,
+                lambda: self.cache.get_entry(cache_key),
+                lambda: self._load_pokemon_list(cache_key, search, types, stats, limit, offset, sort, order, match),
+            )
+
+        if settings.prefetch_enabled:
+            self._prefetch_around(cache_key, page, search, types, stats, limit, offset, sort, order, match)
+        params = dict(
+            search=search, types=types, stats=stats, limit=limit, offset=offset, sort=sort, order=order, match=match
         )
+        return _with_cursors(page, params)
 
-        # 1. Check cache first
-        try:
-            cached_data = await redis_pool.get(cache_key)
-            if cached_data:
-                logger.info(f"Cache hit for key: {cache_key}")
-                return json.loads(cached_data)
-        except Exception as e:
-            logger.error(f"Redis GET failed: {e}")
-
-        logger.info(f"Cache miss for key: {cache_key}")
-
-        # 2. If cache miss, fetch from API
-        async with httpx.AsyncClient() as client:
-            pokemon_references: list[dict[str, str]] = []
-
-            if types:
-                tasks = [self._get_pokemon_for_type(client, t) for t in types]
-                list_of_pokemon_lists = await asyncio.gather(*tasks, return_exceptions=True)
-
-                # Filter out any failed requests before processing
-                successful_lists = [lst for lst in list_of_pokemon_lists if isinstance(lst, list)]
-                if len(successful_lists) != len(types):
-                    # Handle error if a type was invalid
-                    raise httpx.RequestError("One or more invalid Pokémon types requested.")
-
-                name_sets = [{p["name"] for p in poke_list} for poke_list in successful_lists]
-                intersected_names = set.intersection(*name_sets) if name_sets else set()
-
-                name_to_url_map = {p["name"]: p["url"] for p in successful_lists[0]}
-                pokemon_references = [
-                    {"name": name, "url": name_to_url_map[name]}
-                    for name in sorted(list(intersected_names))
-                ]
-            else:
-                response = await client.get(f"{self.base_url}/pokemon?limit=2000")
-                response.raise_for_status()
-                pokemon_references = response.json()["results"]
+    def _prefetch_around(
+        self,
+        cache_key: str,
+        page: dict[str, Any],
+        search: str | None,
+        types: list[str] | None,
+        stats: dict[str, dict[str, int]] | None,
+        limit: int,
+        offset: int,
+        sort: str | None,
+        order: str,
+        match: str,
+    ) -> None:
+        """Schedules warm-ups for what users open next from a page: one of its Pokémon, or the next page."""
+        ids = [summary["id"] for summary in page.get("results", []) if summary.get("id") is not None]
+        if ids:
+            self.prefetcher.schedule(f"details:{cache_key}", lambda: self._prefetch_details(ids))
+        # Index pages are computed in memory on demand, so only cached pages are worth warming
+        if page.get("next") and not self.index.ready:
+            next_key = _list_cache_key(search, types, stats, limit, offset + limit, sort, order, match)
+            self.prefetcher.schedule(
+                next_key,
+                lambda: self._prefetch_page(next_key, search, types, stats, limit, offset + limit, sort, order, match),
+            )
 
-            if search:
-                pokemon_references = [
-                    p for p in pokemon_references if search.lower() in p["name"].lower()
+    async def _prefetch_details(self, ids: list[int]) -> None:
+        """Caches the entities of any of `ids` not already cached, one budget slot per upstream request."""
+        cached = await self._get_cached_entities(ids)
+        urls = [f"{self.base_url}/pokemon/{pokemon_id}/" for pokemon_id, entity in zip(ids, cached) if entity is None]
+        if not urls:
+            return
+
+        async with self._client() as client:
+
+            async def fetch(url: str) -> None:
+                async with self.prefetcher.slot():
+                    await self._fetch_pokemon_entities(client, [url])
+
+            await asyncio.gather(*(fetch(url) for url in urls))
+        logger.info(f"Prefetched {len(urls)} Pokémon details")
+
+    async def _prefetch_page(
+        self,
+        cache_key: str,
+        search: str | None,
+        types: list[str] | None,
+        stats: dict[str, dict[str, int]] | None,
+        limit: int,
+        offset: int,
+        sort: str | None,
+        order: str,
+        match: str,
+    ) -> None:
+        """Loads and caches a list page unless it is already cached; the whole load holds one budget slot."""
+        if await self.cache.get_entry(cache_key) is not None:
+            return
+
+        async def read_fresh() -> dict[str, Any] | None:
+            entry = await self.cache.get_entry(cache_key)
+            return entry.value if entry is not None and not entry.stale else None
+
+        async with self.prefetcher.slot():
+            # Shares the single-flight key with user requests, so a click on "next" joins this load
+            await self._load_once(
+                cache_key,
+                lambda: self._load_pokemon_list(cache_key, search, types, stats, limit, offset, sort, order, match),
+                read_fresh,
+            )
+        logger.info(f"Prefetched list page {cache_key}")
+
+    async def get_pokemon_list_etag(
+        self,
+        search: str | None = None,
+        types: list[str] | None = None,
+        stats: dict[str, dict[str, int]] | None = None,
+        limit: int = 20,
+        offset: int = 0,
+        sort: str | None = None,
+        order: str = "desc",
+        match: str = "all",
+    ) -> str | None:
+        """
+        The ETag get_pokemon_list() would return with, without building the page.
+
+        From the index it is derived from the index fingerprint and the parameters; otherwise
+        it is read from the cached page's metadata, or None when the page isn't freshly cached.
+        """
+        search, types, stats, sort, order, match = canonical_filters(search, types, stats, sort, order, match)
+        if self.index.ready:
+            return self.index.query_etag(
+                search=search,
+                types=types,
+                stats=stats,
+                limit=limit,
+                offset=offset,
+                sort=sort,
+                order=order,
+                match=match,
+            )
+        return await self.cache.get_etag(_list_cache_key(search, types, stats, limit, offset, sort, order, match))
+
+    async def get_pokemon_facets(
+        self,
+        search: str | None = None,
+        types: list[str] | None = None,
+        stats: dict[str, dict[str, int]] | None = None,
+        match: str = "all",
+    ) -> dict[str, Any]:
+        """
+        Per-type match counts and per-stat histograms, min and max for a filter set (see PokedexIndex.facets).
+
+        Answered from the index once warm. Until then the candidates' details are fetched, as
+        for a stat-filtered list, packed into a throwaway index and cached per canonical filter.
+        """
+        search, types, stats, _, _, match = canonical_filters(search, types, stats, match=match)
+        if self.index.ready:
+            with filter_seconds.time("facets"):
+                return self.index.facets(search=search, types=types, stats=stats, match=match)
+
+        key = _facets_key(search, types, stats, match)
+        return await self._serve_cached(
+            key,
+            lambda: self.cache.get_entry(key),
+            lambda: self._load_facets(key, search, types, stats, match),
+        )
+
+    async def get_pokemon_facets_etag(
+        self,
+        search: str | None = None,
+        types: list[str] | None = None,
+        stats: dict[str, dict[str, int]] | None = None,
+        match: str = "all",
+    ) -> str | None:
+        """The ETag get_pokemon_facets() would return with, like get_pokemon_list_etag()."""
+        search, types, stats, _, _, match = canonical_filters(search, types, stats, match=match)
+        if self.index.ready:
+            return self.index.query_etag(facets=True, search=search, types=types, stats=stats, match=match)
+        return await self.cache.get_etag(_facets_key(search, types, stats, match))
+
+    async def _load_facets(
+        self,
+        key: str,
+        search: str | None,
+        types: list[str] | None,
+        stats: dict[str, dict[str, int]] | None,
+        match: str,
+    ) -> dict[str, Any]:
+        # Stat facets ignore the stat filters, so every candidate of the type and name filters is needed
+        references = await self._matching_references(search, types, match)
+        type_names = [t["name"] for t in await self.get_pokemon_types()]
+        async with self._client() as client:
+            details_results = await self._fetch_many_details(client, [p["url"] for p in references])
+        candidates = [p for p in details_results if p is not None]
+
+        roster = PokedexIndex()
+        roster.load(candidates, type_names=type_names)
+        with filter_seconds.time("facets"):
+            facets = roster.facets(types=types, stats=stats, match=match)
+
+        failed = len(details_results) - len(candidates)
+        if failed:
+            logger.warning(f"{failed} Pokémon details could not be fetched for facets: {key}")
+            return {**facets, "partial": True}
+        await self.cache.set(key, facets, self.cache_ttl)
+        return facets
+
+    async def stream_pokemon_list(
+        self,
+        search: str | None = None,
+        types: list[str] | None = None,
+        stats: dict[str, dict[str, int]] | None = None,
+        sort: str | None = None,
+        order: str = "desc",
+        match: str = "all",
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """
+        Yields every Pokémon matching a list query, unpaginated, in batches as they are resolved.
+
+        From the index, batches are materialized one at a time. Otherwise summaries are
+        resolved STREAM_BATCH_SIZE at a time (entity cache first, then PokeAPI), with the
+        next batch fetched while the current one is consumed. Only a sorted query has to
+        resolve everything before its first batch. Pokémon that can't be fetched are yielded
+        as `{"id", "name", "error"}` records, since a stream can't be flagged partial afterwards.
+        """
+        search, types, stats, sort, order, match = canonical_filters(search, types, stats, sort, order, match)
+        if self.index.ready:
+            for batch in self.index.iter_query(
+                search=search, types=types, stats=stats, sort=sort, order=order, match=match
+            ):
+                yield batch
+            return
+
+        references = await self._matching_references(search, types, match)
+        async with self._client() as client:
+
+            async def resolve(chunk: list[dict[str, str]]) -> list[dict[str, Any]]:
+                details = await self._fetch_many_details(client, [p["url"] for p in chunk])
+                return [
+                    detail if detail is not None else _stream_error(ref)
+                    for ref, detail in zip(chunk, details)
+                    if detail is None or _matches_stats(detail, stats)
                 ]
 
-            # For stat filtering, we need to fetch all details first, then filter
-            if stats:
-                # Fetch all details for stat filtering
-                detail_tasks = [self._fetch_pokemon_details(client, p["url"]) for p in pokemon_references]
-                details_results = await asyncio.gather(*detail_tasks)
-                all_pokemon_details = [p for p in details_results if p is not None]
-
-                # Apply stat filtering
-                filtered_pokemon = []
-                for pokemon in all_pokemon_details:
-                    matches_stats = True
-                    for stat_name, stat_range in stats.items():
-                        if stat_name in pokemon.get("stats", {}):
-                            pokemon_stat = pokemon["stats"][stat_name]
-                            min_val = stat_range.get("min", 0)
-                            max_val = stat_range.get("max", 255)
-                            if not (min_val <= pokemon_stat <= max_val):
-                                matches_stats = False
-                                break
-                    if matches_stats:
-                        filtered_pokemon.append(pokemon)
-
-                # Apply pagination after stat filtering
-                count = len(filtered_pokemon)
-                final_pokemon_details = filtered_pokemon[offset : offset + limit]
-            else:
-                # No stat filtering, use normal pagination
-                count = len(pokemon_references)
-                paginated_refs = pokemon_references[offset : offset + limit]
-
-                detail_tasks = [self._fetch_pokemon_details(client, p["url"]) for p in paginated_refs]
-                details_results = await asyncio.gather(*detail_tasks)
-                final_pokemon_details = [p for p in details_results if p is not None]
-
-            # 3. Construct the final response object
-            response_data = {
-                "results": final_pokemon_details,
-                "count": count,
-                "next": (offset + limit) < count,
-                "previous": offset > 0,
-            }
-
-            # 4. Store the result in Redis with a TTL (Time-To-Live)
+            if sort:
+                resolved = await resolve(references)
+                ordered = [p for p in resolved if "error" not in p]
+                _sort_summaries(ordered, sort, order)
+                ordered += [p for p in resolved if "error" in p]  # Failures can't be placed, so they go last
+                for start in range(0, len(ordered), STREAM_BATCH_SIZE):
+                    yield ordered[start : start + STREAM_BATCH_SIZE]
+                return
+
+            chunks = [references[i : i + STREAM_BATCH_SIZE] for i in range(0, len(references), STREAM_BATCH_SIZE)]
+            pending = asyncio.ensure_future(resolve(chunks[0])) if chunks else None
             try:
-                await redis_pool.setex(cache_key, self.cache_ttl, json.dumps(response_data))
-                logger.info(f"Cached result for key: {cache_key}")
-            except Exception as e:
-                logger.error(f"Redis SETEX failed: {e}")
+                for i in range(len(chunks)):
+                    batch = await pending
+                    pending = asyncio.ensure_future(resolve(chunks[i + 1])) if i + 1 < len(chunks) else None
+                    if batch:
+                        yield batch
+            finally:
+                # The consumer went away mid-stream; don't keep fetching for it
+                if pending is not None:
+                    pending.cancel()
 
+    async def _matching_references(
+        self, search: str | None, types: list[str] | None, match: str
+    ) -> list[dict[str, str]]:
+        """The name/url references a list query's type and name filters select, before stat filtering."""
+        if types:
+            # Type membership is cached per type, so only the first query for a type goes upstream
+            tasks = [self.get_type_members(t) for t in types]
+            list_of_pokemon_lists = await asyncio.gather(*tasks, return_exceptions=True)
+
+            # Types were checked against the type list up front, so a failure here is PokeAPI's
+            for result in list_of_pokemon_lists:
+                if isinstance(result, BaseException):
+                    raise result
+            successful_lists = list_of_pokemon_lists
+
+            name_sets = [{p["name"] for p in poke_list} for poke_list in successful_lists]
+            combine = set.union if match == "any" else set.intersection
+            matched_names = combine(*name_sets) if name_sets else set()
+
+            name_to_url_map = {p["name"]: p["url"] for poke_list in successful_lists for p in poke_list}
+            pokemon_references = [{"name": name, "url": name_to_url_map[name]} for name in sorted(matched_names)]
+        else:
+            pokemon_references = await self.get_pokemon_references()
+
+        if search:
+            pokemon_references = [p for p in pokemon_references if search.lower() in p["name"].lower()]
+        return pokemon_references
+
+    async def _get_result_set(
+        self,
+        search: str | None,
+        types: list[str] | None,
+        stats: dict[str, dict[str, int]] | None,
+        sort: str | None,
+        order: str,
+        match: str,
+    ) -> dict[str, Any]:
+        """
+        The ordered ids matching a list query's filters, as `{"ids": [...]}`, shared by all its pages.
+
+        Computing it may fetch every candidate's details (for stat filters and sorting), so it
+        is cached for result_set_ttl under a key without limit/offset. Each page, and each
+        cursor step, then only has to resolve its own `limit` entities.
+        """
+        key = _result_set_key(search, types, stats, sort, order, match)
+        return await self._serve_cached(
+            key,
+            lambda: self.cache.get_entry(key),
+            lambda: self._load_result_set(key, search, types, stats, sort, order, match),
+        )
+
+    async def _load_result_set(
+        self,
+        key: str,
+        search: str | None,
+        types: list[str] | None,
+        stats: dict[str, dict[str, int]] | None,
+        sort: str | None,
+        order: str,
+        match: str,
+    ) -> dict[str, Any]:
+        pokemon_references = await self._matching_references(search, types, match)
+        failed = 0
+        if stats or sort:
+            # Stat filtering and sorting need every candidate's stats; the details land in the entity cache
+            async with self._client() as client:
+                details_results = await self._fetch_many_details(client, [p["url"] for p in pokemon_references])
+            all_pokemon_details = [p for p in details_results if p is not None]
+            failed = len(details_results) - len(all_pokemon_details)
+            with filter_seconds.time("fallback"):
+                filtered_pokemon = [pokemon for pokemon in all_pokemon_details if _matches_stats(pokemon, stats)]
+                if sort:
+                    _sort_summaries(filtered_pokemon, sort, order)
+            ids = [pokemon["id"] for pokemon in filtered_pokemon]
+        else:
+            ids = [pokemon_id for pokemon_id in map(_id_from_url, (p["url"] for p in pokemon_references)) if pokemon_id]
+
+        if failed:
+            # Don't let an incomplete set stand in for the real one on later pages
+            logger.warning(f"{failed} Pokémon details could not be fetched for result set: {key}")
+            return {"ids": ids, "partial": True}
+        # Short-lived and never served stale: a cursor can always recompute it from its query
+        await self.cache.set(key, {"ids": ids}, settings.result_set_ttl, stale_ttl=0)
+        return {"ids": ids}
+
+    async def _load_pokemon_list(
+        self,
+        cache_key: str,
+        search: str | None,
+        types: list[str] | None,
+        stats: dict[str, dict[str, int]] | None,
+        limit: int,
+        offset: int,
+        sort: str | None,
+        order: str,
+        match: str = "all",
+    ) -> dict[str, Any]:
+        """Builds a list page from the query's result set and the entity cache, and caches it under `cache_key`."""
+        result_set = await self._get_result_set(search, types, stats, sort, order, match)
+        count = len(result_set["ids"])
+        page_ids = result_set["ids"][offset : offset + limit]
+
+        # Only this page's entities are resolved: one MGET, plus PokeAPI for any misses
+        async with self._client() as client:
+            details_results = await self._fetch_many_details(
+                client, [f"{self.base_url}/pokemon/{pokemon_id}/" for pokemon_id in page_ids]
+            )
+        final_pokemon_details = [p for p in details_results if p is not None]
+        failed = len(details_results) - len(final_pokemon_details)
+
+        response_data = {
+            "results": final_pokemon_details,
+            "count": count,
+            "next": (offset + limit) < count,
+            "previous": offset > 0,
+        }
+
+        if failed or result_set.get("partial"):
+            # Serve what we could resolve, but flag it and don't cache an incomplete page
+            logger.warning(f"{failed} Pokémon details could not be fetched for key: {cache_key}")
+            response_data["partial"] = True
             return response_data
+
+        # Store the result in both cache tiers with a TTL (Time-To-Live)
+        await self.cache.set(cache_key, response_data, self.cache_ttl)
+        logger.info(f"Cached result for key: {cache_key}")
+
+        return response_data
+
+
+def _matches_stats(pokemon: dict[str, Any], stats: dict[str, dict[str, int]] | None) -> bool:
+    """Whether every stat the summary has lies within its requested min/max range (default 0-255)."""
+    for stat_name, stat_range in (stats or {}).items():
+        if stat_name in pokemon.get("stats", {}):
+            if not (stat_range.get("min", 0) <= pokemon["stats"][stat_name] <= stat_range.get("max", 255)):
+                return False
+    return True
+
+
+def _stream_error(reference: dict[str, str]) -> dict[str, Any]:
+    return {"id": _id_from_url(reference["url"]), "name": reference["name"], "error": "Failed to fetch from PokeAPI"}
+
+
+def _sort_summaries(summaries: list[dict[str, Any]], sort: str, order: str) -> None:
+    summaries.sort(key=lambda p: p["id"] if sort == "id" else p["stats"].get(sort, -1), reverse=order == "desc")
+
+
+def _entity_key(pokemon_id: int) -> str:
+    return f"pokemon:{pokemon_id}"
+
+
+def _list_cache_key(
+    search: str | None,
+    types: list[str] | None,
+    stats: dict[str, dict[str, int]] | None,
+    limit: int,
+    offset: int,
+    sort: str | None,
+    order: str,
+    match: str,
+) -> str:
+    # A unique cache key based on all query parameters, which callers have normalized
+    stats_key = json.dumps(stats, sort_keys=True) if stats else ""
+    types_key = ",".join(types or [])
+    return (
+        f"pokemon_list:search={search or ''}:types={types_key}:match={match}:"
+        f"stats={stats_key}:sort={sort or ''}:order={order}:limit={limit}:offset={offset}"
+    )
+
+
+def _result_set_key(
+    search: str | None,
+    types: list[str] | None,
+    stats: dict[str, dict[str, int]] | None,
+    sort: str | None,
+    order: str,
+    match: str,
+) -> str:
+    # Like _list_cache_key, without the page: every page of a query shares its result set
+    stats_key = json.dumps(stats, sort_keys=True) if stats else ""
+    types_key = ",".join(types or [])
+    return (
+        f"pokemon_results:search={search or ''}:types={types_key}:match={match}:"
+        f"stats={stats_key}:sort={sort or ''}:order={order}"
+    )
+
+
+def _facets_key(
+    search: str | None,
+    types: list[str] | None,
+    stats: dict[str, dict[str, int]] | None,
+    match: str,
+) -> str:
+    # Like _result_set_key, without the ordering, which doesn't change the counts
+    stats_key = json.dumps(stats, sort_keys=True) if stats else ""
+    return f"pokemon_facets:search={search or ''}:types={','.join(types or [])}:match={match}:stats={stats_key}"
+
+
+def _with_cursors(page: dict[str, Any], params: dict[str, Any]) -> dict[str, Any]:
+    """Replaces a page's next/previous flags with cursors for the neighbouring pages."""
+    limit, offset = params["limit"], params["offset"]
+    return {
+        **page,
+        "next": encode_cursor({**params, "offset": offset + limit}) if page.get("next") else None,
+        "previous": encode_cursor({**params, "offset": max(0, offset - limit)}) if page.get("previous") else None,
+    }
+
+
+def _type_key(type_name: str) -> str:
+    return f"pokemon_type:{type_name.lower()}"
+
+
+def _alias_key(name: str) -> str:
+    return f"pokemon_alias:{name.lower()}"
+
+
+def _valid_identifier(name_or_id: str) -> bool:
+    """Whether a normalized batch identifier is a positive id or a plausible Pokémon name."""
+    if _POKEMON_NAME.fullmatch(name_or_id) is None:
+        return False
+    return not name_or_id.isdigit() or int(name_or_id) > 0
+
+
+def _id_from_url(url: str) -> int | None:
+    """Extracts the Pokémon id from a PokeAPI detail URL like .../pokemon/25/."""
+    match = _POKEMON_URL_ID.search(url)
+    return int(match.group(1)) if match else None
+
+
+def _shape_summary(details: dict[str, Any]) -> dict[str, Any]:
+    """Reduces a raw PokeAPI Pokémon payload to the summary shape used by list responses."""
+    # Extract stats for filtering
+    stats = {}
+    for stat in details["stats"]:
+        stat_name = stat["stat"]["name"]
+        stats[stat_name] = stat["base_stat"]
+
+    return {
+        "id": details["id"],
+        "name": details["name"],
+        "types": [t["type"]["name"] for t in details["types"]],
+        "sprites": {"front_default": details["sprites"]["front_default"]},
+        "stats": stats,
+    }
@@ -0,0 +1,419 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterator, Sequence
+from typing import Any, NamedTuple
+
+import numpy as np
+from app.services.name_index import NameIndex
+
+logger = logging.getLogger(__name__)
+
+# Column order of the stat matrix
+STAT_NAMES = ("hp", "attack", "defense", "special-attack", "special-defense", "speed")
+STAT_COLUMNS = {name: i for i, name in enumerate(STAT_NAMES)}
+
+# Fields a list query can be sorted by
+SORT_FIELDS = ("id", *STAT_NAMES)
+
+# How several requested types combine: every type (AND) or at least one (OR)
+TYPE_MATCH_MODES = ("all", "any")
+
+MISSING_STAT = -1  # Marker for a stat absent from a summary; never excluded by range filters
+
+RESULT_CACHE_SIZE = 256  # Ordered result sets (and, separately, facets) kept per index, by filter
+
+FACET_BIN_WIDTH = 10  # Stat histogram bucket width, the step the UI's stat sliders move in
+FACET_BINS = 26  # Buckets 0-9, 10-19, ..., 250-255
+
+TYPE_SLOTS = 2  # Types a single Pokémon can have
+NO_TYPE = 255  # Marker for an unused type slot
+
+
+class PackedRoster(NamedTuple):
+    """A roster in columnar form: one row per Pokémon, ordered by id."""
+
+    ids: np.ndarray  # int32, N
+    stats: np.ndarray  # int16, N x 6 in STAT_NAMES order
+    type_slots: np.ndarray  # uint8, N x TYPE_SLOTS indexes into type_list, in slot order
+    type_masks: np.ndarray  # uint32, N; bit i set when the Pokémon has type_list[i]
+    type_list: list[str]  # Type names by bit
+    names: Sequence[str]
+    sprites: Sequence[str | None]
+
+
+def pack_roster(entries: list[dict[str, Any]], type_names: list[str] | None = None) -> PackedRoster:
+    """Packs shaped Pokémon summaries into columns. Types in `type_names` get the lowest bits."""
+    ordered = sorted(entries, key=lambda p: p["id"])
+
+    type_bits: dict[str, int] = {}
+    for t in type_names or []:
+        type_bits.setdefault(t, len(type_bits))
+    for p in ordered:
+        for t in p["types"]:
+            type_bits.setdefault(t, len(type_bits))
+    if len(type_bits) > 32:
+        raise ValueError(f"Too many Pokémon types for a uint32 bitmask: {len(type_bits)}")
+
+    ids = np.fromiter((p["id"] for p in ordered), dtype=np.int32, count=len(ordered))
+    stats = np.full((len(ordered), len(STAT_NAMES)), MISSING_STAT, dtype=np.int16)
+    type_slots = np.full((len(ordered), TYPE_SLOTS), NO_TYPE, dtype=np.uint8)
+    type_masks = np.zeros(len(ordered), dtype=np.uint32)
+    for row, p in enumerate(ordered):
+        for stat_name, value in p.get("stats", {}).items():
+            if stat_name in STAT_COLUMNS:
+                stats[row, STAT_COLUMNS[stat_name]] = value
+        if len(p["types"]) > TYPE_SLOTS:
+            raise ValueError(f"{p['name']} has more than {TYPE_SLOTS} types")
+        for slot, t in enumerate(p["types"]):
+            type_slots[row, slot] = type_bits[t]
+            type_masks[row] |= 1 << type_bits[t]
+
+    return PackedRoster(
+        ids=ids,
+        stats=stats,
+        type_slots=type_slots,
+        type_masks=type_masks,
+        type_list=list(type_bits),
+        names=[p["name"] for p in ordered],
+        sprites=[(p.get("sprites") or {}).get("front_default") for p in ordered],
+    )
+
+
+def _fingerprint(roster: PackedRoster) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for column in (roster.ids, roster.stats, roster.type_slots):
+        digest.update(np.ascontiguousarray(column).tobytes())
+    for strings in (roster.type_list, roster.names, roster.sprites):
+        digest.update("\0".join(s or "" for s in strings).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class PokedexIndex:
+    """
+    Process-local index of every Pokémon summary, used to filter lists without upstream I/O.
+
+    Base stats live in a contiguous N x 6 int16 matrix and type membership in a uint32
+    bitmask column, so range filters and sorting are single vectorized passes. The
+    columns may be read-only views over a memory-mapped binary snapshot; summaries are
+    only materialized for the rows a query returns.
+    """
+
+    def __init__(self):
+        self._roster = pack_roster([])
+        self._by_id: dict[int, int] = {}  # id -> row
+        self._by_name: dict[str, int] = {}  # name -> row
+        self._name_index = NameIndex([])
+        self._type_bits: dict[str, int] = {}  # type name -> bitmask
+        self.type_names: list[str] = []  # Every known type, when loaded from a snapshot
+        self.built_at: float | None = None  # Unix timestamp of the last successful build
+        self.fingerprint = ""  # Hash of the loaded contents; equal across workers that loaded the same data
+        # filter key -> (matching rows in id order, the rows in result order sorted so far) (LRU)
+        self._results: OrderedDict[str, tuple[np.ndarray, np.ndarray]] = OrderedDict()
+        self._facets: OrderedDict[str, dict[str, Any]] = OrderedDict()  # filter key -> facets (LRU)
+
+    @property
+    def ready(self) -> bool:
+        return self.built_at is not None
+
+    def __len__(self) -> int:
+        return len(self._roster.ids)
+
+    def load(self, entries: list[dict[str, Any]], type_names: list[str] | None = None) -> None:
+        """Replaces the index contents with the given Pokémon summaries (and, optionally, all type names)."""
+        self.load_packed(pack_roster(entries, type_names), type_names=type_names)
+
+    def load_packed(self, roster: PackedRoster, type_names: list[str] | None = None) -> None:
+        """Replaces the index contents with an already packed roster, without copying its columns."""
+        # Build everything first and swap it in so readers never see a partial index
+        names = list(roster.names)
+        by_id = {pokemon_id: row for row, pokemon_id in enumerate(roster.ids.tolist())}
+        by_name = {name: row for row, name in enumerate(names)}
+        name_index = NameIndex(names)
+        self._roster = roster._replace(names=names)
+        self._by_id, self._by_name, self._name_index = by_id, by_name, name_index
+        fingerprint = _fingerprint(roster._replace(names=names))
+        self._type_bits = {t: 1 << bit for bit, t in enumerate(roster.type_list)}
+        if type_names is not None:
+            self.type_names = list(type_names)
+        self.fingerprint = fingerprint
+        self._results = OrderedDict()  # Rows of the previous roster
+        self._facets = OrderedDict()
+        self.built_at = time.time()
+        logger.info(f"Pokédex index loaded with {len(names)} entries and {len(roster.type_list)} types")
+
+    def _summary(self, row: int, roster: PackedRoster | None = None) -> dict[str, Any]:
+        """Materializes the summary for one row, in the shape list responses use."""
+        roster = roster if roster is not None else self._roster
+        return {
+            "id": int(roster.ids[row]),
+            "name": roster.names[row],
+            "types": [roster.type_list[slot] for slot in roster.type_slots[row].tolist() if slot != NO_TYPE],
+            "sprites": {"front_default": roster.sprites[row]},
+            "stats": {
+                name: value for name, value in zip(STAT_NAMES, roster.stats[row].tolist()) if value != MISSING_STAT
+            },
+        }
+
+    def get(self, name_or_id: str | int) -> dict[str, Any] | None:
+        """Looks up a single summary by id or (case-insensitive) name."""
+        if isinstance(name_or_id, int) or str(name_or_id).isdigit():
+            row = self._by_id.get(int(name_or_id))
+        else:
+            row = self._by_name.get(str(name_or_id).lower())
+        return self._summary(row) if row is not None else None
+
+    def query(
+        self,
+        search: str | None = None,
+        types: list[str] | None = None,
+        stats: dict[str, dict[str, int]] | None = None,
+        limit: int = 20,
+        offset: int = 0,
+        sort: str | None = None,
+        order: str = "desc",
+        match: str = "all",
+    ) -> dict[str, Any]:
+        """Answers a list query entirely from memory, mirroring PokeAPIService.get_pokemon_list."""
+        rows, count = self._ordered_rows(search, types, stats, sort, order, match, offset + limit)
+        page = rows[offset : offset + limit]
+
+        return {
+            "results": [self._summary(row) for row in page.tolist()],
+            "count": count,
+            "next": (offset + limit) < count,
+            "previous": offset > 0,
+        }
+
+    def iter_query(
+        self,
+        search: str | None = None,
+        types: list[str] | None = None,
+        stats: dict[str, dict[str, int]] | None = None,
+        sort: str | None = None,
+        order: str = "desc",
+        match: str = "all",
+        batch_size: int = 100,
+    ) -> Iterator[list[dict[str, Any]]]:
+        """
+        Yields every summary matching a list query, in query() order, in batches of `batch_size`.
+
+        Only one batch of summaries is materialized at a time, and a reload while the caller
+        is iterating doesn't affect it: it keeps reading the roster it started with.
+        """
+        roster = self._roster
+        rows, _ = self._ordered_rows(search, types, stats, sort, order, match)
+        for start in range(0, len(rows), batch_size):
+            yield [self._summary(row, roster) for row in rows[start : start + batch_size].tolist()]
+
+    def query_etag(self, **params: Any) -> str:
+        """
+        A strong ETag for query(**params), derived from the contents fingerprint and the parameters.
+
+        The result page is fully determined by both, so a conditional request can be
+        answered without running the query or serializing a body.
+        """
+        key = json.dumps([self.fingerprint, params], sort_keys=True)
+        return '"' + hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest() + '"'
+
+    def facets(
+        self,
+        search: str | None = None,
+        types: list[str] | None = None,
+        stats: dict[str, dict[str, int]] | None = None,
+        match: str = "all",
+    ) -> dict[str, Any]:
+        """
+        Match counts for a filter set, for the type buttons and stat sliders, in one vectorized pass.
+
+        `count` is how many Pokémon match and `types` how many of those have each known type.
+        Each stat's histogram (counts per FACET_BIN_WIDTH bucket, from 0), min and max cover the
+        Pokémon matching every filter except that stat's own range, so a slider shows where it
+        could move to. Memoized per filter until the next load; callers must treat it as read-only.
+        """
+        key = json.dumps([search, types, stats, match], sort_keys=True)
+        facets = self._facets.get(key)
+        if facets is not None:
+            self._facets.move_to_end(key)
+            return facets
+
+        roster = self._roster
+        mask, stat_masks = self._masks(search, types, stats, match)
+        matched = mask.copy()
+        for in_range in stat_masks.values():
+            matched &= in_range
+
+        # Unused type slots hold NO_TYPE, which falls past the type list and is cut off
+        type_counts = np.bincount(roster.type_slots[matched].ravel(), minlength=NO_TYPE + 1)
+        stat_facets = {}
+        for column, stat_name in enumerate(STAT_NAMES):
+            others = mask.copy()
+            for other, in_range in stat_masks.items():
+                if other != column:
+                    others &= in_range
+            values = roster.stats[others, column]
+            values = values[values != MISSING_STAT]
+            buckets = np.minimum(values // FACET_BIN_WIDTH, FACET_BINS - 1)
+            stat_facets[stat_name] = {
+                "min": int(values.min()) if len(values) else None,
+                "max": int(values.max()) if len(values) else None,
+                "histogram": np.bincount(buckets, minlength=FACET_BINS).tolist(),
+            }
+
+        facets = {
+            "count": int(np.count_nonzero(matched)),
+            "types": {t: int(type_counts[bit]) for bit, t in sorted(enumerate(roster.type_list), key=lambda b: b[1])},
+            "bin_width": FACET_BIN_WIDTH,
+            "stats": stat_facets,
+        }
+        self._facets[key] = facets
+        while len(self._facets) > RESULT_CACHE_SIZE:
+            self._facets.popitem(last=False)
+        return facets
+
+    def autocomplete(self, query: str, limit: int = 10) -> list[dict[str, Any]]:
+        """Ranked name suggestions for a partly typed (or misspelled) query."""
+        return [
+            {"id": int(self._roster.ids[s.row]), "name": self._roster.names[s.row], "match": s.match}
+            for s in self._name_index.suggest(query, limit)
+        ]
+
+    def _ordered_rows(
+        self,
+        search: str | None,
+        types: list[str] | None,
+        stats: dict[str, dict[str, int]] | None,
+        sort: str | None,
+        order: str,
+        match: str,
+        k: int | None = None,
+    ) -> tuple[np.ndarray, int]:
+        """
+        The first `k` rows (all of them when `k` is None) matching a query's filters, in result
+        order, and how many rows match in total.
+
+        A stat sort only orders the top `k` (a partial selection), and a deeper page or a stream
+        extends that prefix later. The matches and the prefix are memoized per filter until the
+        next load, so all page sizes and offsets of a query share one filter pass and pages
+        within the sorted prefix are just slices.
+        """
+        key = json.dumps([search, types, stats, sort, order, match], sort_keys=True)
+        cached = self._results.get(key)
+        if cached is not None:
+            self._results.move_to_end(key)
+            rows, ordered = cached
+        else:
+            rows = self._filter(search=search, types=types, stats=stats, match=match)
+            rows.flags.writeable = False  # Shared by every page of the query
+            ordered = None
+
+        if sort and sort != "id":
+            wanted = len(rows) if k is None else min(k, len(rows))
+            if ordered is None or len(ordered) < wanted:
+                # Grow the sorted prefix geometrically, so paging deeper re-selects rarely
+                wanted = min(len(rows), max(wanted, 2 * len(ordered) if ordered is not None else 0))
+                ordered = self._top_k(rows, sort, order, wanted)
+                ordered.flags.writeable = False
+        elif ordered is None:
+            ordered = rows[::-1] if sort == "id" and order == "desc" else rows
+
+        if cached is None or cached[1] is not ordered:
+            self._results[key] = (rows, ordered)
+            while len(self._results) > RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+        return ordered, len(rows)
+
+    def _filter(
+        self,
+        search: str | None = None,
+        types: list[str] | None = None,
+        stats: dict[str, dict[str, int]] | None = None,
+        match: str = "all",
+    ) -> np.ndarray:
+        """Returns the matching row numbers, in id order, as one vectorized boolean mask."""
+        mask, stat_masks = self._masks(search, types, stats, match)
+        for in_range in stat_masks.values():
+            mask &= in_range
+        return np.flatnonzero(mask)
+
+    def _masks(
+        self,
+        search: str | None,
+        types: list[str] | None,
+        stats: dict[str, dict[str, int]] | None,
+        match: str,
+    ) -> tuple[np.ndarray, dict[int, np.ndarray]]:
+        """
+        Boolean row masks for a filter set: one for the type and name filters, and one per
+        filtered stat column (keyed by column), which _filter() and facets() combine.
+        """
+        roster = self._roster
+        mask = np.ones(len(roster.ids), dtype=bool)
+        stat_masks: dict[int, np.ndarray] = {}
+
+        if types:
+            known = {t for t in types if t in self._type_bits}
+            if not known or (match == "all" and len(known) < len(set(types))):
+                # No indexed Pokémon has an unknown type, so it can't be part of every match
+                mask[:] = False
+                return mask, stat_masks
+            wanted = np.uint32(sum(self._type_bits[t] for t in known))
+            if match == "any":
+                mask &= (roster.type_masks & wanted) != 0
+            else:
+                mask &= (roster.type_masks & wanted) == wanted
+
+        if search:
+            matches = np.zeros(len(mask), dtype=bool)
+            matches[self._name_index.substring(search)] = True
+            mask &= matches
+
+        for stat_name, stat_range in (stats or {}).items():
+            column = STAT_COLUMNS.get(stat_name)
+            if column is None:
+                continue
+            values = roster.stats[:, column]
+            in_range = (values >= stat_range.get("min", 0)) & (values <= stat_range.get("max", 255))
+            stat_masks[column] = in_range | (values == MISSING_STAT)
+
+        return mask, stat_masks
+
+    def _top_k(self, rows: np.ndarray, sort: str, order: str, k: int) -> np.ndarray:
+        """Returns the first `k` of `rows` ordered by a stat, ties broken by id."""
+        values = self._roster.stats[rows, STAT_COLUMNS[sort]].astype(np.int64)
+        if order == "desc":
+            values = -values
+        # Fold the position into the key so ordering is total and stable across argpartition
+        keys = values * max(len(rows), 1) + np.arange(len(rows))
+        if k < len(rows):
+            candidates = np.argpartition(keys, k)[:k]
+            return rows[candidates[np.argsort(keys[candidates])]]
+        return rows[np.argsort(keys)]
+
+    async def refresh_forever(
+        self,
+        loader: Callable[[], Awaitable[list[dict[str, Any]]]],
+        interval: int,
+        initial_delay: float = 0,
+    ) -> None:
+        """Builds the index after `initial_delay` and rebuilds it every `interval` seconds until cancelled."""
+        await asyncio.sleep(initial_delay)
+        while True:
+            try:
+                entries = await loader()
+                if entries:
+                    self.load(entries)
+                else:
+                    logger.warning("Pokédex index refresh returned no entries; keeping previous data")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Pokédex index refresh failed: {e}")
+            await asyncio.sleep(interval)
+
+
+# Shared, process-wide index instance
+pokedex_index = PokedexIndex()
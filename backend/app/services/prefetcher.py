@@ -0,0 +1,106 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any
+
+from app.core.config import settings
+from app.services.background import BackgroundRunner, background
+from app.services.fetcher import UpstreamFetcher, speculative, upstream_fetcher
+
+logger = logging.getLogger(__name__)
+
+MAX_PENDING_JOBS = 16  # Prefetches beyond this are dropped rather than queued
+
+
+class Prefetcher:
+    """
+    Runs speculative cache warm-ups (the next page, details linked from a page) in the
+    background, within a small budget of concurrent upstream requests.
+
+    Prefetching yields to real traffic. While user requests hold `max_load` of the
+    fetcher's in-flight capacity, nothing new is scheduled and running prefetches are
+    cancelled at their next budget check. User load is what the fetcher has in flight
+    minus every request made from a prefetch job; a page load holds one slot but may
+    fetch a whole page of details.
+    """
+
+    def __init__(
+        self,
+        fetcher: UpstreamFetcher,
+        concurrency: int = 4,
+        max_load: float = 0.5,
+        runner: BackgroundRunner | None = None,
+    ):
+        self.fetcher = fetcher
+        self.concurrency = concurrency  # Upstream requests prefetching may have in flight at once
+        self.max_load = max_load  # Share of the fetcher's max_in_flight that user requests may hold
+        self.runner = runner if runner is not None else background
+        self.active = 0  # Budget slots currently held
+        self._jobs: dict[str, asyncio.Task[Any]] = {}
+        # Bound lazily to the running loop, like the fetcher's semaphore
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def overloaded(self) -> bool:
+        """Whether user requests (everything in flight upstream that isn't ours) are over the load threshold."""
+        user_in_flight = self.fetcher.in_flight - self.fetcher.speculative_in_flight
+        return user_in_flight >= self.max_load * self.fetcher.max_in_flight
+
+    def schedule(self, name: str, job: Callable[[], Awaitable[Any]]) -> asyncio.Task[Any] | None:
+        """Starts `job` in the background unless one named `name` is already running, or we are under load."""
+        if self.overloaded():
+            self.cancel_all()
+            return None
+        if name in self._jobs or len(self._jobs) >= MAX_PENDING_JOBS:
+            return None
+        task = self.runner.spawn(self._run(name, job), name=f"prefetch:{name}")
+        self._jobs[name] = task
+        task.add_done_callback(lambda _: self._forget(name, task))
+        return task
+
+    async def _run(self, name: str, job: Callable[[], Awaitable[Any]]) -> None:
+        speculative.set(True)  # Scoped to this job's task, and inherited by tasks it starts
+        try:
+            await job()
+        except asyncio.CancelledError:
+            logger.info(f"Prefetch {name} cancelled")
+            raise
+        except Exception as e:
+            # Speculative work; the user-facing path will retry whatever failed here
+            logger.warning(f"Prefetch {name} failed: {e!r}")
+
+    def _forget(self, name: str, task: asyncio.Task[Any]) -> None:
+        if self._jobs.get(name) is task:
+            del self._jobs[name]
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Holds one unit of the budget around an upstream request; under load, cancels all prefetching instead."""
+        async with self._bind_loop():
+            if self.overloaded():
+                self.cancel_all()
+                await asyncio.sleep(0)  # Delivers the cancellation to this job too
+            self.active += 1
+            try:
+                yield
+            finally:
+                self.active -= 1
+
+    def _bind_loop(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._semaphore is None:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    def cancel_all(self) -> None:
+        for task in list(self._jobs.values()):
+            task.cancel()
+
+
+# Shared, process-wide prefetcher, sharing the upstream fetcher's in-flight count with user requests
+prefetcher = Prefetcher(upstream_fetcher, settings.prefetch_concurrency, settings.prefetch_max_load)
@@ -0,0 +1,39 @@
+from typing import Any, get_args
+
+from pydantic import BaseModel
+
+
+def project(data: Any, model: type[BaseModel]) -> Any:
+    """
+    Keeps only the fields `model` describes, recursing into nested models and lists of them.
+
+    Values are otherwise passed through untouched (no validation or coercion), so an
+    upstream payload that is missing fields or has extra ones is trimmed rather than
+    rejected.
+    """
+    if isinstance(data, list):
+        return [project(item, model) for item in data]
+    if not isinstance(data, dict):
+        return data
+    projected = {}
+    for name, field in model.model_fields.items():
+        if name in data:
+            nested = _model_in(field.annotation)
+            projected[name] = project(data[name], nested) if nested is not None else data[name]
+    return projected
+
+
+def select_fields(data: dict[str, Any], fields: list[str]) -> dict[str, Any]:
+    """A sparse copy of `data` with only the requested top-level fields, in request order."""
+    return {name: data[name] for name in fields if name in data}
+
+
+def _model_in(annotation: Any) -> type[BaseModel] | None:
+    """Finds the model inside an annotation such as `Model`, `Optional[Model]` or `list[Model]`."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in get_args(annotation):
+        model = _model_in(arg)
+        if model is not None:
+            return model
+    return None
@@ -0,0 +1,58 @@
+from typing import Any, NamedTuple
+
+from app.services.pokedex_index import STAT_COLUMNS
+
+# The range a stat filter bound defaults to; bounds at or beyond it filter nothing
+STAT_MIN = 0
+STAT_MAX = 255
+
+
+class ListFilters(NamedTuple):
+    """The filtering and ordering part of a list query, everything but the page."""
+
+    search: str | None
+    types: list[str] | None
+    stats: dict[str, dict[str, int]] | None
+    sort: str | None
+    order: str
+    match: str
+
+
+def canonical_filters(
+    search: str | None = None,
+    types: list[str] | None = None,
+    stats: dict[str, dict[str, Any]] | None = None,
+    sort: str | None = None,
+    order: str = "desc",
+    match: str = "all",
+) -> ListFilters:
+    """
+    Normalizes a list query's filters so that equivalent queries are equal, and so share
+    cache keys, result sets, cursors and ETags.
+
+    Search is trimmed and lower-cased. Types are lower-cased, deduplicated and sorted. Stat
+    ranges are ordered by stat name and lose bounds that filter nothing (min 0, max 255), and
+    stats left without bounds, or unknown to every filter, are dropped. `match` only matters
+    with several types and `order` only when sorting, so otherwise they take their defaults.
+    """
+    search = (search or "").strip().lower() or None
+    canonical_types = sorted({t.strip().lower() for t in types or [] if t.strip()}) or None
+
+    canonical_stats: dict[str, dict[str, int]] = {}
+    for stat_name in sorted(stats or {}):
+        if stat_name not in STAT_COLUMNS:
+            continue  # Never matched against anything, by the index or the fallback path
+        bounds = stats[stat_name]
+        stat_range = {}
+        if bounds.get("min", STAT_MIN) > STAT_MIN:
+            stat_range["min"] = bounds["min"]
+        if bounds.get("max", STAT_MAX) < STAT_MAX:
+            stat_range["max"] = bounds["max"]
+        if stat_range:
+            canonical_stats[stat_name] = stat_range
+
+    if canonical_types is None or len(canonical_types) < 2:
+        match = "all"
+    if sort is None:
+        order = "desc"
+    return ListFilters(search, canonical_types, canonical_stats or None, sort, order, match)
@@ -0,0 +1,82 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import httpx
+from app.services.cache import CacheEntry
+
+logger = logging.getLogger(__name__)
+
+Loader = Callable[[], Awaitable[Any]]
+EntryReader = Callable[[], Awaitable[CacheEntry | None]]
+
+
+class HotKeyTracker:
+    """Counts requests per cache key and remembers how to read and reload each one."""
+
+    def __init__(self, max_keys: int = 1000):
+        self.max_keys = max_keys
+        self._counts: dict[str, int] = {}
+        self._loaders: dict[str, tuple[EntryReader, Loader]] = {}
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def record(self, key: str, read_entry: EntryReader, loader: Loader) -> None:
+        self._counts[key] = self._counts.get(key, 0) + 1
+        self._loaders[key] = (read_entry, loader)
+        if len(self._counts) > self.max_keys:
+            self._decay()
+
+    def forget(self, key: str) -> None:
+        self._counts.pop(key, None)
+        self._loaders.pop(key, None)
+
+    def _decay(self) -> None:
+        """Halves every count and forgets the coldest keys so the tracker stays bounded."""
+        ranked = sorted(self._counts.items(), key=lambda item: item[1], reverse=True)
+        keep = ranked[: self.max_keys // 2]
+        self._counts = {key: max(count // 2, 1) for key, count in keep}
+        self._loaders = {key: self._loaders[key] for key in self._counts}
+
+    def top(self, n: int) -> list[tuple[str, EntryReader, Loader]]:
+        ranked = sorted(self._counts.items(), key=lambda item: item[1], reverse=True)[:n]
+        return [(key, *self._loaders[key]) for key, _ in ranked]
+
+
+async def rewarm_hot_keys(tracker: HotKeyTracker, top_n: int, horizon: float) -> int:
+    """Reloads the most requested keys that are missing or will go stale within `horizon` seconds."""
+    refreshed = 0
+    deadline = time.time() + horizon
+    for key, read_entry, loader in tracker.top(top_n):
+        entry = await read_entry()
+        if entry is not None and (entry.fresh_until is None or entry.fresh_until > deadline):
+            continue
+        try:
+            await loader()
+            refreshed += 1
+        except asyncio.CancelledError:
+            raise
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                # Gone upstream (or never existed); stop spending a re-warm slot on it
+                tracker.forget(key)
+            logger.warning(f"Re-warming {key} failed: {e!r}")
+        except Exception as e:
+            logger.warning(f"Re-warming {key} failed: {e!r}")
+    return refreshed
+
+
+async def refresh_hot_keys_forever(tracker: HotKeyTracker, interval: int, top_n: int) -> None:
+    """Re-warms the hottest keys every `interval` seconds, until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        refreshed = await rewarm_hot_keys(tracker, top_n, horizon=interval)
+        if refreshed:
+            logger.info(f"Re-warmed {refreshed} hot cache keys")
+
+
+# Shared, process-wide tracker of the most requested keys
+hot_keys = HotKeyTracker()
@@ -0,0 +1,41 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls by key: while a call for a key is in flight,
+    later callers await the same result instead of starting their own.
+    """
+
+    def __init__(self):
+        self._calls: dict[str, asyncio.Task[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Runs `fn` once for all concurrent callers of `key` and returns its result to each."""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+        else:
+            logger.info(f"Coalesced concurrent request for key: {key}")
+        # Shield the shared task so one caller being cancelled doesn't cancel it for everyone
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task[Any]) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+
+# Shared, process-wide instance so coalescing spans all requests in this worker
+flights = SingleFlight()
@@ -0,0 +1,179 @@
+import gzip
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from app.services.pokedex_index import STAT_NAMES, TYPE_SLOTS, PackedRoster, pack_roster
+
+logger = logging.getLogger(__name__)
+
+# Bump when the snapshot layout changes; readers refuse versions they don't know
+SNAPSHOT_VERSION = 1
+
+# Fixed-layout binary snapshot, meant to be memory-mapped read-only and shared by every
+# worker through the page cache. All integers are little-endian; each section starts on
+# an 8-byte boundary:
+#
+#   header        magic, version, stat count, Pokémon count N, type count T, section offsets
+#   ids           int32[N]
+#   stats         int16[N x 6] in STAT_NAMES order, -1 where missing
+#   type_slots    uint8[N x 2] indexes into the type names, 255 for an unused slot
+#   type_masks    uint32[N] bit i set when the Pokémon has type i
+#   str_offsets   uint32[T + 2N + 1] into the blob: type names, then names, then sprite URLs
+#   blob          UTF-8 strings back to back; an empty sprite URL means none
+BINARY_MAGIC = b"PKDXBIN\0"
+BINARY_VERSION = 1
+_HEADER = struct.Struct("<8sHHII7Q")
+_ALIGNMENT = 8
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is missing, corrupt or of an unsupported version."""
+
+
+def write_snapshot(path: str | Path, pokemon: list[dict[str, Any]], types: list[str]) -> None:
+    """Atomically writes a gzip-compressed JSON snapshot of the roster and type names."""
+    path = Path(path)
+    payload = {
+        "version": SNAPSHOT_VERSION,
+        "created_at": time.time(),
+        "types": types,
+        "pokemon": sorted(pokemon, key=lambda p: p["id"]),
+    }
+    tmp_path = path.with_name(path.name + ".tmp")
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(payload, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+    logger.info(f"Wrote snapshot of {len(pokemon)} Pokémon to {path}")
+
+
+def load_snapshot(path: str | Path) -> dict[str, Any]:
+    """Reads a snapshot written by write_snapshot()."""
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            payload = json.load(f)
+    except (OSError, ValueError) as e:
+        raise SnapshotError(f"Could not read snapshot {path}: {e}") from e
+
+    if payload.get("version") != SNAPSHOT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {payload.get('version')!r} in {path}")
+    return payload
+
+
+class _MappedStrings(Sequence):
+    """Strings decoded on access from a slice of the blob's offset table."""
+
+    def __init__(self, buffer: mmap.mmap, blob_at: int, offsets: np.ndarray):
+        self._buffer = buffer
+        self._blob_at = blob_at
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> str | None:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        start, end = self._offsets[i : i + 2].tolist()
+        return self._buffer[self._blob_at + start : self._blob_at + end].decode("utf-8") or None
+
+
+def _align(position: int) -> int:
+    return -(-position // _ALIGNMENT) * _ALIGNMENT
+
+
+def write_binary_snapshot(path: str | Path, pokemon: list[dict[str, Any]], types: list[str]) -> None:
+    """Atomically writes a fixed-layout binary snapshot that open_binary_snapshot() can memory-map."""
+    path = Path(path)
+    roster = pack_roster(pokemon, types)
+    count, type_count = len(roster.ids), len(roster.type_list)
+
+    strings = [s.encode("utf-8") for s in (*roster.type_list, *roster.names, *(u or "" for u in roster.sprites))]
+    str_offsets = np.zeros(len(strings) + 1, dtype="<u4")
+    np.cumsum([len(s) for s in strings], out=str_offsets[1:])
+    blob = b"".join(strings)
+
+    sections = [
+        roster.ids.astype("<i4"),
+        roster.stats.astype("<i2"),
+        roster.type_slots,
+        roster.type_masks.astype("<u4"),
+        str_offsets,
+    ]
+    offsets = []
+    position = _align(_HEADER.size)
+    for array in sections:
+        offsets.append(position)
+        position = _align(position + array.nbytes)
+    blob_at = position
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("wb") as f:
+        header = (BINARY_MAGIC, BINARY_VERSION, len(STAT_NAMES), count, type_count, *offsets, blob_at, len(blob))
+        f.write(_HEADER.pack(*header))
+        for offset, array in zip(offsets, sections):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(array.tobytes())
+        f.write(b"\0" * (blob_at - f.tell()))
+        f.write(blob)
+    os.replace(tmp_path, path)
+    logger.info(f"Wrote binary snapshot of {count} Pokémon to {path}")
+
+
+def is_binary_snapshot(path: str | Path) -> bool:
+    """Tells a binary snapshot apart from a gzip JSON one by its magic bytes."""
+    with open(path, "rb") as f:
+        return f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def open_binary_snapshot(path: str | Path) -> PackedRoster:
+    """
+    Memory-maps a snapshot written by write_binary_snapshot().
+
+    The returned columns are read-only views straight over the mapping, so opening is
+    O(1) in the roster size apart from decoding names; sprite URLs are decoded on access.
+    """
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        raise SnapshotError(f"Could not map snapshot {path}: {e}") from e
+
+    if len(buffer) < _HEADER.size:
+        raise SnapshotError(f"Truncated snapshot header in {path}")
+    magic, version, stat_count, count, type_count, *offsets, blob_at, blob_len = _HEADER.unpack_from(buffer)
+    if magic != BINARY_MAGIC:
+        raise SnapshotError(f"{path} is not a binary snapshot")
+    if version != BINARY_VERSION or stat_count != len(STAT_NAMES):
+        raise SnapshotError(f"Unsupported binary snapshot version {version} in {path}")
+    if blob_at + blob_len > len(buffer):
+        raise SnapshotError(f"Truncated snapshot {path}")
+
+    ids_at, stats_at, slots_at, masks_at, strings_at = offsets
+    try:
+        str_offsets = np.frombuffer(buffer, dtype="<u4", count=type_count + 2 * count + 1, offset=strings_at)
+        roster = PackedRoster(
+            ids=np.frombuffer(buffer, dtype="<i4", count=count, offset=ids_at),
+            stats=np.frombuffer(buffer, dtype="<i2", count=count * stat_count, offset=stats_at).reshape(
+                count, stat_count
+            ),
+            type_slots=np.frombuffer(buffer, dtype=np.uint8, count=count * TYPE_SLOTS, offset=slots_at).reshape(
+                count, TYPE_SLOTS
+            ),
+            type_masks=np.frombuffer(buffer, dtype="<u4", count=count, offset=masks_at),
+            type_list=list(_MappedStrings(buffer, blob_at, str_offsets[: type_count + 1])),
+            names=list(_MappedStrings(buffer, blob_at, str_offsets[type_count : type_count + count + 1])),
+            sprites=_MappedStrings(buffer, blob_at, str_offsets[type_count + count :]),
+        )
+    except ValueError as e:
+        raise SnapshotError(f"Corrupt snapshot {path}: {e}") from e
+    return roster
@@ -0,0 +1,137 @@
+"""
+Compares cache codecs on Pokédex payloads: encoded size, encode and decode time.
+
+    python -m benchmarks.codec
+    python -m benchmarks.codec --snapshot data/pokedex.json.gz  # list pages and references from real data
+
+Encoding times the write path (JSON for the ETag and body, then framing and compression);
+decoding times an L2 hit (decompression, parsing, and the JSON body a response needs).
+Codecs whose package isn't installed are skipped.
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import Any
+
+from app.services.codec import COMPRESSIONS, SERIALIZERS, CacheCodec, available
+from app.services.snapshot import load_snapshot
+
+_SPRITES = "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon"
+_API = "https://pokeapi.co/api/v2"
+_STATS = ("hp", "attack", "defense", "special-attack", "special-defense", "speed")
+_SYLLABLES = ("pi", "ka", "chu", "bul", "ba", "saur", "char", "man", "der", "squir", "tle", "mew", "two", "eev", "ee")
+
+
+def _name(rng: random.Random) -> str:
+    return "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def _detail(pokemon_id: int, rng: random.Random) -> dict[str, Any]:
+    """A detail record as cached: upstream's payload projected to PokemonDetail."""
+    sprite = f"{_SPRITES}/{pokemon_id}.png"
+    return {
+        "id": pokemon_id,
+        "name": _name(rng),
+        "height": rng.randint(2, 40),
+        "weight": rng.randint(10, 2000),
+        "base_experience": rng.randint(40, 300),
+        "sprites": {
+            "front_default": sprite,
+            "front_shiny": sprite.replace("/pokemon/", "/pokemon/shiny/"),
+            "back_default": sprite.replace("/pokemon/", "/pokemon/back/"),
+            "back_shiny": sprite.replace("/pokemon/", "/pokemon/back/shiny/"),
+            "front_female": None,
+            "back_female": None,
+        },
+        "types": [{"slot": 1, "type": {"name": "electric", "url": f"{_API}/type/13/"}}],
+        "stats": [
+            {"base_stat": rng.randint(20, 160), "effort": 0, "stat": {"name": stat, "url": f"{_API}/stat/{i}/"}}
+            for i, stat in enumerate(_STATS, start=1)
+        ],
+        "abilities": [
+            {
+                "ability": {"name": _name(rng), "url": f"{_API}/ability/{rng.randint(1, 300)}/"},
+                "is_hidden": hidden,
+                "slot": slot,
+            }
+            for slot, hidden in ((1, False), (3, True))
+        ],
+    }
+
+
+def _summary(pokemon_id: int, rng: random.Random) -> dict[str, Any]:
+    return {
+        "id": pokemon_id,
+        "name": _name(rng),
+        "types": rng.sample(["fire", "water", "grass", "electric", "poison", "flying"], rng.randint(1, 2)),
+        "sprites": {"front_default": f"{_SPRITES}/{pokemon_id}.png"},
+        "stats": {stat: rng.randint(20, 160) for stat in _STATS},
+    }
+
+
+def payloads(snapshot: str | None) -> dict[str, Any]:
+    rng = random.Random(25)
+    if snapshot:
+        summaries = load_snapshot(snapshot)["pokemon"]
+    else:
+        summaries = [_summary(pokemon_id, rng) for pokemon_id in range(1, 1026)]
+    references = [{"name": p["name"], "url": f"{_API}/pokemon/{p['id']}/"} for p in summaries]
+    page = {"results": summaries[:20], "count": len(summaries), "next": True, "previous": False}
+    return {
+        "detail": _detail(25, rng),
+        "list page (20)": page,
+        "type members": [p["id"] for p in summaries[:120]],
+        "references": references,
+    }
+
+
+def _time(fn, repeat: int) -> float:
+    """Median microseconds per call."""
+    samples = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        samples.append((time.perf_counter() - start) / repeat * 1e6)
+    return statistics.median(samples)
+
+
+def bench(codec: CacheCodec, value: Any, repeat: int) -> tuple[int, float, float]:
+    raw = codec.encode(value, time.time(), '"etag"', codec.dumps_json(value))
+
+    def encode():
+        codec.encode(value, 0.0, '"etag"', codec.dumps_json(value))
+
+    def decode():
+        value, _, _, body = codec.decode(raw)
+        if body is None:
+            codec.dumps_json(value)  # A response still needs JSON
+
+    return len(raw), _time(encode, repeat), _time(decode, repeat)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--snapshot", help="Snapshot from `python -m app.ingest` to take real list data from")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--compress-min-bytes", type=int, default=1024)
+    args = parser.parse_args()
+
+    codecs = [
+        (serializer, compression)
+        for serializer in SERIALIZERS
+        for compression in COMPRESSIONS
+        if available(serializer) and available(compression)
+    ]
+    print(f"{'payload':<16} {'codec':<16} {'bytes':>8} {'encode µs':>10} {'decode µs':>10}")
+    for label, value in payloads(args.snapshot).items():
+        for serializer, compression in codecs:
+            codec = CacheCodec(serializer, compression, args.compress_min_bytes)
+            size, encode_us, decode_us = bench(codec, value, args.repeat)
+            print(f"{label:<16} {serializer + '+' + compression:<16} {size:>8} {encode_us:>10.1f} {decode_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Serves the PokeAPI endpoints the backend calls from local fixture data, with configurable latency and rate limits.
+
+    python -m benchmarks.fake_pokeapi --port 9000 --latency 0.05 --rate-limit 100
+    POKEAPI_BASE_URL=http://localhost:9000/api/v2 uvicorn app.main:app
+
+Fixture data is either a snapshot recorded from PokeAPI with `python -m app.ingest`
+(`--snapshot`), or a seeded synthetic roster of the same size and shape. Detail payloads
+carry moves and game indices like upstream's, so projection and caching costs are realistic.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Any
+
+from app.services.snapshot import load_snapshot
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+ROSTER_SIZE = 1025  # Pokémon in the national dex at the time of writing
+
+_STATS = ("hp", "attack", "defense", "special-attack", "special-defense", "speed")
+_TYPES = (
+    "normal",
+    "fire",
+    "water",
+    "electric",
+    "grass",
+    "ice",
+    "fighting",
+    "poison",
+    "ground",
+    "flying",
+    "psychic",
+    "bug",
+    "rock",
+    "ghost",
+    "dragon",
+    "dark",
+    "steel",
+    "fairy",
+)
+_SYLLABLES = ("pi", "ka", "chu", "bul", "ba", "saur", "char", "man", "der", "squir", "tle", "mew", "two", "eev", "ee")
+_SPRITES = "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon"
+
+
+def build_roster(snapshot: str | None = None, size: int = ROSTER_SIZE, seed: int = 25) -> list[dict[str, Any]]:
+    """Pokémon summaries (id, name, types, sprites, stats) to serve: from a snapshot, else synthetic."""
+    if snapshot:
+        return sorted(load_snapshot(snapshot)["pokemon"], key=lambda p: p["id"])
+
+    rng = random.Random(seed)
+    roster, names = [], set()
+    for pokemon_id in range(1, size + 1):
+        name = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4)))
+        name = name if name not in names else f"{name}-{pokemon_id}"
+        names.add(name)
+        roster.append(
+            {
+                "id": pokemon_id,
+                "name": name,
+                # Roughly half of all Pokémon are dual-typed
+                "types": rng.sample(_TYPES, rng.choice((1, 2))),
+                "sprites": {"front_default": f"{_SPRITES}/{pokemon_id}.png"},
+                "stats": {stat: rng.randint(5, 200) for stat in _STATS},
+            }
+        )
+    return roster
+
+
+def _detail(summary: dict[str, Any], api: str) -> dict[str, Any]:
+    """An upstream-shaped detail payload for a summary, deterministic per id."""
+    rng = random.Random(summary["id"])
+    sprite = summary["sprites"].get("front_default")
+    return {
+        "id": summary["id"],
+        "name": summary["name"],
+        "height": rng.randint(2, 40),
+        "weight": rng.randint(10, 2000),
+        "base_experience": rng.randint(40, 300),
+        "sprites": {
+            "front_default": sprite,
+            "front_shiny": None,
+            "back_default": None,
+            "back_shiny": None,
+            "front_female": None,
+            "back_female": None,
+        },
+        "types": [
+            {"slot": slot, "type": {"name": name, "url": f"{api}/type/{name}/"}}
+            for slot, name in enumerate(summary["types"], start=1)
+        ],
+        "stats": [
+            {"base_stat": value, "effort": 0, "stat": {"name": name, "url": f"{api}/stat/{name}/"}}
+            for name, value in summary["stats"].items()
+        ],
+        "abilities": [
+            {
+                "ability": {"name": f"ability-{rng.randint(1, 300)}", "url": f"{api}/ability/1/"},
+                "is_hidden": False,
+                "slot": 1,
+            }
+        ],
+        # Dropped by the backend's projection, but upstream sends them, so they cost transfer and parsing
+        "moves": [
+            {"move": {"name": f"move-{rng.randint(1, 900)}", "url": f"{api}/move/1/"}, "version_group_details": []}
+            for _ in range(rng.randint(20, 80))
+        ],
+        "game_indices": [{"game_index": summary["id"], "version": {"name": f"version-{i}"}} for i in range(20)],
+    }
+
+
+def create_fake_pokeapi(
+    roster: list[dict[str, Any]],
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    rate_limit: float = 0.0,
+) -> FastAPI:
+    """
+    An app serving `roster` under /api/v2 like PokeAPI does.
+
+    Every response waits `latency` seconds plus up to `jitter` more. With `rate_limit`
+    (requests per second, bursting to one second's worth), requests over it get a 429
+    with Retry-After, as upstream's rate limiter would answer them.
+    """
+    app = FastAPI(title="Fake PokeAPI")
+    by_id = {p["id"]: p for p in roster}
+    by_name = {p["name"]: p for p in roster}
+    type_names = sorted({t for p in roster for t in p["types"]})
+    rng = random.Random(0)
+    bucket = {"tokens": rate_limit, "updated": time.monotonic()}
+    app.state.requests = 0
+    app.state.throttled = 0
+
+    @app.middleware("http")
+    async def upstream_conditions(request: Request, call_next):
+        app.state.requests += 1
+        if rate_limit > 0:
+            now = time.monotonic()
+            bucket["tokens"] = min(rate_limit, bucket["tokens"] + (now - bucket["updated"]) * rate_limit)
+            bucket["updated"] = now
+            if bucket["tokens"] < 1:
+                app.state.throttled += 1
+                return JSONResponse({"detail": "Rate limited"}, status_code=429, headers={"Retry-After": "1"})
+            bucket["tokens"] -= 1
+        if latency or jitter:
+            await asyncio.sleep(latency + rng.random() * jitter)
+        return await call_next(request)
+
+    def api(request: Request) -> str:
+        return str(request.base_url).rstrip("/") + "/api/v2"
+
+    @app.get("/api/v2/pokemon")
+    async def list_pokemon(request: Request, limit: int = 20, offset: int = 0):
+        page = roster[offset : offset + limit]
+        return {
+            "count": len(roster),
+            "results": [{"name": p["name"], "url": f"{api(request)}/pokemon/{p['id']}/"} for p in page],
+        }
+
+    @app.get("/api/v2/pokemon/{name_or_id}")
+    @app.get("/api/v2/pokemon/{name_or_id}/")  # Upstream's own links end in a slash
+    async def get_pokemon(request: Request, name_or_id: str):
+        summary = by_id.get(int(name_or_id)) if name_or_id.isdigit() else by_name.get(name_or_id)
+        if summary is None:
+            raise HTTPException(status_code=404, detail="Not Found")
+        return _detail(summary, api(request))
+
+    @app.get("/api/v2/type")
+    async def list_types(request: Request):
+        return {
+            "count": len(type_names),
+            "results": [{"name": name, "url": f"{api(request)}/type/{name}/"} for name in type_names],
+        }
+
+    @app.get("/api/v2/type/{type_name}")
+    @app.get("/api/v2/type/{type_name}/")  # Upstream's own links end in a slash
+    async def get_type(request: Request, type_name: str):
+        if type_name not in type_names:
+            raise HTTPException(status_code=404, detail="Not Found")
+        members = [p for p in roster if type_name in p["types"]]
+        return {
+            "name": type_name,
+            "pokemon": [
+                {"slot": 1, "pokemon": {"name": p["name"], "url": f"{api(request)}/pokemon/{p['id']}/"}}
+                for p in members
+            ],
+        }
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--snapshot", help="Snapshot from `python -m app.ingest` to serve instead of synthetic data")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Up to this many more seconds, at random")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Requests per second before 429s; 0 for none")
+    args = parser.parse_args()
+
+    app = create_fake_pokeapi(build_roster(args.snapshot), args.latency, args.jitter, args.rate_limit)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
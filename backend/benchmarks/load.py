@@ -0,0 +1,254 @@
+"""
+Load-tests GET /pokemon and GET /pokemon/{name_or_id} against a local PokeAPI stand-in.
+
+    python -m benchmarks.load
+    python -m benchmarks.load --index --upstream-latency 0.08 --requests 1000
+    python -m benchmarks.load --save-baseline benchmarks/baseline.json
+    python -m benchmarks.load --baseline benchmarks/baseline.json  # exits 1 on a regression
+
+Everything runs in this process: the backend app and the fake PokeAPI (benchmarks/fake_pokeapi.py)
+are called through httpx's ASGI transport, and Redis is fakeredis unless --redis-url is given.
+Each scenario is a seeded query mix, run once cold (Redis, the in-process cache and the index's
+memoized result sets emptied) and once warm (the same requests again). Without --index, the
+Pokédex index stays cold, so lists take the Redis/PokeAPI fallback path.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import fakeredis
+import httpx
+import redis.asyncio as redis
+from app.core.config import settings
+from app.main import app
+from app.services import cache as cache_module
+from app.services.pokedex_index import STAT_NAMES, pokedex_index
+from benchmarks.fake_pokeapi import build_roster, create_fake_pokeapi
+
+PHASES = ("cold", "warm")
+
+
+def _popular_id(rng: random.Random, roster: list[dict[str, Any]]) -> dict[str, Any]:
+    # Skewed towards low ids, like real traffic is towards the early generations
+    return roster[min(int(rng.paretovariate(1.2)) - 1, len(roster) - 1)] if rng.random() < 0.7 else rng.choice(roster)
+
+
+def detail_query(rng: random.Random, roster: list[dict[str, Any]]) -> str:
+    pokemon = _popular_id(rng, roster)
+    return f"/pokemon/{pokemon['id'] if rng.random() < 0.5 else pokemon['name']}"
+
+
+def browse_query(rng: random.Random, roster: list[dict[str, Any]]) -> str:
+    return f"/pokemon?limit=20&offset={20 * rng.randint(0, 4)}"
+
+
+def deep_page_query(rng: random.Random, roster: list[dict[str, Any]]) -> str:
+    limit = rng.choice((20, 50))
+    return f"/pokemon?limit={limit}&offset={limit * rng.randint(10, len(roster) // limit - 1)}"
+
+
+def type_pair_query(rng: random.Random, roster: list[dict[str, Any]]) -> str:
+    types = sorted({t for p in roster for t in p["types"]})
+    pair = rng.sample(types[:8], 2)  # A few popular types, so pairs repeat
+    match = rng.choice(("all", "any"))
+    return f"/pokemon?types={','.join(pair)}&match={match}&limit=20&offset={20 * rng.randint(0, 2)}"
+
+
+def stat_slider_query(rng: random.Random, roster: list[dict[str, Any]]) -> str:
+    # Sliders move in steps of 10, and the same few stats get dragged most
+    stats = {stat: {"min": 10 * rng.randint(5, 12)} for stat in rng.sample(STAT_NAMES[:4], rng.randint(1, 2))}
+    sort = rng.choice(("speed", "attack", "id"))
+    stats_param = json.dumps(stats, separators=(",", ":"))
+    return f"/pokemon?stats={stats_param}&sort={sort}&limit=20&offset={20 * rng.randint(0, 3)}"
+
+
+def mixed_query(rng: random.Random, roster: list[dict[str, Any]]) -> str:
+    generate = rng.choices(
+        (detail_query, browse_query, deep_page_query, type_pair_query, stat_slider_query), weights=(40, 25, 5, 15, 15)
+    )[0]
+    return generate(rng, roster)
+
+
+SCENARIOS: dict[str, Callable[[random.Random, list[dict[str, Any]]], str]] = {
+    "detail": detail_query,
+    "browse": browse_query,
+    "deep_pages": deep_page_query,
+    "type_pairs": type_pair_query,
+    "stat_sliders": stat_slider_query,
+    "mixed": mixed_query,
+}
+
+
+async def run_requests(client: httpx.AsyncClient, paths: list[str], concurrency: int) -> dict[str, Any]:
+    """Sends `paths` with `concurrency` requests in flight, returning throughput and latency percentiles."""
+    latencies: list[float] = []
+    errors = 0
+    queue = iter(paths)
+
+    async def worker() -> None:
+        nonlocal errors
+        for path in queue:
+            started = time.perf_counter()
+            try:
+                response = await client.get(path)
+                failed = response.status_code >= 400 or bool(response.json().get("partial"))
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(cuts[49] * 1000, 2),
+        "p95_ms": round(cuts[94] * 1000, 2),
+        "p99_ms": round(cuts[98] * 1000, 2),
+    }
+
+
+async def reset(redis_client, roster: list[dict[str, Any]], index: bool) -> None:
+    """Empties every cache tier, so the next phase starts cold."""
+    await redis_client.flushdb()
+    cache_module.cache.local.clear()
+    if index:
+        pokedex_index.load(roster)  # Also drops the index's memoized result sets
+
+
+async def benchmark(args: argparse.Namespace) -> dict[str, Any]:
+    roster = build_roster(args.snapshot)
+    fake = create_fake_pokeapi(roster, args.upstream_latency, args.upstream_jitter, args.upstream_rate_limit)
+    redis_client = redis.from_url(args.redis_url) if args.redis_url else fakeredis.FakeAsyncRedis()
+    cache_module.redis_pool = redis_client
+    settings.pokeapi_base_url = "http://pokeapi.local/api/v2"
+    if args.index:
+        pokedex_index.load(roster)
+
+    upstream = httpx.AsyncClient(transport=httpx.ASGITransport(app=fake), base_url="http://pokeapi.local")
+    app.state.http_client = upstream
+    results: dict[str, dict[str, Any]] = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://backend") as client:
+        for name in args.scenarios:
+            rng = random.Random(args.seed)
+            paths = [SCENARIOS[name](rng, roster) for _ in range(args.requests)]
+            runs: dict[str, list[dict[str, Any]]] = {phase: [] for phase in PHASES}
+            for _ in range(args.runs):
+                await reset(redis_client, roster, args.index)
+                for phase in PHASES:
+                    # Warm replays the same requests, now hitting what the cold phase cached
+                    upstream_before = fake.state.requests
+                    result = await run_requests(client, paths, args.concurrency)
+                    result["upstream_requests"] = fake.state.requests - upstream_before
+                    runs[phase].append(result)
+            for phase in PHASES:
+                results[f"{name}/{phase}"] = _median(runs[phase])
+                print(_row(f"{name}/{phase}", results[f"{name}/{phase}"]), flush=True)
+    await upstream.aclose()
+
+    return {
+        "config": {
+            "index": args.index,
+            "requests": args.requests,
+            "runs": args.runs,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "roster": len(roster),
+            "upstream_latency": args.upstream_latency,
+            "upstream_jitter": args.upstream_jitter,
+            "upstream_rate_limit": args.upstream_rate_limit,
+            "redis": "redis" if args.redis_url else "fakeredis",
+        },
+        "results": results,
+    }
+
+
+def regressions(results: dict[str, Any], baseline: dict[str, Any], tolerance: float, min_delta_ms: float) -> list[str]:
+    """
+    Where `results` are worse than `baseline` by more than `tolerance` (a fraction): higher
+    p95/p99 latency (and by at least `min_delta_ms`, so sub-millisecond noise doesn't count),
+    lower throughput, or more errors.
+    """
+    found = []
+    for key, base in baseline["results"].items():
+        current = results["results"].get(key)
+        if current is None:
+            continue
+        for metric in ("p95_ms", "p99_ms"):
+            if current[metric] > base[metric] * (1 + tolerance) and current[metric] - base[metric] >= min_delta_ms:
+                found.append(f"{key}: {metric} {base[metric]} -> {current[metric]}")
+        if current["throughput"] < base["throughput"] * (1 - tolerance):
+            found.append(f"{key}: throughput {base['throughput']} -> {current['throughput']} req/s")
+        if current["errors"] > base["errors"]:
+            found.append(f"{key}: errors {base['errors']} -> {current['errors']}")
+    if baseline.get("config") != results["config"]:
+        found.append(f"Warning: baseline config {baseline.get('config')} differs from this run's")
+    return found
+
+
+def _median(runs: list[dict[str, Any]]) -> dict[str, Any]:
+    """Each metric's median over repeated runs, which is far steadier than any one run's tail latency."""
+    return {metric: statistics.median(run[metric] for run in runs) for metric in runs[0]}
+
+
+def _row(key: str, result: dict[str, Any]) -> str:
+    return (
+        f"{key:<20} {result['requests']:>6.0f} {result['errors']:>6.0f} {result['throughput']:>9.1f} "
+        f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+        f"{result['upstream_requests']:>9.0f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=300, help="Requests per scenario and phase")
+    parser.add_argument("--runs", type=int, default=1, help="Repeat each scenario, report medians")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=151)
+    parser.add_argument("--index", action="store_true", help="Answer lists from a warm Pokédex index")
+    parser.add_argument("--snapshot", help="Snapshot from `python -m app.ingest` for the fake PokeAPI to serve")
+    parser.add_argument("--redis-url", help="A real Redis to use instead of fakeredis; its database is flushed")
+    parser.add_argument("--upstream-latency", type=float, default=0.02, help="Seconds the fake PokeAPI adds")
+    parser.add_argument("--upstream-jitter", type=float, default=0.01)
+    parser.add_argument("--upstream-rate-limit", type=float, default=0.0, help="Fake PokeAPI's requests per second")
+    parser.add_argument("--output", help="Write the results as JSON here")
+    parser.add_argument("--save-baseline", help="Write the results as JSON here, to compare later runs against")
+    parser.add_argument("--baseline", help="Fail (exit 1) if this run regressed against the results in this file")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="Allowed regression, as a fraction")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="Ignore latency regressions smaller than this")
+    args = parser.parse_args()
+
+    # Per-request logging would dominate the timings
+    logging.getLogger().setLevel(logging.WARNING)
+    header = ("reqs", "errors", "req/s", "p50 ms", "p95 ms", "p99 ms", "upstream")
+    print(f"{'scenario':<20} {header[0]:>6} {header[1]:>6} " + " ".join(f"{h:>9}" for h in header[2:]))
+    results = asyncio.run(benchmark(args))
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            Path(path).write_text(json.dumps(results, indent=2) + "\n")
+    if args.baseline:
+        found = regressions(results, json.loads(Path(args.baseline).read_text()), args.tolerance, args.min_delta_ms)
+        for line in found:
+            print(line)
+        if any(not line.startswith("Warning") for line in found):
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,13 @@
 Pytest configuration and shared fixtures for backend tests.
 """
 
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import fakeredis
 import pytest
 from app.main import app
+from app.services.cache import cache
+from app.services.fetcher import upstream_fetcher
 from fastapi.testclient import TestClient
 
 
@@ -15,18 +18,61 @@ def test_client():
     return TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def clear_local_cache():
+    """Empties the in-process cache so entries never leak between tests."""
+    cache.local.clear()
+    yield
+    cache.local.clear()
+
+
+@pytest.fixture(autouse=True)
+def close_circuits():
+    """Closes the shared Redis and PokeAPI circuit breakers, so failures in one test don't fail fast in the next."""
+    cache.breaker.reset()
+    upstream_fetcher.breaker.reset()
+    yield
+    cache.breaker.reset()
+    upstream_fetcher.breaker.reset()
+
+
 @pytest.fixture
 def mock_redis():
     """
     Patches the Redis connection pool with an AsyncMock.
     This prevents tests from requiring a live Redis instance.
     """
-    with patch("app.services.pokeapi.redis_pool") as mock_pool:
+    with patch("app.services.cache.redis_pool") as mock_pool:
         mock_pool.get = AsyncMock(return_value=None)  # Simulate cache miss by default
         mock_pool.setex = AsyncMock(return_value=True)
+        mock_pool.mget = AsyncMock(side_effect=lambda keys: [None] * len(keys))
+        mock_pool.getrange = AsyncMock(return_value=b"")
+        # Pipelines queue commands synchronously and send them on execute()
+        mock_pool.pipeline = MagicMock(return_value=MagicMock(execute=AsyncMock(return_value=[])))
         yield mock_pool
 
 
+@pytest.fixture
+def known_types():
+    """Patches the type list that list, stream and facets requests check their types against."""
+    names = ["normal", "fire", "water", "electric", "grass", "ice", "fighting", "poison", "ground"]
+    names += ["flying", "psychic", "bug", "rock", "ghost", "dragon", "dark", "steel", "fairy"]
+    with patch(
+        "app.services.pokeapi.PokeAPIService.get_pokemon_types",
+        new_callable=AsyncMock,
+        return_value=[{"name": name} for name in names],
+    ):
+        yield names
+
+
+@pytest.fixture
+def fake_redis():
+    """Patches the shared Redis pool with an in-memory fakeredis instance."""
+    client = fakeredis.FakeAsyncRedis()
+    with patch("app.services.cache.redis_pool", client):
+        yield client
+
+
 @pytest.fixture
 def sample_pokemon_list_response():
     """Sample response data for the /pokemon endpoint."""
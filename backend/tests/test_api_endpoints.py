@@ -5,9 +5,16 @@ These tests use mocked external services (PokeAPI, Redis) to verify
 that the API routes correctly handle requests and return expected responses.
 """
 
+import json
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import httpx
+import pytest
+from app.services.cache import CacheEntry
+from app.services.codec import HEAD_BYTES, CacheCodec
+from app.services.cursor import LIST_PARAMS, encode_cursor
+from app.services.fetcher import UpstreamUnavailable
+from app.services.pokedex_index import PokedexIndex
 
 
 class TestHealthEndpoint:
@@ -52,6 +59,47 @@ class TestTypesEndpoint:
         assert len(data) == 3
         assert data[0] == {"name": "normal"}
 
+    def test_types_are_cached_and_support_conditional_get(self, test_client, mock_redis):
+        """Types should carry an ETag, be fetched upstream once, and answer If-None-Match with 304."""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"results": [{"name": "fire", "url": "..."}]}
+
+        with patch("httpx.AsyncClient") as MockClient:
+            mock_client_instance = MagicMock()
+            mock_client_instance.get = AsyncMock(return_value=mock_response)
+            mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
+            mock_client_instance.__aexit__ = AsyncMock(return_value=None)
+            MockClient.return_value = mock_client_instance
+
+            first = test_client.get("/pokemon/types")
+            etag = first.headers["etag"]
+            revalidated = test_client.get("/pokemon/types", headers={"If-None-Match": etag})
+            changed = test_client.get("/pokemon/types", headers={"If-None-Match": '"something-else"'})
+
+        assert first.status_code == 200
+        assert "max-age=" in first.headers["cache-control"]
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+        assert revalidated.headers["etag"] == etag
+        assert changed.status_code == 200
+        assert changed.json() == [{"name": "fire"}]
+        assert mock_client_instance.get.await_count == 1
+
+    def test_stale_types_get_weak_etag(self, test_client, mock_redis):
+        """A stale type list should follow the stale-copy rule: a weak ETag and no-cache instead of max-age."""
+        stale = CacheEntry([{"name": "fire"}], 1.0, '"0123456789abcdef0123456789abcdef"')
+        service = "app.services.pokeapi.PokeAPIService"
+        with (
+            patch(f"{service}.get_pokemon_types_entry", new_callable=AsyncMock, return_value=stale),
+            patch(f"{service}.get_pokemon_types_etag", new_callable=AsyncMock, return_value=None),
+        ):
+            response = test_client.get("/pokemon/types")
+
+        assert response.json() == [{"name": "fire"}]
+        assert response.headers["etag"] == f"W/{stale.etag}"
+        assert response.headers["cache-control"] == "no-cache"
+
 
 class TestPokemonListEndpoint:
     """Tests for the GET /pokemon endpoint."""
@@ -99,7 +147,7 @@ class TestPokemonListEndpoint:
         assert data["results"][0]["name"] == "pikachu"
 
     def test_get_pokemon_list_with_type_filter(
-        self, test_client, mock_redis, sample_pokemon_list_response
+        self, test_client, mock_redis, sample_pokemon_list_response, known_types
     ):
         """Should filter results by Pokemon type."""
         with patch(
@@ -122,6 +170,300 @@ class TestPokemonListEndpoint:
         assert response.status_code == 400
         assert "Invalid stats filter format" in response.json()["detail"]
 
+    @pytest.mark.parametrize(
+        "stats",
+        ['{"hp": 5}', '[{"hp": {"min": 5}}]', "5", '{"luck": {"min": 5}}', '{"hp": {"min": "5"}}', '{"hp": {"lo": 5}}'],
+    )
+    def test_facets_with_malformed_stats_returns_400(self, test_client, mock_redis, stats):
+        """Valid JSON that isn't a {stat: {"min", "max"}} mapping of known stats should be a 400, not a 500."""
+        response = test_client.get("/pokemon/facets", params={"stats": stats})
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid stats filter format"
+
+    def test_get_pokemon_list_invalid_sort_returns_400(self, test_client, mock_redis):
+        """Should return 400 when sorting by an unknown field."""
+        response = test_client.get("/pokemon?sort=charm")
+        assert response.status_code == 400
+        assert "Invalid sort field" in response.json()["detail"]
+
+    @pytest.mark.parametrize("warm", [True, False])
+    @pytest.mark.parametrize("path", ["/pokemon", "/pokemon/facets", "/pokemon/stream"])
+    def test_unknown_type_returns_400_warm_or_cold(self, test_client, mock_redis, known_types, warm, path):
+        """An unknown type should be a 400 whether the index is warm or the query would go to PokeAPI."""
+        index = PokedexIndex()
+        if warm:
+            index.load([{"id": 4, "name": "charmander", "types": ["fire"], "sprites": {}, "stats": {"speed": 65}}])
+
+        with patch("app.services.pokeapi.pokedex_index", index):
+            response = test_client.get(path, params={"types": "fire,shadow"})
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Unknown Pokémon types: shadow"
+
+    def test_get_pokemon_list_passes_sort_to_service(
+        self, test_client, mock_redis, sample_pokemon_list_response, known_types
+    ):
+        """Should forward sort and order to the service."""
+        with patch(
+            "app.services.pokeapi.PokeAPIService.get_pokemon_list",
+            new_callable=AsyncMock,
+        ) as mock_get_list:
+            mock_get_list.return_value = sample_pokemon_list_response
+
+            response = test_client.get("/pokemon?types=fire&sort=speed&order=desc&limit=20")
+
+        assert response.status_code == 200
+        call_kwargs = mock_get_list.call_args.kwargs
+        assert call_kwargs["sort"] == "speed"
+        assert call_kwargs["order"] == "desc"
+
+
+    def test_get_pokemon_list_passes_match_to_service(
+        self, test_client, mock_redis, sample_pokemon_list_response, known_types
+    ):
+        """Should forward match=any to the service and reject unknown modes."""
+        with patch(
+            "app.services.pokeapi.PokeAPIService.get_pokemon_list",
+            new_callable=AsyncMock,
+            return_value=sample_pokemon_list_response,
+        ) as mock_get_list:
+            response = test_client.get("/pokemon?types=fire,water&match=any")
+
+        assert response.status_code == 200
+        assert mock_get_list.call_args.kwargs["match"] == "any"
+        assert test_client.get("/pokemon?types=fire&match=some").status_code == 400
+
+
+    def test_get_pokemon_list_follows_cursor(self, test_client, mock_redis, sample_pokemon_list_response, known_types):
+        """A cursor should stand in for the query it was issued for; a bad one is a 400."""
+        cursor = encode_cursor({**LIST_PARAMS, "types": ["fire"], "offset": 20, "sort": "speed"})
+        with patch(
+            "app.services.pokeapi.PokeAPIService.get_pokemon_list",
+            new_callable=AsyncMock,
+            return_value=sample_pokemon_list_response,
+        ) as mock_get_list:
+            response = test_client.get(f"/pokemon?cursor={cursor}&offset=999")
+
+        assert response.status_code == 200
+        assert mock_get_list.call_args.kwargs == {**LIST_PARAMS, "types": ["fire"], "offset": 20, "sort": "speed"}
+        assert test_client.get("/pokemon?cursor=bogus").status_code == 400
+
+
+class TestConditionalRequests:
+    """Tests for ETag / If-None-Match handling on list and detail responses."""
+
+    def test_list_from_index_revalidates_without_running_query(self, test_client, mock_redis, known_types):
+        """A matching If-None-Match should get a 304 computed from the index fingerprint alone."""
+        index = PokedexIndex()
+        index.load([{"id": 4, "name": "charmander", "types": ["fire"], "sprites": {}, "stats": {"speed": 65}}])
+
+        with patch("app.services.pokeapi.pokedex_index", index):
+            first = test_client.get("/pokemon?types=fire")
+            with patch.object(index, "query", side_effect=AssertionError("query ran")):
+                revalidated = test_client.get("/pokemon?types=fire", headers={"If-None-Match": first.headers["etag"]})
+            other_page = test_client.get("/pokemon?types=fire&offset=1")
+
+        assert first.status_code == 200
+        assert "stale-while-revalidate=" in first.headers["cache-control"]
+        assert revalidated.status_code == 304
+        assert other_page.headers["etag"] != first.headers["etag"]
+
+    def test_facets_from_index_with_etag(self, test_client, mock_redis, known_types):
+        """Facets should be answered from the index, and revalidated from its fingerprint."""
+        index = PokedexIndex()
+        index.load([{"id": 4, "name": "charmander", "types": ["fire"], "sprites": {}, "stats": {"speed": 65}}])
+
+        with patch("app.services.pokeapi.pokedex_index", index):
+            first = test_client.get("/pokemon/facets?types=fire")
+            etag = first.headers["etag"]
+            revalidated = test_client.get("/pokemon/facets?types=fire", headers={"If-None-Match": etag})
+            invalid = test_client.get("/pokemon/facets?match=some")
+
+        assert first.status_code == 200
+        assert first.json()["count"] == 1
+        assert first.json()["types"] == {"fire": 1}
+        assert revalidated.status_code == 304
+        assert invalid.status_code == 400
+
+    def test_detail_revalidates_from_cache_metadata(self, test_client, mock_redis):
+        """A cached detail should be revalidated from its frame header, without reading the body."""
+        etag = '"0123456789abcdef0123456789abcdef"'
+        mock_redis.getrange.return_value = CacheCodec().encode({"id": 25}, 9999999999.0, etag)[:HEAD_BYTES]
+
+        response = test_client.get("/pokemon/25", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        mock_redis.get.assert_not_called()
+        mock_redis.mget.assert_not_called()
+
+    def test_uncached_detail_gets_content_etag(self, test_client, mock_redis, sample_pokemon_detail):
+        """Without cache metadata the ETag should still be a stable hash of the body."""
+        with patch(
+            "app.services.pokeapi.PokeAPIService.get_pokemon_detail_entry",
+            new_callable=AsyncMock,
+            return_value=CacheEntry(sample_pokemon_detail, None),
+        ):
+            first = test_client.get("/pokemon/pikachu")
+            second = test_client.get("/pokemon/pikachu", headers={"If-None-Match": first.headers["etag"]})
+
+        assert first.status_code == 200
+        assert second.status_code == 304
+
+    def test_partial_page_has_no_validator(self, test_client, mock_redis, known_types):
+        """A page missing some Pokémon shouldn't get an ETag or be kept by clients, so a retry can complete it."""
+        page = {"results": [{"id": 4, "name": "charmander"}], "count": 2, "next": None, "previous": None}
+        with (
+            patch(
+                "app.services.pokeapi.PokeAPIService.get_pokemon_list",
+                new_callable=AsyncMock,
+                return_value={**page, "partial": True},
+            ),
+            patch(
+                "app.services.pokeapi.PokeAPIService.get_pokemon_list_etag", new_callable=AsyncMock, return_value=None
+            ),
+        ):
+            response = test_client.get("/pokemon?types=fire")
+
+        assert response.json()["partial"] is True
+        assert "etag" not in response.headers
+        assert response.headers["cache-control"] == "no-store"
+
+    def test_stale_detail_gets_weak_etag(self, test_client, mock_redis, sample_pokemon_detail):
+        """A stale copy should carry a weak ETag that clients must revalidate, and still answer 304 to it."""
+        stale = CacheEntry(sample_pokemon_detail, 1.0, '"0123456789abcdef0123456789abcdef"')
+        with (
+            patch(
+                "app.services.pokeapi.PokeAPIService.get_pokemon_detail_entry",
+                new_callable=AsyncMock,
+                return_value=stale,
+            ),
+            patch(
+                "app.services.pokeapi.PokeAPIService.get_pokemon_detail_etag", new_callable=AsyncMock, return_value=None
+            ),
+        ):
+            first = test_client.get("/pokemon/pikachu")
+            second = test_client.get("/pokemon/pikachu", headers={"If-None-Match": first.headers["etag"]})
+
+        assert first.headers["etag"] == f"W/{stale.etag}"
+        assert first.headers["cache-control"] == "no-cache"
+        assert second.status_code == 304
+
+
+class TestAutocompleteEndpoint:
+    """Tests for the GET /pokemon/autocomplete endpoint."""
+
+    def test_autocomplete_is_not_treated_as_a_pokemon_name(self, test_client, mock_redis):
+        """The route should reach the service's autocomplete rather than the detail lookup."""
+        suggestions = [{"id": 25, "name": "pikachu", "match": "prefix"}]
+        with patch(
+            "app.services.pokeapi.PokeAPIService.autocomplete",
+            new_callable=AsyncMock,
+            return_value=suggestions,
+        ) as mock_autocomplete:
+            response = test_client.get("/pokemon/autocomplete?q=pika&limit=5")
+
+        assert response.status_code == 200
+        assert response.json() == suggestions
+        mock_autocomplete.assert_awaited_once_with("pika", 5)
+
+    def test_autocomplete_requires_query(self, test_client):
+        """An empty query should be rejected."""
+        assert test_client.get("/pokemon/autocomplete?q=").status_code == 422
+
+
+class TestBatchEndpoint:
+    """Tests for the POST /pokemon/batch endpoint."""
+
+    def test_batch_returns_results_in_request_order(self, test_client, mock_redis):
+        """Identifiers (names or ids) should be passed through as strings and results returned in order."""
+        results = [
+            {"query": "1", "status": 200, "data": {"id": 1, "name": "bulbasaur"}},
+            {"query": "missingno", "status": 404, "error": "Pokemon not found"},
+        ]
+        with patch(
+            "app.services.pokeapi.PokeAPIService.get_pokemon_batch",
+            new_callable=AsyncMock,
+            return_value=results,
+        ) as mock_batch:
+            response = test_client.post("/pokemon/batch", json={"ids": [1, "missingno"]})
+
+        assert response.status_code == 200
+        assert response.json() == {"results": results}
+        mock_batch.assert_awaited_once_with(["1", "missingno"])
+
+    def test_blank_id_does_not_fail_the_batch(self, test_client, mock_redis, sample_pokemon_detail):
+        """A blank id next to valid ones should get its own 400 item while the request still succeeds."""
+        response = MagicMock(status_code=200)
+        response.json.return_value = sample_pokemon_detail
+        with patch("app.services.pokeapi.upstream_fetcher.get", new_callable=AsyncMock, return_value=response):
+            batch = test_client.post("/pokemon/batch", json={"ids": ["  ", "pikachu"]})
+
+        assert batch.status_code == 200
+        assert [(r["query"], r["status"]) for r in batch.json()["results"]] == [("  ", 400), ("pikachu", 200)]
+
+    def test_batch_size_is_bounded(self, test_client, mock_redis):
+        """Empty and oversized batches should be rejected."""
+        assert test_client.post("/pokemon/batch", json={"ids": []}).status_code == 422
+        assert test_client.post("/pokemon/batch", json={"ids": list(range(1000))}).status_code == 422
+
+
+class TestStreamEndpoint:
+    """Tests for the GET /pokemon/stream NDJSON endpoint."""
+
+    def test_streams_every_match_as_ndjson(self, test_client, mock_redis, known_types):
+        """Every matching Pokémon should arrive as one JSON object per line, without pagination."""
+        index = PokedexIndex()
+        index.load(
+            [
+                {"id": i, "name": f"pokemon-{i}", "types": ["fire"], "sprites": {}, "stats": {"speed": i}}
+                for i in range(1, 251)
+            ]
+        )
+
+        with patch("app.services.pokeapi.pokedex_index", index):
+            response = test_client.get("/pokemon/stream?types=fire&sort=speed&order=asc")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [p["id"] for p in lines] == list(range(1, 251))
+
+    def test_stream_resolves_through_the_service_generator(self, test_client, mock_redis):
+        """Batches from the service should be written out as they come."""
+
+        async def batches(**filters):
+            yield [{"id": 1, "name": "bulbasaur"}]
+            yield [{"id": 2, "name": "ivysaur"}, {"id": 3, "name": "venusaur", "error": "Failed to fetch"}]
+
+        with patch("app.services.pokeapi.PokeAPIService.stream_pokemon_list", side_effect=batches):
+            response = test_client.get("/pokemon/stream")
+
+        assert [json.loads(line)["id"] for line in response.text.splitlines()] == [1, 2, 3]
+
+    def test_stream_rejects_invalid_filters(self, test_client, mock_redis):
+        """Filter validation should match the list endpoint's."""
+        assert test_client.get("/pokemon/stream?match=some").status_code == 400
+        assert test_client.get("/pokemon/stream?stats=not-json").status_code == 400
+        assert test_client.get("/pokemon/stream", params={"stats": '{"hp": 5}'}).status_code == 400
+
+    def test_stream_upstream_failures_are_not_client_errors(self, test_client, mock_redis):
+        """A PokeAPI timeout should be a 502 and an open circuit a 503, not a 400 blaming the request."""
+        timeout = httpx.ReadTimeout("timed out")
+        unavailable = UpstreamUnavailable("PokeAPI circuit is open", retry_after=7)
+
+        for error, status in ((timeout, 502), (unavailable, 503)):
+
+            async def batches(**filters):
+                raise error
+                yield []
+
+            with patch("app.services.pokeapi.PokeAPIService.stream_pokemon_list", side_effect=batches):
+                response = test_client.get("/pokemon/stream")
+
+            assert response.status_code == status
+
 
 class TestPokemonDetailEndpoint:
     """Tests for the GET /pokemon/{name_or_id} endpoint."""
@@ -131,10 +473,10 @@ class TestPokemonDetailEndpoint:
     ):
         """Should return details for a Pokemon by name."""
         with patch(
-            "app.services.pokeapi.PokeAPIService.get_pokemon_detail",
+            "app.services.pokeapi.PokeAPIService.get_pokemon_detail_entry",
             new_callable=AsyncMock,
         ) as mock_get_detail:
-            mock_get_detail.return_value = sample_pokemon_detail
+            mock_get_detail.return_value = CacheEntry(sample_pokemon_detail, None)
 
             response = test_client.get("/pokemon/pikachu")
 
@@ -148,10 +490,10 @@ class TestPokemonDetailEndpoint:
     ):
         """Should return details for a Pokemon by ID."""
         with patch(
-            "app.services.pokeapi.PokeAPIService.get_pokemon_detail",
+            "app.services.pokeapi.PokeAPIService.get_pokemon_detail_entry",
             new_callable=AsyncMock,
         ) as mock_get_detail:
-            mock_get_detail.return_value = sample_pokemon_detail
+            mock_get_detail.return_value = CacheEntry(sample_pokemon_detail, None)
 
             response = test_client.get("/pokemon/25")
 
@@ -165,7 +507,7 @@ class TestPokemonDetailEndpoint:
         mock_response.status_code = 404
 
         with patch(
-            "app.services.pokeapi.PokeAPIService.get_pokemon_detail",
+            "app.services.pokeapi.PokeAPIService.get_pokemon_detail_entry",
             new_callable=AsyncMock,
         ) as mock_get_detail:
             mock_get_detail.side_effect = httpx.HTTPStatusError(
@@ -178,3 +520,36 @@ class TestPokemonDetailEndpoint:
 
         assert response.status_code == 404
         assert response.json()["detail"] == "Pokemon not found"
+
+    def test_fields_selects_a_sparse_response(self, test_client, mock_redis, sample_pokemon_detail):
+        """fields= should return only the requested fields, under their own ETag."""
+        with patch(
+            "app.services.pokeapi.PokeAPIService.get_pokemon_detail_entry",
+            new_callable=AsyncMock,
+            return_value=CacheEntry.uncached(sample_pokemon_detail),
+        ):
+            full = test_client.get("/pokemon/pikachu")
+            sparse = test_client.get("/pokemon/pikachu?fields=id,name,sprites")
+
+        assert sparse.json() == {"id": 25, "name": "pikachu", "sprites": sample_pokemon_detail["sprites"]}
+        assert sparse.headers["etag"] != full.headers["etag"]
+
+    def test_unknown_field_returns_400(self, test_client, mock_redis):
+        """Fields outside the PokemonDetail schema should be rejected."""
+        response = test_client.get("/pokemon/pikachu?fields=name,moves")
+
+        assert response.status_code == 400
+        assert "moves" in response.json()["detail"]
+
+    def test_serves_pre_encoded_body(self, test_client, mock_redis):
+        """A cached entry's pre-encoded JSON should be sent as-is rather than re-serialized."""
+        entry = CacheEntry({"id": 25}, None, '"etag"', b'{"id":   25}')
+        with patch(
+            "app.services.pokeapi.PokeAPIService.get_pokemon_detail_entry",
+            new_callable=AsyncMock,
+            return_value=entry,
+        ):
+            response = test_client.get("/pokemon/25")
+
+        assert response.content == b'{"id":   25}'
+        assert response.headers["content-type"] == "application/json"
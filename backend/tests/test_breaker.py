@@ -0,0 +1,182 @@
+"""
+Unit tests for the circuit breakers around Redis and PokeAPI.
+
+The breaker is driven with a patched clock; the cache and fetcher tests check that
+an open circuit skips the dependency entirely instead of waiting on it.
+"""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from app.services.background import background
+from app.services.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from app.services.cache import CacheEntry, LocalCache, TieredCache
+from app.services.fetcher import UpstreamFetcher, UpstreamUnavailable
+from app.services.pokeapi import PokeAPIService
+
+
+@pytest.fixture
+def clock():
+    """Patches the breaker's monotonic clock with one the test moves forward by hand."""
+    now = [1000.0]
+    with patch("app.services.breaker.time.monotonic", side_effect=lambda: now[0]):
+        yield now
+
+
+def open_breaker(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+
+class TestCircuitBreaker:
+    """Tests for the closed -> open -> half-open cycle."""
+
+    def test_opens_after_consecutive_failures(self, clock):
+        """Failures below the threshold, or broken up by a success, should leave the circuit closed."""
+        breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=10)
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == CLOSED
+
+        breaker.record_failure()
+
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+        assert breaker.retry_after == 10
+
+    def test_half_open_lets_one_probe_through(self, clock):
+        """After reset_timeout a single call should be allowed, and its success should close the circuit."""
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=10)
+        open_breaker(breaker)
+        clock[0] += 10
+
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow()
+        assert not breaker.allow()  # The probe is still in flight
+
+        breaker.record_success()
+
+        assert breaker.state == CLOSED
+        assert breaker.allow()
+
+    def test_failed_probe_reopens(self, clock):
+        """A failing probe should restart the wait before the next one."""
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=10)
+        open_breaker(breaker)
+        clock[0] += 10
+        assert breaker.allow()
+
+        breaker.record_failure()
+        clock[0] += 5
+
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+
+    def test_abandoned_probe_frees_its_slot(self, clock):
+        """A probe that never reports back shouldn't keep the circuit from probing again."""
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=10)
+        open_breaker(breaker)
+        clock[0] += 10
+        assert breaker.allow()
+
+        clock[0] += 10
+
+        assert breaker.allow()
+
+
+class TestRedisCircuit:
+    """Tests for TieredCache failing fast while Redis is down."""
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_skips_redis(self, mock_redis):
+        """Once open, reads should miss and writes reach only L1, without calling Redis."""
+        mock_redis.get.side_effect = ConnectionError("connection refused")
+        cache = TieredCache(LocalCache(max_size=10, ttl=60), breaker=CircuitBreaker("redis", failure_threshold=2))
+
+        assert await cache.get("pokemon:1") is None
+        assert await cache.get("pokemon:2") is None
+        assert mock_redis.get.await_count == 2
+
+        assert await cache.get("pokemon:3") is None
+        await cache.set("pokemon:4", {"id": 4}, ttl=60)
+
+        assert mock_redis.get.await_count == 2
+        mock_redis.setex.assert_not_called()
+        assert await cache.get("pokemon:4") == {"id": 4}
+
+    @pytest.mark.asyncio
+    async def test_lock_is_granted_while_open(self, mock_redis):
+        """An open circuit should grant refresh locks, as a Redis failure does, so callers never block."""
+        breaker = CircuitBreaker("redis", failure_threshold=1)
+        open_breaker(breaker)
+        cache = TieredCache(LocalCache(max_size=10, ttl=60), breaker=breaker)
+
+        assert await cache.acquire_lock("pokemon_detail:1", ttl=1) is not None
+        mock_redis.set.assert_not_called()
+
+
+class TestUpstreamCircuit:
+    """Tests for UpstreamFetcher failing fast while PokeAPI is down."""
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_raises_without_requesting(self):
+        """Server errors should open the circuit, after which requests fail before reaching PokeAPI."""
+        calls = 0
+
+        def handler(request):
+            nonlocal calls
+            calls += 1
+            return httpx.Response(500)
+
+        fetcher = UpstreamFetcher(rate_limit=0, max_retries=0, breaker=CircuitBreaker("pokeapi", failure_threshold=2))
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            for _ in range(2):
+                assert (await fetcher.get(client, "https://pokeapi.test/pokemon/1")).status_code == 500
+            with pytest.raises(UpstreamUnavailable) as raised:
+                await fetcher.get(client, "https://pokeapi.test/pokemon/1")
+
+        assert calls == 2
+        assert raised.value.retry_after > 0
+
+    @pytest.mark.asyncio
+    async def test_client_errors_keep_the_circuit_closed(self):
+        """A 404 means PokeAPI is answering, so it shouldn't count as a failure."""
+        fetcher = UpstreamFetcher(rate_limit=0, max_retries=0, breaker=CircuitBreaker("pokeapi", failure_threshold=1))
+        async with httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(404))) as client:
+            await fetcher.get(client, "https://pokeapi.test/pokemon/0")
+            await fetcher.get(client, "https://pokeapi.test/pokemon/0")
+
+        assert fetcher.breaker.state == CLOSED
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_is_served_during_outage(self, mock_redis, sample_pokemon_detail):
+        """With PokeAPI's circuit open, a stale cached detail should still be served, and its refresh fail fast."""
+        breaker = CircuitBreaker("pokeapi", failure_threshold=1)
+        open_breaker(breaker)
+        client = MagicMock(get=AsyncMock())
+        cache = TieredCache(LocalCache(max_size=10, ttl=60))
+        cache.local.set("pokemon:25", CacheEntry(sample_pokemon_detail, time.time() - 1))
+        service = PokeAPIService(client=client, fetcher=UpstreamFetcher(breaker=breaker), cache=cache)
+
+        assert await service.get_pokemon_detail("25") == sample_pokemon_detail
+        await asyncio.gather(*background._tasks, return_exceptions=True)
+
+        client.get.assert_not_called()
+
+    def test_route_answers_503_with_retry_after(self, test_client, mock_redis):
+        """An uncached detail needing PokeAPI while its circuit is open should get a 503 saying when to retry."""
+        with patch(
+            "app.services.pokeapi.PokeAPIService.get_pokemon_detail_entry",
+            new_callable=AsyncMock,
+            side_effect=UpstreamUnavailable("PokeAPI circuit is open", retry_after=7),
+        ):
+            response = test_client.get("/pokemon/pikachu")
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "7"
@@ -0,0 +1,132 @@
+"""
+Unit tests for the two-tier cache.
+
+LocalCache is tested directly; TieredCache runs against fakeredis so the
+Redis (L2) behaviour is exercised without a live server.
+"""
+
+import time
+from unittest.mock import patch
+
+import fakeredis
+import pytest
+from app.services.cache import LocalCache, TieredCache
+from app.services.codec import HEAD_BYTES, CacheCodec
+
+
+class TestLocalCache:
+    """Tests for the in-process LRU/TTL layer."""
+
+    def test_evicts_least_recently_used(self):
+        """Entries beyond max_size should evict the least recently used one."""
+        local = LocalCache(max_size=2, ttl=60)
+        local.set("a", 1)
+        local.set("b", 2)
+        local.get("a")  # "b" is now the least recently used
+        local.set("c", 3)
+
+        assert local.get("b") is None
+        assert local.get("a") == 1
+        assert local.evictions == 1
+
+    def test_expires_entries_after_ttl(self):
+        """Entries should disappear once their TTL has passed."""
+        local = LocalCache(max_size=10, ttl=60)
+        with patch("app.services.cache.time.monotonic", return_value=100.0):
+            local.set("a", 1, ttl=5)
+        with patch("app.services.cache.time.monotonic", return_value=106.0):
+            assert local.get("a") is None
+
+    def test_counts_hits_and_misses(self):
+        """Lookups should update the hit/miss counters."""
+        local = LocalCache(max_size=10, ttl=60)
+        local.set("a", 1)
+        local.get("a")
+        local.get("missing")
+
+        assert local.stats() == {"size": 1, "hits": 1, "misses": 1, "evictions": 0}
+
+
+class TestTieredCache:
+    """Tests for the L1-in-front-of-Redis behaviour."""
+
+    @pytest.mark.asyncio
+    async def test_set_writes_both_tiers(self, fake_redis):
+        """Values should be kept decoded locally and encoded by the codec in Redis."""
+        tiered = TieredCache(LocalCache(max_size=10, ttl=60))
+        await tiered.set("pokemon:25", {"name": "pikachu"}, ttl=3600)
+
+        assert tiered.local.get("pokemon:25").value == {"name": "pikachu"}
+        assert CacheCodec().decode(await fake_redis.get("pokemon:25"))[0] == {"name": "pikachu"}
+
+    @pytest.mark.asyncio
+    async def test_etag_is_stored_with_the_entry(self, fake_redis):
+        """The ETag should be computed once on write and survive the round trip through Redis."""
+        tiered = TieredCache(LocalCache(max_size=10, ttl=60))
+        await tiered.set("pokemon_types", [{"name": "fire"}], ttl=3600)
+        etag = tiered.local.get("pokemon_types").etag
+        tiered.local.clear()
+
+        entry = await tiered.get_entry("pokemon_types")
+
+        assert etag.startswith('"') and etag.endswith('"')
+        assert entry.etag == etag
+        assert entry.value == [{"name": "fire"}]
+
+    @pytest.mark.asyncio
+    async def test_get_etag_reads_only_envelope_head(self, fake_redis):
+        """get_etag() should find the ETag in Redis without reading the value, and skip stale entries."""
+        tiered = TieredCache(LocalCache(max_size=10, ttl=60))
+        await tiered.set("pokemon:25", {"name": "pikachu", "moves": ["x" * 500]}, ttl=3600)
+        etag = tiered.local.get("pokemon:25").etag
+        tiered.local.clear()
+
+        with patch.object(fake_redis, "getrange", wraps=fake_redis.getrange) as getrange:
+            assert await tiered.get_etag("pokemon:25") == etag
+        getrange.assert_called_once_with("pokemon:25", 0, HEAD_BYTES - 1)
+
+        with patch("app.services.cache.time.time", return_value=time.time() + 7200):
+            assert await tiered.get_etag("pokemon:25") is None
+
+    @pytest.mark.asyncio
+    async def test_local_hit_skips_redis(self, fake_redis):
+        """An L1 hit should be served without a Redis round trip."""
+        tiered = TieredCache(LocalCache(max_size=10, ttl=60))
+        await tiered.set("pokemon:25", {"name": "pikachu"}, ttl=3600)
+        await fake_redis.flushall()
+
+        assert await tiered.get("pokemon:25") == {"name": "pikachu"}
+
+    @pytest.mark.asyncio
+    async def test_mget_backfills_local_tier(self, fake_redis):
+        """Redis hits from MGET should populate L1; misses stay None."""
+        tiered = TieredCache(LocalCache(max_size=10, ttl=60))
+        await fake_redis.set("pokemon:1", CacheCodec().encode({"name": "bulbasaur"}, None, None))
+
+        values = await tiered.mget(["pokemon:1", "pokemon:2"])
+
+        assert values == [{"name": "bulbasaur"}, None]
+        assert tiered.local.get("pokemon:1").value == {"name": "bulbasaur"}
+
+    @pytest.mark.asyncio
+    async def test_entries_go_stale_after_soft_ttl(self, fake_redis):
+        """Past the soft TTL an entry should still be served, flagged stale, until the hard TTL."""
+        tiered = TieredCache(LocalCache(max_size=10, ttl=60), stale_ttl=600)
+        await tiered.set("pokemon:25", {"name": "pikachu"}, ttl=10)
+
+        assert not (await tiered.get_entry("pokemon:25")).stale
+        assert 600 < await fake_redis.ttl("pokemon:25") <= 610
+        with patch("app.services.cache.time.time", return_value=time.time() + 11):
+            entry = await tiered.get_entry("pokemon:25")
+            assert entry.stale
+        assert entry.value == {"name": "pikachu"}
+
+    @pytest.mark.asyncio
+    async def test_redis_failure_is_a_miss(self):
+        """A Redis outage should degrade to a cache miss instead of raising."""
+        tiered = TieredCache(LocalCache(max_size=10, ttl=60))
+        broken = fakeredis.FakeAsyncRedis(connected=False)
+
+        with patch("app.services.cache.redis_pool", broken):
+            assert await tiered.get("pokemon:25") is None
+            assert await tiered.mget(["pokemon:25"]) == [None]
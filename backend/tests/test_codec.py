@@ -0,0 +1,124 @@
+"""
+Unit tests for the binary cache codec and how TieredCache reads older and newer formats.
+"""
+
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from app.services.cache import LocalCache, TieredCache
+from app.services.codec import CODEC_MAGIC, CODEC_VERSION, HEAD_BYTES, CacheCodec, CodecError, read_head
+from app.services.pokeapi import PokeAPIService
+
+DETAIL = {"id": 25, "name": "pikachu", "sprites": {"front_default": "https://example.com/25.png" * 50}}
+
+
+class TestCacheCodec:
+    """Tests for framing, compression and versioning."""
+
+    @pytest.mark.parametrize("serializer", ["orjson", "json"])
+    @pytest.mark.parametrize("compression", ["none", "zlib"])
+    def test_round_trip(self, serializer, compression):
+        """Values, metadata and the JSON body should survive encoding with any codec."""
+        codec = CacheCodec(serializer, compression, compress_min_bytes=100)
+        body = codec.dumps_json(DETAIL)
+
+        value, fresh_until, etag, decoded_body = codec.decode(codec.encode(DETAIL, 123.5, '"abc"', body))
+
+        assert (value, fresh_until, etag, decoded_body) == (DETAIL, 123.5, '"abc"', body)
+        assert json.loads(decoded_body) == DETAIL
+
+    def test_compresses_only_above_threshold(self):
+        """Small values should be stored as is; large ones compressed."""
+        codec = CacheCodec("orjson", "zlib", compress_min_bytes=1024)
+        small = codec.encode({"id": 25}, None, None)
+        large = codec.encode(DETAIL, None, None)
+
+        assert small.endswith(b'{"id":25}')
+        assert len(large) < len(codec.dumps_json(DETAIL))
+        assert codec.decode(large)[0] == DETAIL
+
+    def test_reads_values_from_differently_configured_writers(self):
+        """A reader should decode whatever compression a frame says it uses, whatever its own settings."""
+        raw = CacheCodec("json", "zlib", compress_min_bytes=0).encode(DETAIL, None, '"x"')
+
+        assert CacheCodec("orjson", "none").decode(raw)[0] == DETAIL
+
+    def test_head_is_readable_from_a_prefix(self):
+        """The header and ETag should fit in the first HEAD_BYTES bytes, without the payload."""
+        etag = '"' + "f" * 32 + '"'
+        raw = CacheCodec().encode(DETAIL, 99.0, etag)
+
+        head = read_head(raw[:HEAD_BYTES])
+
+        assert (head.fresh_until, head.etag) == (99.0, etag)
+        assert raw[0] == CODEC_MAGIC
+
+    def test_rejects_unknown_version(self):
+        """Frames from a newer codec version should be refused rather than misread."""
+        raw = bytearray(CacheCodec().encode(DETAIL, None, None))
+        raw[1] = CODEC_VERSION + 1
+
+        with pytest.raises(CodecError):
+            CacheCodec().decode(bytes(raw))
+
+    def test_corrupt_payload_is_a_codec_error(self):
+        """A valid header over a payload that won't decompress should raise CodecError, not zlib.error."""
+        raw = CacheCodec("orjson", "zlib", compress_min_bytes=0).encode(DETAIL, None, None)
+        garbage = raw[: read_head(raw).payload_offset] + b"not a zlib stream"
+
+        with pytest.raises(CodecError):
+            CacheCodec().decode(garbage)
+
+    def test_falls_back_when_package_is_missing(self):
+        """Requesting a codec whose package isn't installed should fall back instead of failing."""
+        with patch("app.services.codec.importlib.util.find_spec", return_value=None):
+            codec = CacheCodec("msgpack", "zstd")
+
+        assert (codec.serializer, codec.compression) == ("json", "none")
+
+
+class TestTieredCacheFormats:
+    """Tests for reading entries written in other formats."""
+
+    @pytest.mark.asyncio
+    async def test_unframed_entry_is_a_miss(self, fake_redis):
+        """A value without the codec's magic and version bytes, such as plain JSON, should read as a miss."""
+        await fake_redis.set("pokemon:25", json.dumps(DETAIL))
+        tiered = TieredCache(LocalCache(max_size=10, ttl=60))
+
+        assert await tiered.get_entry("pokemon:25") is None
+        assert await tiered.get_etag("pokemon:25") is None
+
+    @pytest.mark.asyncio
+    async def test_undecodable_entry_is_a_miss(self, fake_redis):
+        """A frame from a newer version should be treated as a miss so it gets refetched and overwritten."""
+        raw = bytearray(CacheCodec().encode(DETAIL, 9999999999.0, '"e"'))
+        raw[1] = CODEC_VERSION + 1
+        await fake_redis.set("pokemon:25", bytes(raw))
+        tiered = TieredCache(LocalCache(max_size=10, ttl=60))
+
+        assert await tiered.get_entry("pokemon:25") is None
+        assert await tiered.mget_entries(["pokemon:25"]) == [None]
+        assert await tiered.get_etag("pokemon:25") is None
+
+    @pytest.mark.asyncio
+    async def test_corrupt_payload_is_refetched(self, fake_redis):
+        """A frame whose compressed body is garbage should read as a miss, then be reloaded and overwritten."""
+        codec = CacheCodec("orjson", "zlib", compress_min_bytes=0)
+        raw = codec.encode(DETAIL, 9999999999.0, '"e"')
+        await fake_redis.set("pokemon:25", raw[: read_head(raw).payload_offset] + b"not a zlib stream")
+        tiered = TieredCache(LocalCache(max_size=10, ttl=60), codec=codec)
+
+        async def load():
+            await tiered.set("pokemon:25", DETAIL, ttl=60)
+            return DETAIL
+
+        loader = AsyncMock(side_effect=load)
+        value = await PokeAPIService(cache=tiered)._serve_cached(
+            "pokemon:25", lambda: tiered.get_entry("pokemon:25"), loader
+        )
+
+        assert value == DETAIL
+        loader.assert_awaited_once()
+        assert codec.decode(await fake_redis.get("pokemon:25"))[0] == DETAIL
@@ -0,0 +1,58 @@
+"""
+Unit tests for list pagination cursors.
+"""
+
+import base64
+import json
+
+import pytest
+from app.services.cursor import LIST_PARAMS, InvalidCursor, decode_cursor, encode_cursor
+
+
+class TestCursor:
+    """Tests for encoding, decoding and validating cursors."""
+
+    def test_round_trip(self):
+        """A cursor should decode to exactly the query it was made from."""
+        params = {
+            **LIST_PARAMS,
+            "search": "char",
+            "types": ["fire", "flying"],
+            "stats": {"speed": {"min": 100}},
+            "offset": 40,
+            "sort": "speed",
+            "match": "any",
+        }
+
+        assert decode_cursor(encode_cursor(params)) == params
+
+    def test_defaults_are_left_out(self):
+        """Parameters at their defaults shouldn't take up space in the token."""
+        token = encode_cursor({**LIST_PARAMS, "offset": 20})
+
+        assert json.loads(base64.urlsafe_b64decode(token + "==")) == {"v": 1, "offset": 20}
+        assert "=" not in token
+
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            {"v": 2, "offset": 20},
+            {"v": 1, "offset": -1},
+            {"v": 1, "limit": 1000},
+            {"v": 1, "sort": "charm"},
+            {"v": 1, "page": 3},
+            {"v": 1, "types": "fire"},
+        ],
+    )
+    def test_rejects_invalid_cursors(self, payload):
+        """Cursors from another version, out of bounds or with unknown fields should be refused."""
+        token = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+        with pytest.raises(InvalidCursor):
+            decode_cursor(token)
+
+    def test_rejects_garbage(self):
+        """Tokens that aren't base64 JSON objects should be refused."""
+        for token in ["not a cursor", "W10", ""]:
+            with pytest.raises(InvalidCursor):
+                decode_cursor(token)
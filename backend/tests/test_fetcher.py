@@ -0,0 +1,115 @@
+"""
+Unit tests for the UpstreamFetcher scheduler.
+
+These tests drive the fetcher against an in-process httpx.MockTransport to verify
+retry/backoff behaviour, Retry-After handling and the concurrency bound.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from app.services.fetcher import UpstreamFetcher, _parse_retry_after
+
+
+def make_client(handler):
+    """Builds an AsyncClient whose requests are answered by `handler`."""
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.fixture
+def no_sleep():
+    """Skips real backoff sleeps while recording the requested delays."""
+    with patch("app.services.fetcher.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+        yield mock_sleep
+
+
+class TestUpstreamFetcher:
+    """Tests for UpstreamFetcher.get()."""
+
+    @pytest.mark.asyncio
+    async def test_retries_429_honouring_retry_after(self, no_sleep):
+        """A 429 with Retry-After should be retried after the advertised delay."""
+        responses = iter([httpx.Response(429, headers={"Retry-After": "2"}), httpx.Response(200, json={})])
+        fetcher = UpstreamFetcher(rate_limit=0)
+
+        async with make_client(lambda request: next(responses)) as client:
+            response = await fetcher.get(client, "https://pokeapi.test/pokemon/1")
+
+        assert response.status_code == 200
+        no_sleep.assert_awaited_once_with(2.0)
+
+    @pytest.mark.asyncio
+    async def test_gives_up_when_retry_after_exceeds_backoff_max(self, no_sleep):
+        """An unreasonably long Retry-After should return the 429 instead of waiting."""
+        fetcher = UpstreamFetcher(rate_limit=0, backoff_max=5)
+
+        async with make_client(lambda request: httpx.Response(429, headers={"Retry-After": "120"})) as client:
+            response = await fetcher.get(client, "https://pokeapi.test/pokemon/1")
+
+        assert response.status_code == 429
+        no_sleep.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_retries_transport_errors_then_raises(self, no_sleep):
+        """Timeouts should be retried up to max_retries, then re-raised."""
+        calls = 0
+
+        def handler(request):
+            nonlocal calls
+            calls += 1
+            raise httpx.ReadTimeout("timed out", request=request)
+
+        fetcher = UpstreamFetcher(rate_limit=0, max_retries=2)
+
+        async with make_client(handler) as client:
+            with pytest.raises(httpx.ReadTimeout):
+                await fetcher.get(client, "https://pokeapi.test/pokemon/1")
+
+        assert calls == 3
+        assert no_sleep.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_does_not_retry_client_errors(self, no_sleep):
+        """A 404 is final and should be returned immediately."""
+        fetcher = UpstreamFetcher(rate_limit=0)
+
+        async with make_client(lambda request: httpx.Response(404)) as client:
+            response = await fetcher.get(client, "https://pokeapi.test/pokemon/0")
+
+        assert response.status_code == 404
+        no_sleep.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_bounds_in_flight_requests(self):
+        """No more than max_in_flight requests should run at once."""
+        fetcher = UpstreamFetcher(max_in_flight=2, rate_limit=0)
+        peak = 0
+
+        class SlowTransport(httpx.AsyncBaseTransport):
+            async def handle_async_request(self, request):
+                nonlocal peak
+                peak = max(peak, fetcher.in_flight)
+                await asyncio.sleep(0.01)
+                return httpx.Response(200)
+
+        async with httpx.AsyncClient(transport=SlowTransport()) as client:
+            await asyncio.gather(*(fetcher.get(client, f"https://pokeapi.test/pokemon/{i}") for i in range(6)))
+
+        assert peak == 2
+        assert fetcher.in_flight == 0
+
+
+class TestParseRetryAfter:
+    """Tests for Retry-After header parsing."""
+
+    def test_parses_seconds(self):
+        assert _parse_retry_after("3") == 3.0
+
+    def test_parses_past_http_date_as_zero(self):
+        assert _parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+    def test_ignores_garbage(self):
+        assert _parse_retry_after("soon") is None
+        assert _parse_retry_after(None) is None
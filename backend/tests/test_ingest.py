@@ -0,0 +1,220 @@
+"""
+Tests for the offline ingestion command and booting from its snapshot.
+
+PokeAPI is replaced by an in-process stand-in served through httpx.MockTransport,
+so the crawl, resume and snapshot paths run without any network access.
+"""
+
+from unittest.mock import patch
+
+import httpx
+import pytest
+from app import ingest as ingest_module
+from app.core.config import settings
+from app.services.pokedex_index import PokedexIndex
+from app.services.snapshot import (
+    SNAPSHOT_VERSION,
+    SnapshotError,
+    load_snapshot,
+    open_binary_snapshot,
+    write_binary_snapshot,
+    write_snapshot,
+)
+from fastapi.testclient import TestClient
+
+BASE_URL = "https://pokeapi.test/api/v2"
+
+POKEMON = {
+    1: ("bulbasaur", ["grass", "poison"], 45),
+    4: ("charmander", ["fire"], 65),
+    7: ("squirtle", ["water"], 43),
+}
+
+
+def fake_pokeapi(failing: set[int] = frozenset()):
+    """Builds a MockTransport handler imitating the PokeAPI endpoints the crawler uses."""
+    requested: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path.removeprefix("/api/v2")
+        requested.append(path)
+        if path == "/type":
+            return httpx.Response(200, json={"results": [{"name": t} for t in ("fire", "water", "grass", "poison")]})
+        if path == "/pokemon":
+            results = [{"name": name, "url": f"{BASE_URL}/pokemon/{i}/"} for i, (name, _, _) in POKEMON.items()]
+            return httpx.Response(200, json={"results": results})
+        pokemon_id = int(path.strip("/").split("/")[-1])
+        if pokemon_id in failing:
+            return httpx.Response(404)
+        name, types, speed = POKEMON[pokemon_id]
+        return httpx.Response(
+            200,
+            json={
+                "id": pokemon_id,
+                "name": name,
+                "types": [{"slot": i + 1, "type": {"name": t}} for i, t in enumerate(types)],
+                "sprites": {"front_default": f"https://example.com/{pokemon_id}.png"},
+                "stats": [{"base_stat": speed, "stat": {"name": "speed"}}],
+            },
+        )
+
+    return handler, requested
+
+
+@pytest.fixture
+def stand_in(mock_redis):
+    """Points the ingestion command at the stand-in PokeAPI."""
+
+    def install(failing: set[int] = frozenset()):
+        handler, requested = fake_pokeapi(failing)
+        client_factory = lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))  # noqa: E731
+        patcher_client = patch.object(ingest_module, "create_http_client", client_factory)
+        patcher_url = patch.object(settings, "pokeapi_base_url", BASE_URL)
+        patcher_client.start()
+        patcher_url.start()
+        installed.extend([patcher_client, patcher_url])
+        return requested
+
+    installed: list = []
+    yield install
+    for patcher in reversed(installed):
+        patcher.stop()
+
+
+class TestIngest:
+    """Tests for the ingest() crawl."""
+
+    @pytest.mark.asyncio
+    async def test_writes_versioned_snapshot(self, stand_in, tmp_path):
+        """A full crawl should snapshot every Pokémon and every type, then drop the checkpoint."""
+        stand_in()
+        output = tmp_path / "pokedex.json.gz"
+
+        assert await ingest_module.ingest(output, batch_size=2)
+
+        snapshot = load_snapshot(output)
+        assert snapshot["version"] == SNAPSHOT_VERSION
+        assert [p["name"] for p in snapshot["pokemon"]] == ["bulbasaur", "charmander", "squirtle"]
+        assert snapshot["types"] == ["fire", "water", "grass", "poison"]
+        assert not (tmp_path / "pokedex.json.gz.partial").exists()
+
+    @pytest.mark.asyncio
+    async def test_bin_output_writes_binary_snapshot(self, stand_in, tmp_path):
+        """An output ending in .bin should get the memory-mappable binary layout."""
+        stand_in()
+        output = tmp_path / "pokedex.bin"
+
+        assert await ingest_module.ingest(output, batch_size=10)
+
+        assert list(open_binary_snapshot(output).names) == ["bulbasaur", "charmander", "squirtle"]
+
+    @pytest.mark.asyncio
+    async def test_failed_run_resumes_where_it_stopped(self, stand_in, tmp_path):
+        """Failures should keep the checkpoint, and a re-run should fetch only what is missing."""
+        output = tmp_path / "pokedex.json.gz"
+        stand_in(failing={7})
+        assert not await ingest_module.ingest(output, batch_size=10)
+        assert not output.exists()
+
+        requested = stand_in()
+        assert await ingest_module.ingest(output, batch_size=10)
+
+        assert [path for path in requested if path.startswith("/pokemon/")] == ["/pokemon/7/"]
+        assert len(load_snapshot(output)["pokemon"]) == 3
+
+    @pytest.mark.asyncio
+    async def test_ignores_torn_checkpoint_line(self, stand_in, tmp_path):
+        """A half-written trailing line from an interrupted run should be discarded."""
+        stand_in()
+        output = tmp_path / "pokedex.json.gz"
+        (tmp_path / "pokedex.json.gz.partial").write_text('{"id": 1, "name": "bulb')
+
+        assert await ingest_module.ingest(output, batch_size=10)
+        assert len(load_snapshot(output)["pokemon"]) == 3
+
+
+class TestSnapshot:
+    """Tests for snapshot reading and booting from a snapshot."""
+
+    def test_rejects_unknown_version(self, tmp_path):
+        """Snapshots from an unknown format version should be refused."""
+        path = tmp_path / "pokedex.json.gz"
+        with patch("app.services.snapshot.SNAPSHOT_VERSION", 999):
+            write_snapshot(path, [], [])
+
+        with pytest.raises(SnapshotError):
+            load_snapshot(path)
+
+    @pytest.mark.parametrize(
+        ("filename", "writer"), [("pokedex.json.gz", write_snapshot), ("pokedex.bin", write_binary_snapshot)]
+    )
+    def test_app_boots_from_snapshot_without_network(self, mock_redis, tmp_path, filename, writer):
+        """With SNAPSHOT_PATH set, list and type queries should be served with no PokeAPI calls."""
+        from app.main import app
+
+        path = tmp_path / filename
+        writer(
+            path,
+            [{"id": 4, "name": "charmander", "types": ["fire"], "sprites": {}, "stats": {"speed": 65}}],
+            ["fire", "water"],
+        )
+        index = PokedexIndex()
+
+        with (
+            patch.object(settings, "snapshot_path", str(path)),
+            patch.object(settings, "index_enabled", False),
+            patch("app.main.pokedex_index", index),
+            patch("app.services.pokeapi.pokedex_index", index),
+            patch("app.services.pokeapi.PokeAPIService._client", side_effect=AssertionError("network used")),
+        ):
+            with TestClient(app) as client:
+                pokemon = client.get("/pokemon?types=fire").json()
+                types = client.get("/pokemon/types").json()
+
+        assert [p["name"] for p in pokemon["results"]] == ["charmander"]
+        assert types == [{"name": "fire"}, {"name": "water"}]
+
+
+class TestBinarySnapshot:
+    """Tests for the memory-mapped binary snapshot format."""
+
+    ROSTER = [
+        {
+            "id": 6,
+            "name": "charizard",
+            "types": ["fire", "flying"],
+            "sprites": {"front_default": "https://example.com/6.png"},
+            "stats": {"hp": 78, "speed": 100},
+        },
+        {"id": 132, "name": "ditto", "types": ["normal"], "sprites": {"front_default": None}, "stats": {"hp": 48}},
+    ]
+
+    def test_round_trips_summaries(self, tmp_path):
+        """An index over the mapped file should return exactly the summaries that were written."""
+        path = tmp_path / "pokedex.bin"
+        write_binary_snapshot(path, self.ROSTER, ["normal", "flying", "fire"])
+        index = PokedexIndex()
+        index.load_packed(open_binary_snapshot(path))
+
+        assert index.query()["results"] == sorted(self.ROSTER, key=lambda p: p["id"])
+        assert index.query(types=["flying", "fire"])["count"] == 1
+
+    def test_columns_are_read_only_views(self, tmp_path):
+        """Columns should be zero-copy views over the mapping rather than private copies."""
+        path = tmp_path / "pokedex.bin"
+        write_binary_snapshot(path, self.ROSTER, [])
+
+        roster = open_binary_snapshot(path)
+
+        assert roster.stats.shape == (2, 6)
+        assert not roster.ids.flags.writeable
+        assert not roster.ids.flags.owndata
+
+    def test_rejects_truncated_file(self, tmp_path):
+        """A file cut short should be refused rather than read past its end."""
+        path = tmp_path / "pokedex.bin"
+        write_binary_snapshot(path, self.ROSTER, [])
+        path.write_bytes(path.read_bytes()[:-10])
+
+        with pytest.raises(SnapshotError):
+            open_binary_snapshot(path)
@@ -0,0 +1,112 @@
+"""
+Unit tests for the Prometheus metrics registry and the stages that record into it.
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from app.services.cache import cache
+from app.services.codec import CacheCodec
+from app.services.fetcher import UpstreamFetcher
+from app.services.metrics import (
+    MetricsRegistry,
+    cache_lookups,
+    redis_seconds,
+    upstream_errors,
+    upstream_in_flight,
+)
+from app.services.pokeapi import PokeAPIService
+
+
+class TestMetricsRegistry:
+    """Tests for the text exposition format."""
+
+    def test_renders_counters_and_histograms(self):
+        """Counters should render per label set, histograms as cumulative buckets with sum and count."""
+        registry = MetricsRegistry()
+        hits = registry.counter("hits_total", "Hits", ("namespace",))
+        latency = registry.histogram("op_seconds", "Latency", ("op",))
+        hits.inc("list")
+        hits.inc("list")
+        latency.observe(0.003, "get")
+        latency.observe(20, "get")
+
+        text = registry.render()
+
+        assert '# TYPE hits_total counter\nhits_total{namespace="list"} 2\n' in text
+        assert 'op_seconds_bucket{op="get",le="0.0025"} 0' in text
+        assert 'op_seconds_bucket{op="get",le="0.005"} 1' in text
+        assert 'op_seconds_bucket{op="get",le="10"} 1' in text
+        assert 'op_seconds_bucket{op="get",le="+Inf"} 2' in text
+        assert 'op_seconds_count{op="get"} 2' in text
+
+    def test_escapes_label_values(self):
+        """Quotes and backslashes in label values should be escaped."""
+        registry = MetricsRegistry()
+        registry.counter("odd_total", "Odd", ("key",)).inc('a"b\\c')
+
+        assert 'odd_total{key="a\\"b\\\\c"} 1' in registry.render()
+
+    def test_collectors_run_before_rendering(self):
+        """Values copied in by an on_render hook should be current in every render."""
+        registry = MetricsRegistry()
+        size = registry.gauge("size", "Size")
+        sizes = iter([3, 5])
+        registry.on_render(lambda: size.set(next(sizes)))
+
+        assert "size 3\n" in registry.render()
+        assert "size 5\n" in registry.render()
+
+
+class TestRecordedMetrics:
+    """Tests that each stage records what it should."""
+
+    @pytest.mark.asyncio
+    async def test_upstream_errors_counted_by_status(self):
+        """Every failed attempt should count under its status, and in-flight should return to zero."""
+        fetcher = UpstreamFetcher(rate_limit=0, max_retries=1, backoff_base=0)
+        request = httpx.Request("GET", "https://pokeapi.co/api/v2/pokemon/0")
+        client = MagicMock(get=AsyncMock(side_effect=[httpx.Response(503, request=request)] * 2))
+        before = upstream_errors.value("503")
+
+        response = await fetcher.get(client, str(request.url))
+
+        assert response.status_code == 503
+        assert upstream_errors.value("503") == before + 2
+        assert upstream_in_flight.value() == 0
+
+    @pytest.mark.asyncio
+    async def test_cache_lookups_counted_by_namespace(self, mock_redis):
+        """A list page served from the cache should count as a list hit and time the Redis GET."""
+        page = {"results": [], "count": 0, "next": False, "previous": False}
+        mock_redis.get.return_value = CacheCodec().encode(page, None, None)
+        hits, gets = cache_lookups.value("list", "hit"), redis_seconds.count("get")
+
+        with patch("app.services.cache.redis_pool", mock_redis):
+            await PokeAPIService().get_pokemon_list()
+
+        assert cache_lookups.value("list", "hit") == hits + 1
+        assert redis_seconds.count("get") == gets + 1
+
+    def test_metrics_endpoint(self, test_client, mock_redis):
+        """GET /metrics should serve the registry in the Prometheus text format."""
+        response = test_client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert "# TYPE pokedex_upstream_seconds histogram" in response.text
+
+    def test_local_cache_stats_exported(self, test_client, mock_redis):
+        """The shared L1's size, hits, misses and evictions should show up in /metrics."""
+        cache.local.set("pokemon:1", {"id": 1})
+        cache.local.get("pokemon:1")
+        cache.local.get("pokemon:2")
+        stats = cache.local.stats()
+
+        text = test_client.get("/metrics").text
+
+        assert f"pokedex_local_cache_entries {stats['size']}\n" in text
+        assert f'pokedex_local_cache_lookups_total{{result="hit"}} {stats["hits"]}\n' in text
+        assert f'pokedex_local_cache_lookups_total{{result="miss"}} {stats["misses"]}\n' in text
+        assert f"pokedex_local_cache_evictions_total {stats['evictions']}\n" in text
@@ -0,0 +1,121 @@
+"""
+Unit tests for the trigram name index behind search and autocomplete.
+"""
+
+import time
+from unittest.mock import patch
+
+import pytest
+from app.services import pokeapi
+from app.services.cache import CacheEntry, LocalCache, TieredCache
+from app.services.codec import CacheCodec
+from app.services.name_index import NameIndex, NameIndexMemo, edit_distance
+from app.services.pokeapi import PokeAPIService
+
+NAMES = ["pikachu", "raichu", "pichu", "charmander", "charizard", "mew", "mewtwo", "mr-mime"]
+
+
+@pytest.fixture
+def names():
+    """Provides a name index over a handful of Pokémon."""
+    return NameIndex(NAMES)
+
+
+def suggested(index: NameIndex, query: str, limit: int = 10) -> list[tuple[str, str]]:
+    return [(NAMES[s.row], s.match) for s in index.suggest(query, limit)]
+
+
+class TestEditDistance:
+    """Tests for the banded edit distance."""
+
+    def test_counts_substitutions_and_swaps(self):
+        """Substitutions, insertions and adjacent swaps should each cost one edit."""
+        assert edit_distance("pikachu", "pikachu", 2) == 0
+        assert edit_distance("pikachi", "pikachu", 2) == 1
+        assert edit_distance("pikcahu", "pikachu", 2) == 1
+        assert edit_distance("charmandr", "charmander", 2) == 1
+
+    def test_caps_at_max_distance_plus_one(self):
+        """Distances beyond the band should be reported as max_distance + 1."""
+        assert edit_distance("kitten", "sitting", 1) == 2
+        assert edit_distance("mew", "mewtwo", 1) == 2
+
+    def test_prefix_mode_matches_partly_typed_names(self):
+        """With prefix=True, the distance is to the closest prefix of the name."""
+        assert edit_distance("pikc", "pikachu", 1, prefix=True) == 1
+        assert edit_distance("mew", "mewtwo", 1, prefix=True) == 0
+
+
+class TestNameIndex:
+    """Tests for NameIndex lookups and ranking."""
+
+    def test_substring_returns_rows_in_order(self, names):
+        """Substring lookups should find the query anywhere in a name, in row order."""
+        assert [NAMES[row] for row in names.substring("chu")] == ["pikachu", "raichu", "pichu"]
+        assert [NAMES[row] for row in names.substring("Mi")] == ["mr-mime"]
+        assert len(names.substring("zzz")) == 0
+
+    def test_ranks_exact_then_prefix_then_substring(self, names):
+        """An exact match should beat prefixes, which beat matches further into the name."""
+        assert suggested(names, "mew") == [("mew", "exact"), ("mewtwo", "prefix")]
+        assert suggested(names, "chu")[:3] == [
+            ("pichu", "substring"),
+            ("raichu", "substring"),
+            ("pikachu", "substring"),
+        ]
+
+    def test_short_queries_suggest_prefixes(self, names):
+        """One- and two-letter queries should suggest names starting with them, shortest first."""
+        assert suggested(names, "pi") == [("pichu", "prefix"), ("pikachu", "prefix")]
+
+    def test_tolerates_typos(self, names):
+        """Misspelled and partly typed names should still be suggested, as fuzzy matches."""
+        assert suggested(names, "charmandr")[0] == ("charmander", "fuzzy")
+        assert suggested(names, "pikcahu")[0] == ("pikachu", "fuzzy")
+        assert ("charizard", "fuzzy") in suggested(names, "chariz4rd")
+
+    def test_respects_limit(self, names):
+        """No more than `limit` suggestions should be returned."""
+        assert len(names.suggest("m", limit=2)) == 2
+
+
+class TestServiceAutocomplete:
+    """Tests for PokeAPIService.autocomplete() before the Pokédex index is warm."""
+
+    @pytest.mark.asyncio
+    async def test_uses_cached_reference_listing(self, mock_redis):
+        """Without an index, suggestions should come from the cached name/url listing."""
+        references = [
+            {"name": "pikachu", "url": "https://pokeapi.co/api/v2/pokemon/25/"},
+            {"name": "pichu", "url": "https://pokeapi.co/api/v2/pokemon/172/"},
+        ]
+        mock_redis.get.return_value = CacheCodec().encode(references, 9999999999.0, None)
+
+        result = await PokeAPIService().autocomplete("pik")
+
+        assert result == [
+            {"id": 25, "name": "pikachu", "match": "prefix"},
+            {"id": 172, "name": "pichu", "match": "fuzzy"},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_name_index_built_once_per_listing(self, mock_redis, monkeypatch):
+        """The fallback index should be reused until the cached listing's ETag changes."""
+        monkeypatch.setattr(pokeapi, "fallback_names", NameIndexMemo())
+        references = [
+            {"name": name, "url": f"https://pokeapi.co/api/v2/pokemon/{i}/"} for i, name in enumerate(NAMES, 1)
+        ]
+        cache = TieredCache(LocalCache(max_size=10, ttl=60))
+        cache.local.set("pokemon_references", CacheEntry(references, time.time() + 60, '"a"'))
+        service = PokeAPIService(cache=cache)
+
+        with patch("app.services.name_index.NameIndex", wraps=NameIndex) as build:
+            await service.autocomplete("pik")
+            await service.autocomplete("char")
+            assert build.call_count == 1
+
+            cache.local.set("pokemon_references", CacheEntry(references[:3], time.time() + 60, '"b"'))
+            result = await service.autocomplete("char")
+
+        assert build.call_count == 2
+        assert result == []
@@ -5,11 +5,16 @@ These tests verify the service's caching logic, data transformation,
 and error handling with fully mocked HTTP and Redis dependencies.
 """
 
-import json
+import asyncio
+import time
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import httpx
 import pytest
+from app.services.background import background
+from app.services.codec import CacheCodec
+from app.services.cursor import LIST_PARAMS, decode_cursor
+from app.services.fetcher import UpstreamFetcher
 from app.services.pokeapi import PokeAPIService
 
 
@@ -35,13 +40,30 @@ class TestGetPokemonDetail:
     async def test_returns_cached_data_on_cache_hit(self, service, mock_redis):
         """Should return cached data without hitting the API."""
         cached_data = {"id": 25, "name": "pikachu"}
-        mock_redis.get.return_value = json.dumps(cached_data)
+        mock_redis.get.return_value = CacheCodec().encode(25, None, None)  # Name -> id alias
+        mock_redis.mget.side_effect = None
+        mock_redis.mget.return_value = [CacheCodec().encode(cached_data, None, None)]
 
-        with patch("app.services.pokeapi.redis_pool", mock_redis):
+        with patch("app.services.cache.redis_pool", mock_redis):
             result = await service.get_pokemon_detail("pikachu")
 
         assert result == cached_data
-        mock_redis.get.assert_called_once_with("pokemon_detail:pikachu")
+        mock_redis.get.assert_called_once_with("pokemon_alias:pikachu")
+        mock_redis.mget.assert_called_once_with(["pokemon:25"])
+
+    @pytest.mark.asyncio
+    async def test_name_and_id_share_one_cache_entry(self, service, mock_redis):
+        """Lookups by id should hit the same canonical entity without an alias lookup."""
+        cached_data = {"id": 25, "name": "pikachu"}
+        mock_redis.mget.side_effect = None
+        mock_redis.mget.return_value = [CacheCodec().encode(cached_data, None, None)]
+
+        with patch("app.services.cache.redis_pool", mock_redis):
+            result = await service.get_pokemon_detail("25")
+
+        assert result == cached_data
+        mock_redis.get.assert_not_called()
+        mock_redis.mget.assert_called_once_with(["pokemon:25"])
 
     @pytest.mark.asyncio
     async def test_fetches_from_api_on_cache_miss(
@@ -55,12 +77,37 @@ class TestGetPokemonDetail:
         mock_response.raise_for_status = MagicMock()
         mock_httpx_client.get = AsyncMock(return_value=mock_response)
 
-        with patch("app.services.pokeapi.redis_pool", mock_redis):
+        with patch("app.services.cache.redis_pool", mock_redis):
             with patch("httpx.AsyncClient", return_value=mock_httpx_client):
                 result = await service.get_pokemon_detail("pikachu")
 
         assert result["name"] == "pikachu"
-        mock_redis.setex.assert_called_once()
+        pipe = mock_redis.pipeline.return_value
+        cached = {call.args[0]: CacheCodec().decode(call.args[2])[0] for call in pipe.setex.call_args_list}
+        assert cached == {"pokemon:25": sample_pokemon_detail, "pokemon_alias:pikachu": 25}
+        pipe.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_serves_stale_entry_and_refreshes_in_background(
+        self, service, mock_redis, mock_httpx_client, sample_pokemon_detail
+    ):
+        """An entry past its soft TTL should be returned immediately and reloaded in the background."""
+        stale = CacheCodec().encode({"id": 25, "name": "pikachu-old"}, time.time() - 1, None)
+        mock_redis.mget.side_effect = None
+        mock_redis.mget.return_value = [stale]
+
+        mock_response = MagicMock()
+        mock_response.json.return_value = sample_pokemon_detail
+        mock_response.raise_for_status = MagicMock()
+        mock_httpx_client.get = AsyncMock(return_value=mock_response)
+
+        with patch("httpx.AsyncClient", return_value=mock_httpx_client):
+            result = await service.get_pokemon_detail("25")
+            assert result["name"] == "pikachu-old"
+            await asyncio.gather(*background._tasks)
+
+        mock_httpx_client.get.assert_called_once()
+        assert service.cache.local.get("pokemon:25").value["name"] == "pikachu"
 
     @pytest.mark.asyncio
     async def test_raises_on_upstream_error(self, service, mock_redis, mock_httpx_client):
@@ -75,7 +122,7 @@ class TestGetPokemonDetail:
             )
         )
 
-        with patch("app.services.pokeapi.redis_pool", mock_redis):
+        with patch("app.services.cache.redis_pool", mock_redis):
             with patch("httpx.AsyncClient", return_value=mock_httpx_client):
                 with pytest.raises(httpx.HTTPStatusError):
                     await service.get_pokemon_detail("fakemon")
@@ -93,12 +140,13 @@ class TestGetPokemonList:
             "next": False,
             "previous": False,
         }
-        mock_redis.get.return_value = json.dumps(cached_response)
+        mock_redis.get.return_value = CacheCodec().encode(cached_response, None, None)
 
-        with patch("app.services.pokeapi.redis_pool", mock_redis):
+        with patch("app.services.cache.redis_pool", mock_redis):
             result = await service.get_pokemon_list(limit=20, offset=0)
 
-        assert result == cached_response
+        # At both ends of the list, there are no cursors to neighbouring pages
+        assert result == {**cached_response, "next": None, "previous": None}
         assert len(result["results"]) == 1
 
     @pytest.mark.asyncio
@@ -133,7 +181,7 @@ class TestGetPokemonList:
             side_effect=[list_response, detail_response]
         )
 
-        with patch("app.services.pokeapi.redis_pool", mock_redis):
+        with patch("app.services.cache.redis_pool", mock_redis):
             with patch("httpx.AsyncClient", return_value=mock_httpx_client):
                 result = await service.get_pokemon_list(search="pika", limit=20, offset=0)
 
@@ -172,7 +220,7 @@ class TestGetPokemonList:
             side_effect=[list_response, detail_response]
         )
 
-        with patch("app.services.pokeapi.redis_pool", mock_redis):
+        with patch("app.services.cache.redis_pool", mock_redis):
             with patch("httpx.AsyncClient", return_value=mock_httpx_client):
                 # Filter for HP >= 50
                 result = await service.get_pokemon_list(
@@ -185,11 +233,330 @@ class TestGetPokemonList:
         assert result["results"][0]["stats"]["hp"] == 100
 
 
+    @pytest.mark.asyncio
+    async def test_partial_page_is_flagged_and_not_cached(
+        self, service, mock_redis, mock_httpx_client
+    ):
+        """Details that fail to load should be dropped, flagged as partial and left uncached."""
+        mock_redis.get.return_value = None
+
+        list_response = MagicMock()
+        list_response.json.return_value = {
+            "results": [
+                {"name": "pikachu", "url": "https://pokeapi.co/api/v2/pokemon/25/"},
+                {"name": "raichu", "url": "https://pokeapi.co/api/v2/pokemon/26/"},
+            ]
+        }
+        list_response.raise_for_status = MagicMock()
+
+        detail_response = MagicMock()
+        detail_response.json.return_value = {
+            "id": 25,
+            "name": "pikachu",
+            "types": [{"type": {"name": "electric"}}],
+            "sprites": {"front_default": "..."},
+            "stats": [{"stat": {"name": "hp"}, "base_stat": 35}],
+        }
+        detail_response.raise_for_status = MagicMock()
+
+        mock_httpx_client.get = AsyncMock(
+            side_effect=[list_response, detail_response, httpx.HTTPStatusError(
+                "Server Error", request=MagicMock(), response=MagicMock()
+            )]
+        )
+
+        with patch("app.services.cache.redis_pool", mock_redis):
+            with patch("httpx.AsyncClient", return_value=mock_httpx_client):
+                result = await service.get_pokemon_list(limit=20, offset=0)
+
+        assert [p["name"] for p in result["results"]] == ["pikachu"]
+        assert result["partial"] is True
+        # The (complete) reference listing and result set are cached, never the partial page
+        cached_keys = [c.args[0] for c in mock_redis.setex.call_args_list]
+        assert "pokemon_references" in cached_keys
+        assert not any(key.startswith("pokemon_list:") for key in cached_keys)
+
+
+    @pytest.mark.asyncio
+    async def test_page_assembled_from_cached_entities(
+        self, service, mock_redis, mock_httpx_client, sample_pokemon_detail
+    ):
+        """Cached entities should be read with one MGET and only misses fetched upstream."""
+        mock_redis.get.return_value = None
+
+        list_response = MagicMock()
+        list_response.json.return_value = {
+            "results": [
+                {"name": "pikachu", "url": "https://pokeapi.co/api/v2/pokemon/25/"},
+                {"name": "raichu", "url": "https://pokeapi.co/api/v2/pokemon/26/"},
+            ]
+        }
+        list_response.raise_for_status = MagicMock()
+
+        raichu_response = MagicMock()
+        raichu_response.json.return_value = {
+            **sample_pokemon_detail,
+            "id": 26,
+            "name": "raichu",
+        }
+        raichu_response.raise_for_status = MagicMock()
+        mock_httpx_client.get = AsyncMock(side_effect=[list_response, raichu_response])
+
+        mock_redis.mget.side_effect = None
+        mock_redis.mget.return_value = [CacheCodec().encode(sample_pokemon_detail, None, None), None]
+
+        with patch("app.services.cache.redis_pool", mock_redis):
+            with patch("httpx.AsyncClient", return_value=mock_httpx_client):
+                result = await service.get_pokemon_list(limit=20, offset=0)
+
+        assert [p["name"] for p in result["results"]] == ["pikachu", "raichu"]
+        mock_redis.mget.assert_called_once_with(["pokemon:25", "pokemon:26"])
+        assert mock_httpx_client.get.call_count == 2  # Listing + the one miss
+        written = [call.args[0] for call in mock_redis.pipeline.return_value.setex.call_args_list]
+        assert written == ["pokemon:26", "pokemon_alias:raichu"]
+
+
+    @pytest.mark.asyncio
+    async def test_match_any_unions_cached_type_members(
+        self, service, mock_redis, mock_httpx_client, sample_pokemon_detail
+    ):
+        """match=any should OR the types, and each type's members should be fetched only once."""
+        mock_redis.get.return_value = None
+        members = {
+            "fire": [{"name": "charmander", "url": "https://pokeapi.co/api/v2/pokemon/4/"}],
+            "water": [{"name": "squirtle", "url": "https://pokeapi.co/api/v2/pokemon/7/"}],
+        }
+
+        async def fake_get(url):
+            response = MagicMock()
+            response.status_code = 200
+            type_name = url.rstrip("/").rsplit("/", 1)[-1]
+            if "/type/" in url:
+                response.json.return_value = {"pokemon": [{"pokemon": p} for p in members[type_name]]}
+            else:
+                pokemon_id = int(type_name)
+                name = "charmander" if pokemon_id == 4 else "squirtle"
+                response.json.return_value = {**sample_pokemon_detail, "id": pokemon_id, "name": name}
+            return response
+
+        mock_httpx_client.get = AsyncMock(side_effect=fake_get)
+
+        with patch("app.services.cache.redis_pool", mock_redis):
+            with patch("httpx.AsyncClient", return_value=mock_httpx_client):
+                any_result = await service.get_pokemon_list(types=["fire", "water"], match="any")
+                all_result = await service.get_pokemon_list(types=["fire", "water"], match="all")
+
+        assert [p["name"] for p in any_result["results"]] == ["charmander", "squirtle"]
+        assert all_result["count"] == 0
+        type_calls = [c.args[0] for c in mock_httpx_client.get.call_args_list if "/type/" in c.args[0]]
+        assert sorted(type_calls) == [
+            "https://pokeapi.co/api/v2/type/fire",
+            "https://pokeapi.co/api/v2/type/water",
+        ]
+
+
+    @pytest.mark.asyncio
+    async def test_pages_share_one_result_set(self, service, mock_redis):
+        """Sorted pages should compute the filtered id set once, then resolve only their own details."""
+        references = [{"name": f"p{i}", "url": f"https://pokeapi.co/api/v2/pokemon/{i}/"} for i in range(1, 6)]
+        details = {i: {"id": i, "name": f"p{i}", "stats": {"speed": i * 10}} for i in range(1, 6)}
+
+        async def fetch(client, urls):
+            return [details[int(url.rstrip("/").rsplit("/", 1)[1])] for url in urls]
+
+        with (
+            patch("app.services.cache.redis_pool", mock_redis),
+            patch.object(service, "_matching_references", AsyncMock(return_value=references)) as matching,
+            patch.object(service, "_fetch_many_details", side_effect=fetch) as fetch_details,
+        ):
+            first = await service.get_pokemon_list(limit=2, sort="speed")
+            second = await service.get_pokemon_list(limit=2, offset=2, sort="speed")
+
+        assert [p["id"] for p in first["results"]] == [5, 4]
+        assert [p["id"] for p in second["results"]] == [3, 2]
+        matching.assert_awaited_once()
+        # Every candidate once for the result set, then one page of details each
+        assert [len(c.args[1]) for c in fetch_details.call_args_list] == [5, 2, 2]
+
+    @pytest.mark.asyncio
+    async def test_next_and_previous_are_cursors(self, service, mock_redis):
+        """A page's cursors should decode to the same query at the neighbouring offsets."""
+        cached_page = {"results": [{"id": 21, "name": "spearow"}], "count": 60, "next": True, "previous": True}
+        mock_redis.get.return_value = CacheCodec().encode(cached_page, None, None)
+
+        with patch("app.services.cache.redis_pool", mock_redis):
+            result = await service.get_pokemon_list(types=["normal"], limit=20, offset=20, sort="id")
+
+        assert decode_cursor(result["next"]) == {**LIST_PARAMS, "types": ["normal"], "offset": 40, "sort": "id"}
+        assert decode_cursor(result["previous"]) == {**LIST_PARAMS, "types": ["normal"], "offset": 0, "sort": "id"}
+
+
+class TestGetPokemonBatch:
+    """Tests for PokeAPIService.get_pokemon_batch()."""
+
+    @pytest.mark.asyncio
+    async def test_reads_cache_in_one_mget_and_fetches_only_misses(self, mock_redis, sample_pokemon_detail):
+        """Hits should come from one MGET, misses from PokeAPI, and results keep request order with errors."""
+        pikachu = {**sample_pokemon_detail, "id": 25, "name": "pikachu"}
+        codec = CacheCodec()
+        frames = {
+            "pokemon_alias:pikachu": codec.encode(25, None, None),
+            "pokemon:25": codec.encode(pikachu, None, None),
+        }
+        mock_redis.mget.side_effect = lambda keys: [frames.get(key) for key in keys]
+
+        async def fake_get(client, url):
+            missing = url.endswith("/missingno")
+            response = MagicMock(status_code=404 if missing else 200)
+            response.raise_for_status = MagicMock(
+                side_effect=httpx.HTTPStatusError("Not Found", request=MagicMock(), response=response)
+                if missing
+                else None
+            )
+            response.json.return_value = {**sample_pokemon_detail, "id": 4, "name": "charmander"}
+            return response
+
+        fetcher = MagicMock(get=AsyncMock(side_effect=fake_get))
+        service = PokeAPIService(client=MagicMock(), fetcher=fetcher)
+
+        results = await service.get_pokemon_batch(["4", "Pikachu", "missingno", "pikachu"])
+
+        assert [(r["query"], r["status"]) for r in results] == [
+            ("4", 200),
+            ("Pikachu", 200),
+            ("missingno", 404),
+            ("pikachu", 200),
+        ]
+        assert results[0]["data"]["name"] == "charmander"
+        assert results[1]["data"] == results[3]["data"] == pikachu
+        assert results[2]["error"] == "Pokemon not found"
+        assert sorted(c.args[1] for c in fetcher.get.call_args_list) == [
+            "https://pokeapi.co/api/v2/pokemon/4",
+            "https://pokeapi.co/api/v2/pokemon/missingno",
+        ]
+        assert mock_redis.mget.await_count == 2  # Aliases, then entities
+
+    @pytest.mark.asyncio
+    async def test_invalid_ids_fail_alone(self, mock_redis, sample_pokemon_detail):
+        """Blank and malformed ids should get their own 400 without reaching PokeAPI, and the rest still resolve."""
+
+        async def fake_get(client, url):
+            response = MagicMock(status_code=200)
+            if url.endswith("/ditto"):
+                response.json.return_value = {"count": 1302, "results": []}  # Not a Pokémon payload
+            else:
+                response.json.return_value = {**sample_pokemon_detail, "id": 25, "name": "pikachu"}
+            return response
+
+        fetcher = MagicMock(get=AsyncMock(side_effect=fake_get))
+        service = PokeAPIService(client=MagicMock(), fetcher=fetcher)
+
+        results = await service.get_pokemon_batch([" ", "pikachu", "1/../", "0", "-1", "-pikachu", "ditto"])
+
+        assert [(r["query"], r["status"]) for r in results] == [
+            (" ", 400),
+            ("pikachu", 200),
+            ("1/../", 400),
+            ("0", 400),
+            ("-1", 400),
+            ("-pikachu", 400),
+            ("ditto", 502),
+        ]
+        assert results[0]["error"] == "Invalid Pokémon name or id"
+        assert sorted(c.args[1] for c in fetcher.get.call_args_list) == [
+            "https://pokeapi.co/api/v2/pokemon/ditto",
+            "https://pokeapi.co/api/v2/pokemon/pikachu",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_bounds_upstream_parallelism(self, mock_redis, sample_pokemon_detail):
+        """No more than batch_max_concurrency misses should be fetched at once."""
+        in_flight = peak = 0
+
+        async def fake_get(client, url):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            response = MagicMock(status_code=200)
+            pokemon_id = int(url.rsplit("/", 1)[-1])
+            response.json.return_value = {**sample_pokemon_detail, "id": pokemon_id, "name": f"p{pokemon_id}"}
+            return response
+
+        service = PokeAPIService(client=MagicMock(), fetcher=MagicMock(get=AsyncMock(side_effect=fake_get)))
+        with patch("app.services.pokeapi.settings.batch_max_concurrency", 3):
+            results = await service.get_pokemon_batch([str(i) for i in range(1, 11)])
+
+        assert [r["data"]["id"] for r in results] == list(range(1, 11))
+        assert peak == 3
+
+
+class TestStreamPokemonList:
+    """Tests for PokeAPIService.stream_pokemon_list() without the index."""
+
+    @pytest.mark.asyncio
+    async def test_streams_batches_with_per_item_errors(self, mock_redis, sample_pokemon_detail):
+        """Every reference should be resolved, batch by batch, and failures reported in place."""
+        references = [{"name": f"p{i}", "url": f"https://pokeapi.co/api/v2/pokemon/{i}/"} for i in range(1, 61)]
+
+        async def fake_get(client, url):
+            pokemon_id = int(url.rstrip("/").rsplit("/", 1)[-1])
+            response = MagicMock(status_code=404 if pokemon_id == 7 else 200)
+            response.raise_for_status = MagicMock(
+                side_effect=httpx.HTTPStatusError("Not Found", request=MagicMock(), response=response)
+                if pokemon_id == 7
+                else None
+            )
+            response.json.return_value = {**sample_pokemon_detail, "id": pokemon_id, "name": f"p{pokemon_id}"}
+            return response
+
+        service = PokeAPIService(client=MagicMock(), fetcher=MagicMock(get=AsyncMock(side_effect=fake_get)))
+        with patch.object(service, "get_pokemon_references", new_callable=AsyncMock, return_value=references):
+            batches = [batch async for batch in service.stream_pokemon_list()]
+
+        assert [len(batch) for batch in batches] == [50, 10]
+        items = [item for batch in batches for item in batch]
+        assert [item["id"] for item in items] == list(range(1, 61))
+        assert items[6] == {"id": 7, "name": "p7", "error": "Failed to fetch from PokeAPI"}
+
+
+class TestGetPokemonFacets:
+    """Tests for PokeAPIService.get_pokemon_facets() without the index."""
+
+    @pytest.mark.asyncio
+    async def test_fallback_computes_and_caches_facets(self, mock_redis, sample_pokemon_detail):
+        """Candidates should be fetched once, and equivalent filters then served from the cache."""
+        references = [{"name": f"p{i}", "url": f"https://pokeapi.co/api/v2/pokemon/{i}/"} for i in range(1, 4)]
+
+        async def fake_get(client, url):
+            pokemon_id = int(url.rstrip("/").rsplit("/", 1)[-1])
+            response = MagicMock(status_code=200)
+            stats = [{**s, "base_stat": 40 * pokemon_id} for s in sample_pokemon_detail["stats"]]
+            response.json.return_value = {**sample_pokemon_detail, "id": pokemon_id, "stats": stats}
+            return response
+
+        fetcher = MagicMock(get=AsyncMock(side_effect=fake_get))
+        service = PokeAPIService(client=MagicMock(), fetcher=fetcher)
+        with (
+            patch.object(service, "get_pokemon_references", new_callable=AsyncMock, return_value=references),
+            patch.object(service, "get_pokemon_types", new_callable=AsyncMock, return_value=[{"name": "fire"}]),
+        ):
+            facets = await service.get_pokemon_facets(stats={"hp": {"min": 50}})
+            again = await service.get_pokemon_facets(stats={"hp": {"min": 50, "max": 255}})
+
+        assert facets["count"] == 2
+        assert facets["types"] == {"electric": 2, "fire": 0}
+        assert sum(facets["stats"]["hp"]["histogram"]) == 3
+        assert again == facets
+        assert fetcher.get.await_count == 3
+
+
 class TestFetchPokemonDetails:
     """Tests for the internal _fetch_pokemon_details method."""
 
     @pytest.mark.asyncio
-    async def test_returns_none_on_http_error(self, service, mock_httpx_client):
+    async def test_returns_none_on_http_error(self, service, mock_redis, mock_httpx_client):
         """Should return None instead of raising on HTTP errors."""
         mock_httpx_client.get = AsyncMock(
             side_effect=httpx.HTTPStatusError(
@@ -202,3 +569,50 @@ class TestFetchPokemonDetails:
         )
 
         assert result is None
+
+    @pytest.mark.asyncio
+    async def test_returns_none_on_transport_error(self, mock_redis, mock_httpx_client):
+        """Timeouts and connection resets should also degrade to None after retries."""
+        mock_httpx_client.get = AsyncMock(side_effect=httpx.ConnectError("connection reset"))
+        service = PokeAPIService(fetcher=UpstreamFetcher(max_retries=0))
+
+        result = await service._fetch_pokemon_details(
+            mock_httpx_client, "https://pokeapi.co/api/v2/pokemon/25/"
+        )
+
+        assert result is None
+
+
+class TestSharedClient:
+    """Tests for reuse of the application-lifetime HTTP client."""
+
+    @pytest.mark.asyncio
+    async def test_uses_injected_client_without_creating_one(
+        self, mock_redis, mock_httpx_client, sample_pokemon_detail
+    ):
+        """An injected client should serve requests instead of a per-call client."""
+        mock_response = MagicMock()
+        mock_response.json.return_value = sample_pokemon_detail
+        mock_response.raise_for_status = MagicMock()
+        mock_httpx_client.get = AsyncMock(return_value=mock_response)
+        service = PokeAPIService(client=mock_httpx_client)
+
+        with patch("app.services.cache.redis_pool", mock_redis):
+            with patch("httpx.AsyncClient") as MockClient:
+                result = await service.get_pokemon_detail("pikachu")
+
+        MockClient.assert_not_called()
+        mock_httpx_client.get.assert_called_once()
+        assert result["name"] == "pikachu"
+
+    @pytest.mark.asyncio
+    async def test_get_pokemon_types_shapes_names(self, mock_httpx_client):
+        """Should reduce the upstream type listing to name-only entries."""
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"results": [{"name": "fire", "url": "..."}]}
+        mock_response.raise_for_status = MagicMock()
+        mock_httpx_client.get = AsyncMock(return_value=mock_response)
+
+        result = await PokeAPIService(client=mock_httpx_client).get_pokemon_types()
+
+        assert result == [{"name": "fire"}]
@@ -0,0 +1,222 @@
+"""
+Unit tests for the in-memory PokedexIndex.
+
+These tests verify that list queries (search, types, stats, pagination)
+are answered from the loaded roster without any upstream I/O.
+"""
+
+from unittest.mock import patch
+
+import pytest
+from app.services.pokeapi import PokeAPIService
+from app.services.pokedex_index import PokedexIndex
+
+
+@pytest.fixture
+def roster():
+    """A small roster of shaped Pokémon summaries, deliberately out of id order."""
+    return [
+        {
+            "id": 6,
+            "name": "charizard",
+            "types": ["fire", "flying"],
+            "sprites": {"front_default": "https://example.com/6.png"},
+            "stats": {"hp": 78, "attack": 84, "speed": 100},
+        },
+        {
+            "id": 1,
+            "name": "bulbasaur",
+            "types": ["grass", "poison"],
+            "sprites": {"front_default": "https://example.com/1.png"},
+            "stats": {"hp": 45, "attack": 49, "speed": 45},
+        },
+        {
+            "id": 4,
+            "name": "charmander",
+            "types": ["fire"],
+            "sprites": {"front_default": "https://example.com/4.png"},
+            "stats": {"hp": 39, "attack": 52, "speed": 65},
+        },
+    ]
+
+
+@pytest.fixture
+def index(roster):
+    """Provides an index loaded with the sample roster."""
+    index = PokedexIndex()
+    index.load(roster)
+    return index
+
+
+class TestPokedexIndex:
+    """Tests for PokedexIndex loading and querying."""
+
+    def test_not_ready_until_loaded(self):
+        """A fresh index should not claim to be ready."""
+        assert not PokedexIndex().ready
+
+    def test_query_returns_entries_in_id_order(self, index):
+        """Unfiltered queries should return every entry ordered by id."""
+        result = index.query()
+
+        assert [p["id"] for p in result["results"]] == [1, 4, 6]
+        assert result["count"] == 3
+
+    def test_query_combines_filters(self, index):
+        """Search, types and stats should all apply together."""
+        result = index.query(search="char", types=["fire"], stats={"speed": {"min": 90}})
+
+        assert result["count"] == 1
+        assert result["results"][0]["name"] == "charizard"
+
+    def test_types_use_and_semantics(self, index):
+        """Every requested type must be present on a match."""
+        result = index.query(types=["fire", "flying"])
+
+        assert [p["name"] for p in result["results"]] == ["charizard"]
+
+    def test_match_any_uses_or_semantics(self, index):
+        """With match=any, a Pokémon with at least one requested type should match."""
+        result = index.query(types=["flying", "grass"], match="any")
+
+        assert [p["name"] for p in result["results"]] == ["bulbasaur", "charizard"]
+
+    def test_match_any_ignores_unknown_types(self, index):
+        """An unknown type should not empty an OR query, only an AND one."""
+        assert index.query(types=["fire", "shadow"], match="any")["count"] == 2
+        assert index.query(types=["fire", "shadow"], match="all")["count"] == 0
+
+    def test_pagination_flags(self, index):
+        """limit/offset should slice after filtering and set next/previous."""
+        result = index.query(limit=1, offset=1)
+
+        assert [p["id"] for p in result["results"]] == [4]
+        assert result["next"] is True
+        assert result["previous"] is True
+
+    def test_unknown_type_matches_nothing(self, index):
+        """A type no indexed Pokémon has should yield an empty result."""
+        assert index.query(types=["shadow"])["count"] == 0
+
+    def test_sort_by_stat_returns_top_k(self, index):
+        """Sorting by a stat should order descending by default and page over the sorted set."""
+        first = index.query(sort="speed", limit=2)
+        second = index.query(sort="speed", limit=2, offset=2)
+
+        assert [p["name"] for p in first["results"]] == ["charizard", "charmander"]
+        assert [p["name"] for p in second["results"]] == ["bulbasaur"]
+
+    def test_sort_ascending_within_type(self, index):
+        """order=asc should reverse the stat ordering after filtering."""
+        result = index.query(types=["fire"], sort="attack", order="asc")
+
+        assert [p["name"] for p in result["results"]] == ["charmander", "charizard"]
+
+    def test_iter_query_yields_everything_in_query_order(self, index):
+        """iter_query() should cover the whole result set in batches, ordered as query() pages it."""
+        batches = list(index.iter_query(sort="speed", batch_size=2))
+
+        assert [[p["name"] for p in batch] for batch in batches] == [["charizard", "charmander"], ["bulbasaur"]]
+        assert batches[0][0] == index.query(sort="speed", limit=1)["results"][0]
+
+    def test_iter_query_keeps_reading_the_roster_it_started_with(self, index, roster):
+        """A reload mid-iteration should not mix rows from the old and new roster."""
+        batches = index.iter_query(batch_size=1)
+        first = next(batches)
+        index.load(roster[:1])
+
+        assert [first[0]["name"], *(batch[0]["name"] for batch in batches)] == ["bulbasaur", "charmander", "charizard"]
+
+    def test_pages_share_one_filter_pass(self, index):
+        """Every page size and offset of a query should slice one memoized result set."""
+        with patch.object(index, "_filter", wraps=index._filter) as filter_rows:
+            index.query(sort="speed", limit=1)
+            index.query(sort="speed", limit=2, offset=1)
+            list(index.iter_query(sort="speed"))
+
+        filter_rows.assert_called_once()
+
+    def test_sorted_pages_select_only_a_prefix(self, index):
+        """A stat-sorted page should only order the rows up to its end; a stream orders them all."""
+        with patch.object(index, "_top_k", wraps=index._top_k) as top_k:
+            index.query(sort="speed", limit=1)
+            list(index.iter_query(sort="speed"))
+
+        assert [c.args[3] for c in top_k.call_args_list] == [1, 3]
+
+    def test_paging_a_sorted_prefix_matches_a_full_sort(self):
+        """Pages read one at a time, through a growing sorted prefix, should match one full sort."""
+        index = PokedexIndex()
+        index.load(
+            [
+                {"id": i, "name": f"p{i}", "types": ["normal"], "sprites": {}, "stats": {"speed": (i * 37) % 11}}
+                for i in range(1, 51)
+            ]
+        )
+
+        pages = [index.query(sort="speed", limit=7, offset=offset)["results"] for offset in range(0, 50, 7)]
+
+        expected = sorted(range(1, 51), key=lambda i: (-((i * 37) % 11), i))
+        assert [p["id"] for page in pages for p in page] == expected
+        assert [p["id"] for batch in index.iter_query(sort="speed") for p in batch] == expected
+
+    def test_reload_drops_memoized_results(self, index, roster):
+        """Result sets from the previous roster should not be served after a load."""
+        assert index.query(types=["fire"])["count"] == 2
+        index.load(roster[:1])
+
+        assert index.query(types=["fire"])["count"] == 1
+
+    def test_facets_count_types_and_stats(self, index):
+        """Facets should count each type among the matches and histogram their stats in buckets of 10."""
+        facets = index.facets(types=["fire"])
+
+        assert facets["count"] == 2
+        assert facets["types"] == {"fire": 2, "flying": 1, "grass": 0, "poison": 0}
+        speed = facets["stats"]["speed"]
+        assert (speed["min"], speed["max"]) == (65, 100)
+        assert speed["histogram"][6] == speed["histogram"][10] == 1
+        assert sum(speed["histogram"]) == 2
+        assert facets["stats"]["defense"] == {"min": None, "max": None, "histogram": [0] * 26}
+
+    def test_stat_facets_ignore_their_own_range(self, index):
+        """A stat's histogram should cover everything the other filters allow, so its slider can move."""
+        facets = index.facets(stats={"speed": {"min": 90}})
+
+        assert facets["count"] == 1
+        assert facets["types"]["fire"] == 1
+        assert sum(facets["stats"]["speed"]["histogram"]) == 3
+        assert facets["stats"]["speed"]["min"] == 45
+        assert facets["stats"]["attack"]["min"] == facets["stats"]["attack"]["max"] == 84
+
+    def test_facets_are_memoized_until_reload(self, index, roster):
+        """The same filter should reuse its facets, and a reload should recompute them."""
+        first = index.facets(types=["fire"])
+        assert index.facets(types=["fire"]) is first
+
+        index.load(roster[:1])
+
+        assert index.facets(types=["fire"])["count"] == 1
+
+    def test_get_by_name_or_id(self, index):
+        """Lookups should accept ids, numeric strings and names."""
+        assert index.get(4)["name"] == "charmander"
+        assert index.get("6")["name"] == "charizard"
+        assert index.get("Bulbasaur")["id"] == 1
+        assert index.get("missingno") is None
+
+
+class TestServiceUsesIndex:
+    """Tests that PokeAPIService answers list queries from a warm index."""
+
+    @pytest.mark.asyncio
+    async def test_list_served_without_upstream_calls(self, index, mock_redis):
+        """A ready index should bypass Redis and PokeAPI entirely."""
+        service = PokeAPIService(index=index)
+
+        with patch("httpx.AsyncClient") as MockClient:
+            result = await service.get_pokemon_list(types=["fire"], limit=20, offset=0)
+
+        MockClient.assert_not_called()
+        mock_redis.get.assert_not_called()
+        assert [p["name"] for p in result["results"]] == ["charmander", "charizard"]
@@ -0,0 +1,156 @@
+"""
+Unit tests for speculative prefetching: the budgeted Prefetcher, and the service
+warming details and the next page after serving a list page.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.services.background import BackgroundRunner
+from app.services.fetcher import UpstreamFetcher
+from app.services.pokeapi import PokeAPIService
+from app.services.pokedex_index import PokedexIndex
+from app.services.prefetcher import Prefetcher
+
+
+@pytest.fixture
+def fetcher():
+    return UpstreamFetcher(max_in_flight=10, rate_limit=0, max_retries=0)
+
+
+@pytest.fixture
+def page_prefetcher(fetcher):
+    prefetcher = Prefetcher(fetcher, concurrency=2, max_load=0.5, runner=BackgroundRunner())
+    yield prefetcher
+    prefetcher.cancel_all()
+
+
+class TestPrefetcher:
+    """Tests for scheduling, the concurrency budget and yielding to load."""
+
+    @pytest.mark.asyncio
+    async def test_deduplicates_jobs_by_name(self, page_prefetcher):
+        """A job already running under a name should not be scheduled again."""
+        release = asyncio.Event()
+        job = AsyncMock(side_effect=release.wait)
+
+        first = page_prefetcher.schedule("page:2", job)
+        assert page_prefetcher.schedule("page:2", job) is None
+        release.set()
+        await first
+
+        job.assert_awaited_once()
+        assert len(page_prefetcher) == 0
+
+    @pytest.mark.asyncio
+    async def test_slots_bound_concurrency(self, page_prefetcher):
+        """No more than `concurrency` slots should be held at once."""
+        peak = 0
+
+        async def fetch():
+            nonlocal peak
+            async with page_prefetcher.slot():
+                peak = max(peak, page_prefetcher.active)
+                await asyncio.sleep(0.01)
+
+        async def job():
+            await asyncio.gather(*(fetch() for _ in range(6)))
+
+        await page_prefetcher.schedule("details", job)
+
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_yields_to_user_load(self, page_prefetcher, fetcher):
+        """Under load, running prefetches should be cancelled and new ones not scheduled."""
+        started = asyncio.Event()
+
+        async def job():
+            started.set()
+            await asyncio.sleep(0.01)
+            async with page_prefetcher.slot():
+                raise AssertionError("fetched under load")
+
+        task = page_prefetcher.schedule("details", job)
+        await started.wait()
+        fetcher.in_flight = 5  # Half of max_in_flight, all of it user requests
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert page_prefetcher.schedule("page:2", AsyncMock()) is None
+
+    @pytest.mark.asyncio
+    async def test_own_requests_are_not_user_load(self, page_prefetcher, fetcher):
+        """Every upstream request a page prefetch makes under its one slot should be left out of the user load."""
+        release = asyncio.Event()
+
+        async def get(url):
+            await release.wait()
+            return MagicMock(status_code=200)
+
+        client = MagicMock(get=AsyncMock(side_effect=get))
+
+        async def job():
+            async with page_prefetcher.slot():
+                urls = [f"https://pokeapi.co/api/v2/pokemon/{i}/" for i in range(6)]
+                await asyncio.gather(*(fetcher.get(client, url) for url in urls))
+
+        task = page_prefetcher.schedule("page:2", job)
+        while fetcher.in_flight < 6:
+            await asyncio.sleep(0)
+
+        assert fetcher.speculative_in_flight == 6
+        assert not page_prefetcher.overloaded()
+        release.set()
+        await task
+        assert fetcher.speculative_in_flight == 0
+
+
+class TestServicePrefetch:
+    """Tests for what the service warms after serving a page."""
+
+    @pytest.mark.asyncio
+    async def test_warms_details_of_an_index_page(self, mock_redis, page_prefetcher, sample_pokemon_detail):
+        """After an index page is served, opening one of its Pokémon should be a cache hit."""
+        index = PokedexIndex()
+        index.load([{"id": 25, "name": "pikachu", "types": ["electric"], "sprites": {}, "stats": {}}])
+        response = MagicMock(status_code=200)
+        response.json.return_value = sample_pokemon_detail
+        client = MagicMock(get=AsyncMock(return_value=response))
+        service = PokeAPIService(
+            index=index, client=client, fetcher=page_prefetcher.fetcher, page_prefetcher=page_prefetcher
+        )
+
+        with patch("app.services.pokeapi.settings.prefetch_enabled", True):
+            await service.get_pokemon_list()
+            await asyncio.gather(*page_prefetcher._jobs.values())
+            detail = await service.get_pokemon_detail("pikachu")
+
+        assert detail["name"] == "pikachu"
+        client.get.assert_awaited_once_with("https://pokeapi.co/api/v2/pokemon/25/")
+
+    @pytest.mark.asyncio
+    async def test_warms_next_page_on_fallback_path(self, mock_redis, page_prefetcher):
+        """Without the index, serving offset N should cache the page at offset N + limit."""
+        service = PokeAPIService(fetcher=page_prefetcher.fetcher, page_prefetcher=page_prefetcher)
+        pages = {
+            0: {"results": [{"id": 1, "name": "bulbasaur"}], "count": 2, "next": True, "previous": False},
+            1: {"results": [{"id": 2, "name": "ivysaur"}], "count": 2, "next": False, "previous": True},
+        }
+
+        async def load(cache_key, search, types, stats, limit, offset, *rest):
+            await service.cache.set(cache_key, pages[offset], 60)
+            return pages[offset]
+
+        with (
+            patch("app.services.pokeapi.settings.prefetch_enabled", True),
+            patch.object(service, "_load_pokemon_list", side_effect=load) as loader,
+            patch.object(service, "_prefetch_details", new_callable=AsyncMock),
+        ):
+            await service.get_pokemon_list(limit=1)
+            await asyncio.gather(*page_prefetcher._jobs.values())
+            second = await service.get_pokemon_list(limit=1, offset=1)
+
+        assert second["results"] == pages[1]["results"]
+        assert [c.args[5] for c in loader.call_args_list] == [0, 1]
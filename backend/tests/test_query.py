@@ -0,0 +1,64 @@
+"""
+Unit tests for list query normalization.
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from app.services.pokeapi import PokeAPIService
+from app.services.query import ListFilters, canonical_filters
+
+
+class TestCanonicalFilters:
+    """Tests that equivalent list queries normalize to the same filters."""
+
+    def test_type_order_case_and_duplicates_are_ignored(self):
+        """types=fire,flying and types=Flying,fire,fire should be one query."""
+        assert canonical_filters(types=["fire", "flying"]) == canonical_filters(types=["Flying", "fire", "fire"])
+
+    def test_stat_key_order_is_ignored(self):
+        """Stat ranges should compare equal, and serialize equally, whatever order they were given in."""
+        first = canonical_filters(stats={"speed": {"min": 50}, "attack": {"max": 100}})
+        second = canonical_filters(stats={"attack": {"max": 100}, "speed": {"min": 50}})
+
+        assert first == second
+        assert list(first.stats) == ["attack", "speed"]
+
+    def test_default_bounds_are_dropped(self):
+        """Bounds that filter nothing, and stats left without bounds, shouldn't make a new query."""
+        filters = canonical_filters(
+            stats={"hp": {"min": 0, "max": 255}, "speed": {"min": 0, "max": 90}, "luck": {"min": 9}}
+        )
+
+        assert filters.stats == {"speed": {"max": 90}}
+        assert canonical_filters(stats={"hp": {"min": 0}}).stats is None
+
+    def test_irrelevant_options_take_defaults(self):
+        """match only matters with several types, order only when sorting, and blank search not at all."""
+        assert canonical_filters(search="  ", types=["fire"], order="asc", match="any") == ListFilters(
+            None, ["fire"], None, None, "desc", "all"
+        )
+        assert canonical_filters(types=["fire", "water"], sort="hp", order="asc", match="any").match == "any"
+
+
+class TestServiceNormalizes:
+    """Tests that the service looks up equivalent queries under one key."""
+
+    @pytest.mark.asyncio
+    async def test_equivalent_queries_share_cache_entry(self, mock_redis):
+        """Reordered types and stats, and default bounds, should hit the first query's cached page."""
+        service = PokeAPIService()
+        page = {"results": [], "count": 0, "next": False, "previous": False}
+
+        with (
+            patch("app.services.cache.redis_pool", mock_redis),
+            patch.object(service, "_load_pokemon_list", AsyncMock(return_value=page)) as loader,
+        ):
+            await service.get_pokemon_list(
+                types=["fire", "flying"], stats={"speed": {"min": 50}, "attack": {"max": 90}}
+            )
+            await service.get_pokemon_list(
+                types=["flying", "fire"], stats={"attack": {"max": 90}, "speed": {"min": 50, "max": 255}, "hp": {}}
+            )
+
+        assert len({c.args[0] for c in loader.call_args_list}) == 1
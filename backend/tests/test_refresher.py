@@ -0,0 +1,108 @@
+"""
+Unit tests for the hot-key tracker and scheduled cache re-warming.
+"""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+from app.services.cache import CacheEntry, LocalCache, TieredCache
+from app.services.pokeapi import PokeAPIService
+from app.services.refresher import HotKeyTracker, rewarm_hot_keys
+from app.services.singleflight import SingleFlight
+
+
+def reader(entry):
+    """Builds an entry reader that always returns `entry`."""
+    return AsyncMock(return_value=entry)
+
+
+class TestHotKeyTracker:
+    """Tests for HotKeyTracker bookkeeping."""
+
+    def test_top_orders_by_request_count(self):
+        """The most requested keys should come first."""
+        tracker = HotKeyTracker()
+        for key, hits in (("a", 1), ("b", 3), ("c", 2)):
+            for _ in range(hits):
+                tracker.record(key, reader(None), AsyncMock())
+
+        assert [key for key, _, _ in tracker.top(2)] == ["b", "c"]
+
+    def test_decay_bounds_tracked_keys(self):
+        """Exceeding max_keys should forget the coldest keys."""
+        tracker = HotKeyTracker(max_keys=4)
+        tracker.record("hot", reader(None), AsyncMock())
+        tracker.record("hot", reader(None), AsyncMock())
+        for key in "abcd":
+            tracker.record(key, reader(None), AsyncMock())
+
+        assert len(tracker) <= 4
+        assert tracker.top(1)[0][0] == "hot"
+
+
+class TestRewarmHotKeys:
+    """Tests for rewarm_hot_keys()."""
+
+    @pytest.mark.asyncio
+    async def test_reloads_only_missing_or_expiring_keys(self):
+        """Keys fresh beyond the horizon should be left alone."""
+        tracker = HotKeyTracker()
+        fresh_loader, expiring_loader, missing_loader = AsyncMock(), AsyncMock(), AsyncMock()
+        tracker.record("fresh", reader(CacheEntry({}, time.time() + 3600)), fresh_loader)
+        tracker.record("expiring", reader(CacheEntry({}, time.time() + 10)), expiring_loader)
+        tracker.record("missing", reader(None), missing_loader)
+
+        refreshed = await rewarm_hot_keys(tracker, top_n=10, horizon=60)
+
+        assert refreshed == 2
+        fresh_loader.assert_not_awaited()
+        expiring_loader.assert_awaited_once()
+        missing_loader.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_failures_do_not_stop_the_pass(self):
+        """A loader that raises should be logged and skipped."""
+        tracker = HotKeyTracker()
+        tracker.record("broken", reader(None), AsyncMock(side_effect=RuntimeError("upstream down")))
+        tracker.record("ok", reader(None), AsyncMock())
+
+        assert await rewarm_hot_keys(tracker, top_n=10, horizon=60) == 1
+
+    @pytest.mark.asyncio
+    async def test_not_found_keys_are_forgotten(self):
+        """A key whose reload 404s should drop out of the hot set instead of being retried every pass."""
+        tracker = HotKeyTracker()
+        request = httpx.Request("GET", "https://pokeapi.co/api/v2/pokemon/0")
+        not_found = httpx.HTTPStatusError("404", request=request, response=httpx.Response(404, request=request))
+        tracker.record("gone", reader(None), AsyncMock(side_effect=not_found))
+        tracker.record("ok", reader(None), AsyncMock())
+
+        assert await rewarm_hot_keys(tracker, top_n=10, horizon=60) == 1
+        assert [key for key, _, _ in tracker.top(10)] == ["ok"]
+
+    @pytest.mark.asyncio
+    async def test_rewarm_joins_an_in_flight_load(self, mock_redis):
+        """Re-warming a key a request is already loading should wait for that load, not fetch again."""
+        tracker = HotKeyTracker()
+        release = asyncio.Event()
+
+        async def load():
+            await release.wait()
+            return {"id": 1}
+
+        loader = AsyncMock(side_effect=load)
+        service = PokeAPIService(
+            cache=TieredCache(LocalCache(max_size=10, ttl=60)), flight_group=SingleFlight(), tracker=tracker
+        )
+        request = asyncio.create_task(service._serve_cached("pokemon:1", AsyncMock(return_value=None), loader))
+        await asyncio.sleep(0)
+        rewarm = asyncio.create_task(rewarm_hot_keys(tracker, top_n=10, horizon=60))
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await request == {"id": 1}
+        assert await rewarm == 1
+        loader.assert_awaited_once()
@@ -0,0 +1,107 @@
+"""
+Unit tests for request coalescing.
+
+These tests verify that concurrent cache misses for the same key share a single
+upstream fetch, both within a worker (SingleFlight) and across workers (Redis lock).
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.services.codec import CacheCodec
+from app.services.pokeapi import PokeAPIService
+from app.services.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """Tests for SingleFlight.do()."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        """Callers of the same key should all receive the result of one call."""
+        group = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        results = await asyncio.gather(*(group.do("key", work) for _ in range(5)))
+
+        assert results == [1] * 5
+        assert calls == 1
+        assert len(group) == 0
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_to_every_caller(self):
+        """A failing call should raise for all waiters and not be remembered."""
+        group = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(group.do("key", fail), group.do("key", fail), return_exceptions=True)
+
+        assert all(isinstance(r, ValueError) for r in results)
+        assert len(group) == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        """Cancelling one waiter should leave the shared call running for the rest."""
+        group = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        first = asyncio.create_task(group.do("key", work))
+        second = asyncio.create_task(group.do("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == "done"
+
+
+class TestServiceCoalescing:
+    """Tests for coalescing in PokeAPIService."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_detail_misses_fetch_once(self, mock_redis, sample_pokemon_detail):
+        """Concurrent misses for one Pokémon should make a single upstream request."""
+        client = MagicMock()
+
+        async def slow_get(url):
+            await asyncio.sleep(0.01)
+            response = MagicMock()
+            response.json.return_value = sample_pokemon_detail
+            return response
+
+        client.get = AsyncMock(side_effect=slow_get)
+        service = PokeAPIService(client=client, flight_group=SingleFlight())
+
+        results = await asyncio.gather(*(service.get_pokemon_detail("pikachu") for _ in range(3)))
+
+        assert all(r["name"] == "pikachu" for r in results)
+        client.get.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_waits_for_other_worker_holding_lock(self, mock_redis, sample_pokemon_detail):
+        """With the Redis lock enabled, a worker that loses the lock should read the holder's result."""
+        client = MagicMock()
+        client.get = AsyncMock()
+        service = PokeAPIService(client=client, flight_group=SingleFlight())
+
+        mock_redis.set = AsyncMock(return_value=None)  # Lock already held elsewhere
+        mock_redis.get = AsyncMock(return_value=None)
+        # First read misses; the poll then finds the entity the other worker cached
+        mock_redis.mget = AsyncMock(side_effect=[[None], [CacheCodec().encode(sample_pokemon_detail, None, None)]])
+
+        with patch("app.services.pokeapi.settings.cache_lock_enabled", True):
+            result = await service.get_pokemon_detail("25")
+
+        assert result["name"] == "pikachu"
+        client.get.assert_not_called()
@@ -30,6 +30,13 @@ export async function fetchPokemon({
   return res.json();
 }
 
+export async function fetchAutocomplete(query, limit = 8) {
+  const params = new URLSearchParams({ q: query, limit: String(limit) });
+  const res = await fetch(`${API_BASE}/pokemon/autocomplete?${params.toString()}`);
+  if (!res.ok) throw new Error(`API error: ${res.status}`);
+  return res.json();
+}
+
 export async function fetchPokemonDetail(pokemonId) {
   const res = await fetch(`${API_BASE}/pokemon/${pokemonId}`);
   if (!res.ok) {
@@ -1,5 +1,5 @@
 // frontend/src/components/SearchBar.jsx
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import styles from './SearchBar.module.css';
 
 const SearchBar = ({
@@ -8,8 +8,32 @@ const SearchBar = ({
   isSearchMode,
   placeholder = 'Search Pokémon by name...',
   initialQuery = '',
+  fetchSuggestions = null, // Optional async (query) => [{ id, name }] for autocomplete
 }) => {
   const [query, setQuery] = useState(initialQuery);
+  const [suggestions, setSuggestions] = useState([]);
+
+  // Debounced autocomplete lookups; stale responses are ignored
+  useEffect(() => {
+    if (!fetchSuggestions || !query.trim()) {
+      setSuggestions([]);
+      return undefined;
+    }
+    let cancelled = false;
+    const timer = setTimeout(() => {
+      fetchSuggestions(query.trim())
+        .then((results) => {
+          if (!cancelled) setSuggestions(results);
+        })
+        .catch(() => {
+          if (!cancelled) setSuggestions([]);
+        });
+    }, 150);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [query, fetchSuggestions]);
 
   const handleSubmit = (e) => {
     e.preventDefault();
@@ -32,7 +56,15 @@ const SearchBar = ({
             placeholder={placeholder}
             className={styles['search-input']}
             aria-label="Search"
+            list={fetchSuggestions ? 'search-suggestions' : undefined}
           />
+          {fetchSuggestions && (
+            <datalist id="search-suggestions">
+              {suggestions.map((s) => (
+                <option key={s.id} value={s.name} />
+              ))}
+            </datalist>
+          )}
           <button type="submit" className={styles['search-button']}>
             🔍 Search
           </button>
@@ -1,7 +1,7 @@
 // frontend/src/pages/PokemonList.jsx
 import React, { useState, useRef, useCallback, useEffect } from 'react';
 import { useQuery } from '@tanstack/react-query'; // Import useQuery
-import { fetchTypes } from '../API'; // Import a function to fetch types
+import { fetchAutocomplete, fetchTypes } from '../API'; // Import a function to fetch types
 import { usePokemonList } from '../hooks/usePokemon';
 import PokemonListComponent from '../components/PokemonList';
 import SearchBar from '../components/SearchBar';
@@ -92,7 +92,12 @@ const PokemonList = () => {
 
   return (
     <>
-      <SearchBar onSearch={handleSearch} onClear={handleClearSearch} isSearchMode={isSearchMode} />
+      <SearchBar
+        onSearch={handleSearch}
+        onClear={handleClearSearch}
+        isSearchMode={isSearchMode}
+        fetchSuggestions={fetchAutocomplete}
+      />
 
       {/* Render the TypeButtonGroup here */}
       <div